@@ -0,0 +1,127 @@
+from datetime import date as date_cls
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from .models import Attendance, AttendanceMonthlySummary
+
+ATTENDANCE_STATUSES = ("Present", "Absent")
+
+
+# =====================
+# Bulk Attendance Writes
+# =====================
+def bulk_mark_attendance(trainer, batch, date, statuses):
+    """
+    Save a whole roster for one batch and date in a single transaction.
+
+    `statuses` maps intern id -> "Present"/"Absent". Interns that are not in
+    the batch, or have an invalid status, are ignored. Returns a dict with the
+    number of rows created, updated and left unchanged.
+    """
+    intern_ids = set(batch.interns.values_list("id", flat=True))
+    wanted = {
+        int(intern_id): status
+        for intern_id, status in statuses.items()
+        if status in ATTENDANCE_STATUSES and int(intern_id) in intern_ids
+    }
+    result = {"created": 0, "updated": 0, "unchanged": 0}
+    if not wanted:
+        return result
+
+    with transaction.atomic():
+        existing = {
+            att.intern_id: att
+            for att in Attendance.objects.select_for_update().filter(intern_id__in=wanted, date=date)
+        }
+
+        to_create = []
+        to_update = []
+        for intern_id, status in wanted.items():
+            att = existing.get(intern_id)
+            if att is None:
+                to_create.append(Attendance(
+                    intern_id=intern_id, trainer=trainer, batch=batch, date=date, status=status,
+                ))
+            elif att.status != status or att.trainer_id != trainer.id or att.batch_id != batch.id:
+                att.status = status
+                att.trainer = trainer
+                att.batch = batch
+                to_update.append(att)
+            else:
+                result["unchanged"] += 1
+
+        if to_create:
+            Attendance.objects.bulk_create(to_create)
+        if to_update:
+            Attendance.objects.bulk_update(to_update, ["status", "trainer", "batch"])
+
+        changed = [att.intern_id for att in to_create + to_update]
+        if changed:
+            refresh_monthly_summary(changed, date.year, date.month)
+
+    result["created"] = len(to_create)
+    result["updated"] = len(to_update)
+    return result
+
+
+# =====================
+# Monthly Rollup
+# =====================
+def month_bounds(year, month):
+    """Half-open [start, end) date range of a month, usable with an index on date."""
+    start = date_cls(year, month, 1)
+    end = date_cls(year + 1, 1, 1) if month == 12 else date_cls(year, month + 1, 1)
+    return start, end
+
+
+def _summary_rows(attendances, *group_by):
+    return attendances.values("intern_id", "batch_id", *group_by).annotate(
+        present_count=Count("id", filter=Q(status="Present")),
+        absent_count=Count("id", filter=Q(status="Absent")),
+    )
+
+
+def refresh_monthly_summary(intern_ids, year, month):
+    """
+    Recompute the AttendanceMonthlySummary rows of the given interns for one
+    month from their Attendance rows. Called after every attendance write.
+    """
+    start, end = month_bounds(year, month)
+    rows = _summary_rows(Attendance.objects.filter(intern_id__in=intern_ids, date__gte=start, date__lt=end))
+    with transaction.atomic():
+        AttendanceMonthlySummary.objects.filter(intern_id__in=intern_ids, year=year, month=month).delete()
+        AttendanceMonthlySummary.objects.bulk_create([
+            AttendanceMonthlySummary(year=year, month=month, **row) for row in rows
+        ])
+
+
+def rebuild_monthly_summaries(attendance_model=Attendance, summary_model=AttendanceMonthlySummary):
+    """
+    Throw away the rollup and rebuild it from every Attendance row. Migrations
+    pass their historical models.
+    """
+    rows = _summary_rows(
+        attendance_model.objects.annotate(year=ExtractYear("date"), month=ExtractMonth("date")),
+        "year", "month",
+    ).order_by()
+    with transaction.atomic():
+        summary_model.objects.all().delete()
+        created = summary_model.objects.bulk_create(
+            (summary_model(**row) for row in rows.iterator()), batch_size=1000
+        )
+    return len(created)
+
+
+def monthly_summary(batch, year, month):
+    """Report rows in the same shape the attendance templates already use."""
+    return AttendanceMonthlySummary.objects.filter(
+        batch=batch, year=year, month=month
+    ).values(
+        "intern__unique_id",
+        "intern__user__first_name",
+        "intern__user__last_name",
+        "present_count",
+        "absent_count",
+    ).order_by("intern__unique_id")
@@ -0,0 +1,119 @@
+from django.core.cache import cache
+
+from .models import Doubt, InternProfile, TrainerProfile
+from .services import pending_work_for_intern
+
+
+# =====================
+# Cached Pending Counters
+# =====================
+# The sidebar badges are rendered on every page, so the counts behind them are
+# kept in the cache and only recomputed after one of the underlying rows changes
+# (see CRM/signals.py).
+
+PENDING_COUNTS_TIMEOUT = 60 * 60  # safety net, signals normally invalidate first
+
+EMPTY_COUNTS = {
+    'pending_doubts_count': 0,
+    'pending_assessments_count': 0,
+    'pending_assignments_count': 0,
+}
+
+
+def global_key():
+    return "pending_counts:global"
+
+
+def intern_key(user_id):
+    return f"pending_counts:intern:{user_id}"
+
+
+def trainer_key(user_id):
+    return f"pending_counts:trainer:{user_id}"
+
+
+def key_for_user(user):
+    if user.role == "intern":
+        return intern_key(user.id)
+    if user.role == "trainer":
+        return trainer_key(user.id)
+    return global_key()
+
+
+# -----------------------
+# Computation (cache misses only)
+# -----------------------
+def compute_global_counts():
+    counts = dict(EMPTY_COUNTS)
+    counts['pending_doubts_count'] = Doubt.objects.filter(resolved=False).count()
+    return counts
+
+
+def compute_trainer_counts(user):
+    counts = dict(EMPTY_COUNTS)
+    counts['pending_doubts_count'] = Doubt.objects.filter(trainer__user=user, resolved=False).count()
+    return counts
+
+
+def compute_intern_counts(user):
+    counts = dict(EMPTY_COUNTS)
+    intern_profile = InternProfile.objects.filter(user=user).first()
+    if not intern_profile:
+        return counts
+
+    work = pending_work_for_intern(intern_profile)
+    counts['pending_doubts_count'] = work['pending_doubts']
+    counts['pending_assessments_count'] = work['pending_assessments']
+    counts['pending_assignments_count'] = work['pending_assignments']
+    return counts
+
+
+def compute_counts(user):
+    if user.role == "intern":
+        return compute_intern_counts(user)
+    if user.role == "trainer":
+        return compute_trainer_counts(user)
+    return compute_global_counts()
+
+
+def get_pending_counts(user):
+    """
+    Return the sidebar counters for a user with a single cache read.
+    """
+    key = key_for_user(user)
+    counts = cache.get(key)
+    if counts is None:
+        counts = compute_counts(user)
+        cache.set(key, counts, PENDING_COUNTS_TIMEOUT)
+    return counts
+
+
+# -----------------------
+# Invalidation
+# -----------------------
+def invalidate_global():
+    cache.delete(global_key())
+
+
+def invalidate_interns(user_ids):
+    cache.delete_many([intern_key(user_id) for user_id in user_ids])
+
+
+def invalidate_trainers(user_ids):
+    cache.delete_many([trainer_key(user_id) for user_id in user_ids])
+
+
+def invalidate_intern_profile(intern_id):
+    invalidate_interns(InternProfile.objects.filter(id=intern_id).values_list('user_id', flat=True))
+
+
+def invalidate_trainer_profile(trainer_id):
+    invalidate_trainers(TrainerProfile.objects.filter(id=trainer_id).values_list('user_id', flat=True))
+
+
+def invalidate_batch_interns(*batch_ids):
+    invalidate_interns(InternProfile.objects.filter(batch_id__in=batch_ids).values_list('user_id', flat=True))
+
+
+def invalidate_all_interns():
+    invalidate_interns(InternProfile.objects.values_list('user_id', flat=True))
@@ -0,0 +1,262 @@
+import io
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date
+from itertools import islice
+
+from django.conf import settings
+from django.template.loader import get_template, render_to_string
+from xhtml2pdf import pisa
+
+from .models import InternProfile
+from .pdf_cache import get_cached_pdf, pdf_cache_key, store_pdf
+
+
+# =====================
+# Intern Documents (Undertaking / Certificate / LOR)
+# =====================
+COMPANY_INFO = {
+    "name": "VINDUS ENVIRONMENT PRIVATE LIMITED",
+    "cin": "U62099TS2023PTC179794",
+    "address": "#9-110, Shanti Nagar, Dilsukhnagar, Hyderabad- 500 060",
+    "phone": "+914049525396",
+    "website": "www.vindusenvironment.com"
+}
+
+# InternProfile flag set once a document of that kind has been issued
+DOCUMENT_FLAGS = {
+    "undertaking": "undertaking_generated",
+    "certificate": "completion_certificate_generated",
+    "lor": "lor_generated",
+}
+
+
+def eligible_interns(kind, interns):
+    """Narrow an InternProfile queryset to interns that may receive `kind`."""
+    interns = interns.select_related("user", "batch", "batch__course")
+    if kind == "undertaking":
+        return interns.filter(internship_status="Ongoing", undertaking_generated=False)
+    if kind == "certificate":
+        return interns.filter(internship_status="Completed", completion_certificate_generated=False)
+    if kind == "lor":
+        return interns.filter(
+            internship_status="Completed", lor_generated=False
+        ).exclude(project_title__isnull=True).exclude(project_title__exact="")
+    raise ValueError(f"Unknown document kind: {kind}")
+
+
+# -----------------------
+# Templates and branding assets
+# -----------------------
+DOCUMENT_TEMPLATES = {
+    "undertaking": "undertaking_letter.html",
+    "certificate": "certificates/certificate_template.html",
+    "lor": "lors/lor_template.html",
+}
+
+LOGO_IMAGES = {
+    "undertaking": "vinduslogo.jpg",
+    "certificate": "vinduslogo.jpg",
+    "lor": "vinduslogo.png",
+}
+
+SIGNATURE_IMAGE = "signature.png"
+
+BRANDING_SCHEME = "branding:"
+
+
+def branding_image(name):
+    """
+    Reference static/images/<name> from a document template. The HTML only
+    carries a short "branding:" URI, so documents stay small to hash and to
+    pickle for the render pool; pass branding_link_callback to pisa.CreatePDF
+    to resolve it.
+    """
+    return f"{BRANDING_SCHEME}{name}"
+
+
+def branding_file(name):
+    """Absolute path of a known branding image, or None for any other name."""
+    if name not in set(LOGO_IMAGES.values()) | {SIGNATURE_IMAGE}:
+        return None
+    return os.path.join(settings.BASE_DIR, 'static', 'images', name)
+
+
+def branding_link_callback(uri, rel):
+    """xhtml2pdf link_callback: map branding: URIs to their image files."""
+    if isinstance(uri, str) and uri.startswith(BRANDING_SCHEME):
+        return branding_file(uri[len(BRANDING_SCHEME):])
+    return None
+
+
+def warm_document_assets():
+    """Compile the document templates up front."""
+    for template_name in DOCUMENT_TEMPLATES.values():
+        get_template(template_name)
+
+
+def build_document(kind, intern):
+    """
+    Return (filename, template_name, context) for one intern's document.
+    The intern should come with user and batch__course already selected.
+    """
+    if kind not in DOCUMENT_TEMPLATES:
+        raise ValueError(f"Unknown document kind: {kind}")
+
+    full_name = intern.user.get_full_name()
+    context = {
+        "today_date": date.today().strftime("%d-%m-%Y"),
+        "logo_path": branding_image(LOGO_IMAGES[kind]),
+        "signature_path": branding_image(SIGNATURE_IMAGE),
+    }
+
+    if kind == "undertaking":
+        context.update({
+            "intern_name": full_name,
+            "course": intern.batch.course,
+            "batch": intern.batch,
+            "company": COMPANY_INFO,
+        })
+        filename = f"{intern.unique_id}_{full_name}_undertaking.pdf".upper()
+    elif kind == "certificate":
+        context["intern"] = intern
+        filename = f"Certificate_{intern.unique_id}_{full_name}.pdf"
+    else:
+        context.update({"intern": intern, "company": COMPANY_INFO})
+        filename = f"LOR_{intern.unique_id}_{full_name}.pdf"
+
+    return filename, DOCUMENT_TEMPLATES[kind], context
+
+
+# =====================
+# Rendering
+# =====================
+def html_to_pdf(html, asset_paths=()):
+    """
+    Convert HTML to PDF bytes, or None if xhtml2pdf reports an error.
+    Identical HTML (with unchanged assets) is served from the PDF cache.
+    """
+    key = pdf_cache_key(html, asset_paths)
+    pdf_bytes = get_cached_pdf(key)
+    if pdf_bytes is not None:
+        return pdf_bytes
+
+    result = io.BytesIO()
+    pisa_status = pisa.CreatePDF(html, dest=result, link_callback=branding_link_callback)
+    if pisa_status.err:
+        return None
+    pdf_bytes = result.getvalue()
+    store_pdf(key, pdf_bytes)
+    return pdf_bytes
+
+
+def context_assets(context):
+    """
+    Image files referenced by a document context (logo_path, signature_path, ...),
+    so replacing one invalidates the cached PDFs that embed it.
+    """
+    paths = []
+    for name, value in context.items():
+        if not (name.endswith("_path") and isinstance(value, str)):
+            continue
+        path = branding_link_callback(value, None) or value
+        if not path.startswith("data:"):
+            paths.append(path)
+    return paths
+
+
+def render_pdf_bytes(template_name, context):
+    """Render a template to PDF bytes, or None if xhtml2pdf reports an error."""
+    html = render_to_string(template_name, context)
+    return html_to_pdf(html, context_assets(context))
+
+
+def _init_render_worker():
+    """Process pool initializer: make sure Django is usable in the child."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'VCLPCrm.settings')
+        django.setup()
+
+    # Never reuse a DB handle inherited from the parent over fork; contexts are
+    # built with everything selected, so children should not query at all.
+    from django.db import connections
+    for conn in connections.all(initialized_only=True):
+        conn.connection = None
+
+    warm_document_assets()
+
+
+def _render_item(item):
+    key, template_name, context = item
+    return key, render_pdf_bytes(template_name, context)
+
+
+def render_workers():
+    """Render processes to use: PDF_RENDER_WORKERS, or one per CPU core."""
+    return getattr(settings, 'PDF_RENDER_WORKERS', None) or os.cpu_count() or 1
+
+
+def render_documents(items, max_workers=1):
+    """
+    Render (key, template_name, context) items and yield (key, pdf_bytes)
+    pairs as each one finishes, not in input order.
+
+    Rendering is serial by default, which is what request handlers get: a web
+    worker must not fork a process pool. The background document worker
+    passes render_workers(); xhtml2pdf is CPU bound and holds the GIL, so its
+    documents are spread over a process pool with only a couple per worker in
+    flight at a time, which keeps memory flat for large batches.
+    """
+    items = list(items)
+    workers = min(max_workers or 1, len(items))
+    if workers <= 1:
+        for item in items:
+            yield _render_item(item)
+        return
+
+    remaining = iter(items)
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker)
+    try:
+        pending = {pool.submit(_render_item, item) for item in islice(remaining, workers * 2)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                item = next(remaining, None)
+                if item is not None:
+                    pending.add(pool.submit(_render_item, item))
+    finally:
+        # Also reached when the consumer stops early (e.g. a dropped download)
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def render_intern_documents(kind, interns, max_workers=1):
+    """
+    Yield (intern_id, filename, pdf_bytes) for each intern's `kind` document
+    as soon as it is rendered; pdf_bytes is None if rendering failed.
+    """
+    items = []
+    for intern in interns:
+        filename, template_name, context = build_document(kind, intern)
+        items.append(((intern.pk, filename), template_name, context))
+
+    for (intern_id, filename), pdf_bytes in render_documents(items, max_workers=max_workers):
+        yield intern_id, filename, pdf_bytes
+
+
+def document_zip_entries(kind, interns):
+    """
+    Yield (filename, pdf_bytes) for a ZIP streamed from a request, setting
+    each intern's generated flag once their entry has been handed on. Interns
+    whose PDF failed to render are skipped and keep their flag unset.
+    Rendering stays serial here; large batches belong in a DocumentJob.
+    """
+    flag = DOCUMENT_FLAGS[kind]
+    for intern_id, filename, pdf_bytes in render_intern_documents(kind, interns):
+        if not pdf_bytes:
+            continue
+        yield filename, pdf_bytes
+        InternProfile.objects.filter(pk=intern_id).update(**{flag: True})
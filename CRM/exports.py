@@ -0,0 +1,152 @@
+import csv
+import tempfile
+import zipfile
+
+import openpyxl
+from django.http import FileResponse, StreamingHttpResponse
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+EXPORT_CHUNK_SIZE = 2000
+
+
+# =====================
+# Streaming Export Engine
+# =====================
+# Rows are plain lists produced lazily (usually from .values_list().iterator()),
+# so memory stays flat no matter how many records are exported.
+
+class _Echo:
+    """File-like object whose write() just hands the line back to csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def csv_response(filename, rows):
+    """Stream rows to the client as CSV while they are being produced."""
+    writer = csv.writer(_Echo())
+    response = StreamingHttpResponse(
+        (writer.writerow(row) for row in rows),
+        content_type='text/csv',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def xlsx_response(filename, rows, title="Sheet"):
+    """
+    Write rows into a write-only workbook spooled to a temp file, then stream
+    that file back. Only the current row is held in memory while writing.
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(title=title)
+    for row in rows:
+        ws.append(row)
+
+    tmp = tempfile.TemporaryFile(suffix='.xlsx')
+    wb.save(tmp)
+    tmp.seek(0)
+    return FileResponse(tmp, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
+
+
+class _ZipBuffer:
+    """
+    Write-only sink for zipfile. It has no seek()/tell(), so zipfile writes
+    data descriptors instead of going back to patch headers, which is what
+    lets the archive be streamed.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def zip_stream(entries, compression=zipfile.ZIP_DEFLATED):
+    """
+    Yield a ZIP archive chunk by chunk from (filename, bytes) entries; each
+    entry is sent as soon as it is produced and then dropped.
+    """
+    buffer = _ZipBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression) as zf:
+        for name, data in entries:
+            zf.writestr(name, data)
+            yield buffer.drain()
+    # Central directory
+    yield buffer.drain()
+
+
+def zip_response(filename, entries, compression=zipfile.ZIP_DEFLATED):
+    response = StreamingHttpResponse(zip_stream(entries, compression), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+# -----------------------
+# Attendance
+# -----------------------
+def _full_name(first_name, last_name):
+    return f"{first_name or ''} {last_name or ''}".strip()
+
+
+def attendance_rows(attendances, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield [date, intern, unique id, status, trainer] without loading model instances."""
+    values = attendances.order_by('date', 'intern__unique_id').values_list(
+        'date',
+        'intern__user__first_name', 'intern__user__last_name',
+        'intern__unique_id',
+        'status',
+        'trainer__user__first_name', 'trainer__user__last_name',
+    )
+    for day, first, last, unique_id, status, t_first, t_last in values.iterator(chunk_size=chunk_size):
+        yield [day.strftime("%Y-%m-%d"), _full_name(first, last), unique_id, status, _full_name(t_first, t_last)]
+
+
+def attendance_summary_rows(summary):
+    for s in summary:
+        yield [
+            _full_name(s['intern__user__first_name'], s['intern__user__last_name']),
+            s['intern__unique_id'],
+            s['present_count'],
+            s['absent_count'],
+        ]
+
+
+def attendance_report_rows(batch, attendances, summary):
+    """Full report layout shared by the Excel and CSV exports."""
+    yield ["Attendance Report"]
+    yield ["Batch", batch.name if batch else ""]
+    yield []
+    yield ['Date', 'Intern Name', 'Unique ID', 'Status', 'Trainer']
+    yield from attendance_rows(attendances)
+    yield []
+    yield []
+    yield ["Summary"]
+    yield ['Intern Name', 'Unique ID', 'Present Days', 'Absent Days']
+    yield from attendance_summary_rows(summary)
+
+
+# -----------------------
+# Assignment Scores
+# -----------------------
+def batch_scores_rows(batch, scoreboard):
+    yield ["Assignment Scores"]
+    yield ["Batch", batch.name]
+    yield []
+    yield ['Intern Name', 'Unique ID', 'Total Assignments', 'Submitted', 'Graded',
+           'Total Score', 'Average Score', 'Completion Rate (%)']
+    for row in scoreboard:
+        yield [
+            row['name'], row['unique_id'], row['total_assignments'], row['submitted_count'],
+            row['graded_count'], float(row['total_score']), float(row['average_score']), row['completion_rate'],
+        ]
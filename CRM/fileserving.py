@@ -0,0 +1,172 @@
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+
+# =====================
+# Protected File Serving
+# =====================
+# Views check permissions and then hand the file to serve_protected_file(),
+# which answers conditional (ETag / Last-Modified) and Range requests and
+# streams from disk without reading the file into memory.
+#
+# PROTECTED_FILES_BACKEND = "nginx" or "apache" delegates the transfer to the
+# reverse proxy (X-Accel-Redirect / X-Sendfile) once the view has allowed it.
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+class _RangeFile:
+    """
+    Read-only view of `length` bytes of an open file starting at `start`.
+
+    fileno()/tell() are passed through so servers that use sendfile for
+    wsgi.file_wrapper (e.g. gunicorn) still send the range zero-copy.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def file_etag(stat):
+    return quote_etag(f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        return if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]
+
+    if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+    return if_modified_since is not None and int(mtime) <= if_modified_since
+
+
+def parse_range(header, size):
+    """
+    Return (start, end) inclusive for a single "bytes=" range, "invalid" if
+    it cannot be satisfied, or None if the whole file should be sent
+    (no header, or a multi-range request which we answer with 200).
+    """
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return "invalid"
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return "invalid"
+    return start, min(end, size - 1)
+
+
+def _range_applies(request, etag, mtime):
+    """Honour If-Range: only serve a partial response for an unchanged file."""
+    if_range = request.headers.get("If-Range")
+    if not if_range:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(mtime)
+
+
+def _proxy_response(path, content_type):
+    backend = getattr(settings, "PROTECTED_FILES_BACKEND", None)
+    if backend == "nginx":
+        relative = os.path.relpath(path, settings.MEDIA_ROOT)
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = settings.PROTECTED_FILES_NGINX_PREFIX.rstrip("/") + "/" + relative.replace(os.sep, "/")
+        return response
+    if backend == "apache":
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = path
+        return response
+    return None
+
+
+def serve_protected_file(request, path, content_type, filename=None, as_attachment=False,
+                         cache_control="private, no-cache", block_size=STREAM_BLOCK_SIZE,
+                         max_range_length=None):
+    """
+    Serve `path` after the caller has done its permission checks.
+
+    Supports If-None-Match / If-Modified-Since (304), single byte ranges
+    (206 / 416) and proxy offloading. The file is streamed in `block_size`
+    blocks (or sent with sendfile by the WSGI server), never read whole into
+    memory. With `max_range_length`, ranges are answered with at most that
+    many bytes and the client asks for the rest as it needs it.
+    """
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = file_etag(stat)
+
+    response = _proxy_response(path, content_type)
+    if response is None:
+        if _not_modified(request, etag, stat.st_mtime):
+            response = HttpResponseNotModified()
+        else:
+            byte_range = None
+            if _range_applies(request, etag, stat.st_mtime):
+                byte_range = parse_range(request.headers.get("Range"), size)
+
+            if byte_range == "invalid":
+                response = HttpResponse(status=416)
+                response["Content-Range"] = f"bytes */{size}"
+            else:
+                start, end = byte_range or (0, size - 1)
+                if byte_range and max_range_length:
+                    end = min(end, start + max_range_length - 1)
+                length = max(end - start + 1, 0)
+                response = FileResponse(
+                    _RangeFile(open(path, "rb"), start, length),
+                    content_type=content_type,
+                    as_attachment=as_attachment,
+                    filename=filename or "",
+                )
+                response.block_size = block_size
+                response["Content-Length"] = str(length)
+                if byte_range:
+                    response.status_code = 206
+                    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+        response["Accept-Ranges"] = "bytes"
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    response["Cache-Control"] = cache_control
+    return response
@@ -0,0 +1,104 @@
+import os
+import secrets
+import zipfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .documents import DOCUMENT_FLAGS, eligible_interns, render_intern_documents, render_workers
+from .models import DocumentJob, InternProfile
+
+
+# =====================
+# Background Document Jobs
+# =====================
+# Views only queue a DocumentJob row; `python manage.py run_document_worker`
+# picks it up, renders the PDFs in a process pool and writes the ZIP to
+# DOCUMENT_JOB_DIR (outside MEDIA_ROOT, see DocumentJobStorage) under a random
+# name; document_job_download is the only way to fetch it.
+
+DOCUMENT_JOB_STALE_AFTER = 2 * 60 * 60  # seconds
+
+def queue_document_job(kind, interns, user=None, label=""):
+    """Queue a job for the eligible interns in `interns`; returns None if there are none."""
+    intern_ids = list(eligible_interns(kind, interns).values_list("id", flat=True))
+    if not intern_ids:
+        return None
+    return DocumentJob.objects.create(
+        kind=kind,
+        intern_ids=intern_ids,
+        total=len(intern_ids),
+        label=label,
+        requested_by=user,
+    )
+
+
+def claim_next_job():
+    """Atomically move the oldest queued job to running, so two workers never share one."""
+    for job_id in DocumentJob.objects.filter(status="queued").order_by("created_at").values_list("id", flat=True)[:10]:
+        claimed = DocumentJob.objects.filter(pk=job_id, status="queued").update(
+            status="running", started_at=timezone.now()
+        )
+        if claimed:
+            return DocumentJob.objects.get(pk=job_id)
+    return None
+
+
+def requeue_stale_jobs():
+    """
+    Put jobs whose worker died mid-run back in the queue. A job counts as
+    stale once it has been running for DOCUMENT_JOB_STALE_AFTER seconds.
+    """
+    stale_after = getattr(settings, "DOCUMENT_JOB_STALE_AFTER", DOCUMENT_JOB_STALE_AFTER)
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    return DocumentJob.objects.filter(status="running", started_at__lt=cutoff).update(
+        status="queued", processed=0, started_at=None
+    )
+
+
+def _zip_name(job):
+    return f"{job.pk}_{secrets.token_urlsafe(16)}.zip"
+
+
+def download_name(job):
+    """File name offered to the browser for the job's ZIP."""
+    label = slugify(job.label) or job.kind
+    return f"{label}_{job.kind}.zip"
+
+
+def run_job(job, max_workers=None):
+    """
+    Render every document of a claimed job into its ZIP, recording progress as
+    it goes. max_workers defaults to render_workers().
+    """
+    flag = DOCUMENT_FLAGS[job.kind]
+    progress = DocumentJob.objects.filter(pk=job.pk)
+
+    interns = list(eligible_interns(job.kind, InternProfile.objects.filter(id__in=job.intern_ids)))
+    progress.update(total=len(interns), processed=0)
+
+    relative_path = _zip_name(job)
+    full_path = DocumentJob._meta.get_field("result_file").storage.path(relative_path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    partial_path = full_path + ".part"
+
+    try:
+        with zipfile.ZipFile(partial_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            for intern_id, filename, pdf_bytes in render_intern_documents(
+                job.kind, interns, max_workers=max_workers or render_workers(),
+            ):
+                if pdf_bytes:
+                    zf.writestr(filename, pdf_bytes)
+                    InternProfile.objects.filter(pk=intern_id).update(**{flag: True})
+                progress.update(processed=F("processed") + 1)
+        os.replace(partial_path, full_path)
+    except Exception as exc:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        progress.update(status="failed", error=str(exc), finished_at=timezone.now())
+        raise
+
+    progress.update(status="done", result_file=relative_path, finished_at=timezone.now())
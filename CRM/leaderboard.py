@@ -0,0 +1,104 @@
+from bisect import bisect_right
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import Count, DecimalField, F, Q, Sum, Value, Window
+from django.db.models.functions import Coalesce, CumeDist, Rank
+
+from .models import Assessment, AssessmentSubmission, InternProfile
+
+
+# =====================
+# Assessment Leaderboard
+# =====================
+# Submitted count, total score, rank and percentile for every intern of a
+# batch come from one query; rank (RANK(), so ties share a place) and
+# percentile (CUME_DIST(), the share of the batch scoring at or below the
+# intern) are window functions evaluated by the database before any
+# LIMIT/OFFSET, so a paged slice still carries batch-wide positions.
+# The per-assessment score matrix is a second, flat query.
+
+def _score_total(in_batch):
+    return Coalesce(
+        Sum('assessment_submissions__score', filter=in_batch),
+        Value(Decimal('0')),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+
+
+def supports_window_functions():
+    return connection.features.supports_over_clause
+
+
+def leaderboard_queryset(batch):
+    """
+    Interns of `batch` ordered by rank, with submitted_count, total_score and,
+    where the database supports window functions, rank and percentile.
+    """
+    # Only submissions to this batch's assessments count
+    in_batch = Q(assessment_submissions__assessment__batch=batch)
+    # values() first so the GROUP BY is just these columns
+    queryset = InternProfile.objects.filter(batch=batch).values(
+        'id', 'unique_id', 'user__first_name', 'user__last_name',
+    ).annotate(
+        submitted_count=Count('assessment_submissions', filter=in_batch),
+        total_score=_score_total(in_batch),
+    )
+    if supports_window_functions():
+        queryset = queryset.annotate(
+            rank=Window(Rank(), order_by=F('total_score').desc()),
+            percentile=Window(CumeDist(), order_by=F('total_score').asc()),
+        )
+    return queryset.order_by('-total_score', 'unique_id')
+
+
+def _rank_in_python(rows):
+    """Fallback for databases without OVER(): same RANK()/CUME_DIST() semantics."""
+    scores = sorted(row['total_score'] for row in rows)
+    previous, rank = None, 0
+    for position, row in enumerate(rows, start=1):
+        if row['total_score'] != previous:
+            rank, previous = position, row['total_score']
+        row['rank'] = rank
+        row['percentile'] = bisect_right(scores, row['total_score']) / len(rows)
+    return rows
+
+
+def batch_assessment_totals(batch):
+    """(number of assessments, total marks available) for the batch."""
+    totals = Assessment.objects.filter(batch=batch).aggregate(count=Count('id'), marks=Sum('total_marks'))
+    return totals['count'], totals['marks'] or 0
+
+
+def batch_leaderboard(batch, offset=0, limit=None, with_matrix=False, matrix_for=None):
+    """
+    Leaderboard rows for `batch` (optionally one page of them). With
+    `with_matrix`, each row also gets `scores`: {assessment_id: score}, or
+    only the row of intern `matrix_for` when that is given.
+    """
+    queryset = leaderboard_queryset(batch)
+    if supports_window_functions():
+        rows = list(queryset[offset:offset + limit] if limit is not None else queryset[offset:])
+    else:
+        rows = _rank_in_python(list(queryset))
+        rows = rows[offset:offset + limit] if limit is not None else rows[offset:]
+
+    for row in rows:
+        row['name'] = f"{row.pop('user__first_name') or ''} {row.pop('user__last_name') or ''}".strip()
+        row['intern_id'] = row.pop('id')
+        row['total_score'] = round(row['total_score'], 2)
+        row['percentile'] = round(row['percentile'] * 100, 1)
+
+    by_intern = {
+        row['intern_id']: row for row in rows
+        if with_matrix and matrix_for in (None, row['intern_id'])
+    }
+    if by_intern:
+        for row in by_intern.values():
+            row['scores'] = {}
+        matrix = AssessmentSubmission.objects.filter(
+            assessment__batch=batch, intern_id__in=by_intern,
+        ).values_list('intern_id', 'assessment_id', 'score')
+        for intern_id, assessment_id, score in matrix:
+            by_intern[intern_id]['scores'][assessment_id] = score
+    return rows
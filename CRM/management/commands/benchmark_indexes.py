@@ -0,0 +1,123 @@
+import re
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from CRM.models import Attendance, DailySessionUpdate, Doubt, User
+
+
+def scenarios(batch, trainer, day):
+    """(name, index it is meant to use, queryset) for the list views that the list indexes serve.
+
+    Migration 0013 dropped the indexes from 0008 that showed no gain here (lessons, recorded sessions,
+    assignments, assessments and an intern's doubts: small per-owner lists the foreign key index already
+    finds and sorts in well under a millisecond).
+    """
+    return [
+        ("attendance list (batch,-date)", "crm_att_batch_date_idx",
+         Attendance.objects.filter(batch=batch).order_by("-date")),
+        ("attendance report (batch,date)", "crm_att_batch_date_idx",
+         Attendance.objects.filter(batch=batch, date=day)),
+        ("doubts trainer unresolved", "crm_doubt_trainer_open_idx",
+         Doubt.objects.filter(trainer=trainer, resolved=False).order_by("-created_at")),
+        ("doubts trainer (-created_at)", "crm_doubt_trainer_created_idx",
+         Doubt.objects.filter(trainer=trainer).order_by("-created_at")),
+        ("doubts admin (-created_at)", "crm_doubt_created_idx",
+         Doubt.objects.order_by("-created_at")),
+        ("daily updates trainer", "crm_dsu_trainer_date_idx",
+         DailySessionUpdate.objects.filter(trainer=trainer).order_by("-date")),
+        ("daily updates batch", "crm_dsu_batch_date_idx",
+         DailySessionUpdate.objects.filter(batch=batch).order_by("-date")),
+    ]
+
+
+def plan_summary(plan):
+    """Indexes used, full scans and temporary sorts from a query plan, e.g. "crm_att_batch_date_idx+TEMP B-TREE"."""
+    parts = []
+    for line in plan.splitlines():
+        # SQLite: "USING INDEX name"; PostgreSQL: "Index Scan using name", "Bitmap Index Scan on name"
+        match = re.search(r"USING (?:COVERING )?INDEX (\w+)|Scan (?:Backward )?using (\w+)|Index Scan on (\w+)", line)
+        if match:
+            parts.append(next(group for group in match.groups() if group))
+        elif re.search(r"\bSCAN\b|Seq Scan", line):
+            parts.append("SCAN")
+        if "TEMP B-TREE" in line or re.search(r"\bSort\b", line):
+            parts.append("TEMP B-TREE")
+    return "+".join(dict.fromkeys(parts)) or plan.strip().splitlines()[0][:40]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the list-view queries that the list indexes (migrations 0008 and 0013) serve, with and without those indexes, "
+        "against the current database. The indexes are dropped inside a transaction that is rolled back. "
+        "Seed a large dataset first, e.g. `seed_demo_data --prefix bench --courses 4 --batches 10 --interns 25 "
+        "--days 120 --doubts 20`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", default="demo", help="Dataset prefix used by seed_demo_data.")
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query (after one warm-up).")
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        intern_user = User.objects.filter(username=f"{prefix}_intern1").select_related("intern_profile__batch").first()
+        trainer_user = User.objects.filter(username=f"{prefix}_trainer1").select_related("trainer_profile").first()
+        if intern_user is None or trainer_user is None:
+            raise CommandError(f'No "{prefix}" dataset found; run `python manage.py seed_demo_data` first.')
+        batch = intern_user.intern_profile.batch
+        day = Attendance.objects.filter(batch=batch).order_by("-date").values_list("date", flat=True).first()
+
+        selected = scenarios(batch, trainer_user.trainer_profile, day)
+        after = {name: self.measure(queryset, options["repeat"], "after") for name, _index, queryset in selected}
+
+        with transaction.atomic():
+            existing = self.existing_indexes(selected)
+            with connection.cursor() as cursor:
+                for index in existing:
+                    cursor.execute(f"DROP INDEX {connection.ops.quote_name(index)}")
+            before = {
+                name: self.measure(queryset, options["repeat"], "before") for name, _index, queryset in selected
+            }
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"Mean of {options['repeat']} runs on {connection.vendor}; {len(existing)} indexes dropped for 'before'.\n"
+        )
+        width = max(len(plan) for _ms, plan in before.values())
+        self.stdout.write(f"{'query':32s} {'before':>9s}  {'plan':{width}s} {'after':>9s}  plan")
+        for name, index, _queryset in selected:
+            (before_ms, before_plan), (after_ms, after_plan) = before[name], after[name]
+            note = "" if index in after_plan else f"  ({index} not used)"
+            self.stdout.write(
+                f"{name:32s} {before_ms:7.2f}ms  {before_plan:{width}s} {after_ms:7.2f}ms  {after_plan}{note}"
+            )
+
+    def existing_indexes(self, selected):
+        wanted = {index for _name, index, _queryset in selected}
+        found = set()
+        with connection.cursor() as cursor:
+            for table in {queryset.model._meta.db_table for _name, _index, queryset in selected}:
+                found.update(connection.introspection.get_constraints(cursor, table))
+        return sorted(wanted & found)
+
+    def measure(self, queryset, repeat, phase):
+        """Mean time to run the SQL and fetch its rows (no model instances), and the plan summary.
+
+        The phase is added to the SQL as a comment: SQLite's statement cache would otherwise hand back the
+        plan prepared before the indexes were dropped.
+        """
+        sql, params = queryset.query.sql_with_params()
+        sql = f"{sql} /* {phase} */"
+        timings = []
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+            plan = "\n".join(str(row[-1]) for row in cursor.fetchall())
+            for run in range(max(repeat, 1) + 1):
+                start = time.perf_counter()
+                cursor.execute(sql, params)
+                cursor.fetchall()
+                if run:  # the first run only warms the cache
+                    timings.append((time.perf_counter() - start) * 1000)
+        return statistics.mean(timings), plan_summary(plan)
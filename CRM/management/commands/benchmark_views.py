@@ -0,0 +1,141 @@
+import json
+import statistics
+import time
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from CRM.models import Batch, User
+
+
+def scenarios(batch):
+    """(name, user role, url) for the views worth watching, against one busy batch."""
+    today = date.today()
+    return [
+        ("attendance_report (day)", "admin",
+         f"{reverse('attendance_report')}?batch={batch.id}&date={today:%Y-%m-%d}"),
+        ("attendance_report (month)", "admin",
+         f"{reverse('attendance_report')}?batch={batch.id}&month={today:%B}&year={today.year}"),
+        ("batch_scores", "admin", f"{reverse('batch_scores')}?batch_id={batch.id}"),
+        ("batch_scores (trainer)", "trainer", f"{reverse('batch_scores')}?batch_id={batch.id}"),
+        ("batch_assessment_scores", "admin", f"{reverse('batch_assessment_scores')}?batch_id={batch.id}"),
+        ("batch_leaderboard_api (matrix)", "trainer",
+         f"{reverse('batch_leaderboard_api', args=[batch.id])}?limit=500&matrix=1"),
+        ("view_projects (admin)", "admin", reverse("view_projects")),
+        ("admin_intern_projects_overview", "admin",
+         f"{reverse('admin_intern_projects_overview')}?batch={batch.id}"),
+        ("daily_update_dashboard", "admin", reverse("daily_update_dashboard")),
+        ("doubt_list (trainer)", "trainer", reverse("doubt_list")),
+        ("intern_overview", "intern", reverse("intern_overview")),
+        ("dashboard (intern)", "intern", reverse("dashboard")),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the heavy CRM views with the test client against the current database (seed it with "
+        "`seed_demo_data`). Reports latency and query counts per view; with --baseline, exits "
+        "non-zero when a view got slower or issues more queries than the saved baseline allows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", default="demo", help="Dataset prefix used by seed_demo_data.")
+        parser.add_argument("--repeat", type=int, default=7, help="Timed requests per view (after one warm-up).")
+        parser.add_argument("--only", action="append", default=[], help="Only run views whose name contains this.")
+        parser.add_argument("--baseline", help="JSON file of previous results to compare against.")
+        parser.add_argument("--save-baseline", help="Write these results to a JSON file.")
+        parser.add_argument("--tolerance", type=float, default=0.25,
+                            help="Allowed median latency increase over the baseline (0.25 = 25%%).")
+        parser.add_argument("--min-ms", type=float, default=5.0,
+                            help="Ignore latency increases smaller than this many milliseconds.")
+        parser.add_argument("--query-slack", type=int, default=0,
+                            help="Extra queries allowed over the baseline before failing.")
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        users = {
+            "admin": User.objects.filter(username=f"{prefix}_admin").first(),
+            "trainer": User.objects.filter(username=f"{prefix}_trainer1").first(),
+            "intern": User.objects.filter(username=f"{prefix}_intern1").first(),
+        }
+        if not all(users.values()):
+            raise CommandError(f'No "{prefix}" dataset found; run `python manage.py seed_demo_data` first.')
+        batch = Batch.objects.filter(pk=users["intern"].intern_profile.batch_id).first()
+        if batch is None:
+            raise CommandError(f"{prefix}_intern1 has no batch.")
+
+        selected = [
+            s for s in scenarios(batch)
+            if not options["only"] or any(part in s[0] for part in options["only"])
+        ]
+        results = {}
+        # The test client talks to "testserver", which ALLOWED_HOSTS may not list
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            clients = {}
+            for role, user in users.items():
+                clients[role] = Client()
+                clients[role].force_login(user)
+
+            self.stdout.write(f"{'view':34s} {'median':>9s} {'p95':>9s} {'queries':>8s}")
+            for name, role, url in selected:
+                results[name] = self.measure(clients[role], name, url, options["repeat"])
+                r = results[name]
+                self.stdout.write(f"{name:34s} {r['median_ms']:7.1f}ms {r['p95_ms']:7.1f}ms {r['queries']:8d}")
+
+        if options["save_baseline"]:
+            with open(options["save_baseline"], "w") as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+            self.stdout.write(f"Saved baseline to {options['save_baseline']}")
+
+        if options["baseline"]:
+            self.compare(results, options)
+
+    def measure(self, client, name, url, repeat):
+        response = client.get(url)  # warm-up: template loading, caches
+        if response.status_code != 200:
+            raise CommandError(f"{name}: GET {url} returned {response.status_code}")
+
+        timings = []
+        queries = 0
+        for _ in range(max(repeat, 1)):
+            # The query log is a bounded deque; once full, captured counts read 0
+            reset_queries()
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = client.get(url)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries = max(queries, len(captured.captured_queries))
+
+        timings.sort()
+        return {
+            "url": url,
+            "median_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+            "queries": queries,
+        }
+
+    def compare(self, results, options):
+        with open(options["baseline"]) as f:
+            baseline = json.load(f)
+
+        regressions = []
+        for name, result in results.items():
+            before = baseline.get(name)
+            if before is None:
+                continue
+            if result["queries"] > before["queries"] + options["query_slack"]:
+                regressions.append(f"{name}: {before['queries']} -> {result['queries']} queries")
+            allowed = before["median_ms"] * (1 + options["tolerance"])
+            if result["median_ms"] > allowed and result["median_ms"] - before["median_ms"] > options["min_ms"]:
+                regressions.append(f"{name}: {before['median_ms']:.1f}ms -> {result['median_ms']:.1f}ms median")
+
+        if regressions:
+            raise CommandError("Performance regressions:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}."))
@@ -0,0 +1,91 @@
+import os
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+
+from CRM.storage import (
+    BLOB_DIR, blob_name, blob_recently_used, content_addressed_fields, content_storage, hash_file, is_blob,
+)
+
+
+class Command(BaseCommand):
+    help = "Move files uploaded before content-addressed storage into MEDIA_ROOT/blobs/, merging duplicates."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report what would change without touching anything.")
+        parser.add_argument("--prune", action="store_true",
+                            help="Also delete blobs no row refers to any more (except ones used in the last hour).")
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        fields = list(content_addressed_fields())
+
+        legacy_names = set()
+        for model, field in fields:
+            names = model.objects.exclude(**{field: ""}).exclude(**{f"{field}__isnull": True}).values_list(field, flat=True)
+            legacy_names.update(name for name in names if not is_blob(name))
+
+        moved = merged = missing = 0
+        reclaimed = 0
+        planned = set()  # blobs a dry run would have created
+        for old_name in sorted(legacy_names):
+            if not content_storage.exists(old_name):
+                missing += 1
+                continue
+
+            with content_storage.open(old_name, "rb") as f:
+                new_name = blob_name(hash_file(File(f)), old_name)
+            duplicate = content_storage.exists(new_name) or new_name in planned
+            size = content_storage.size(old_name)
+            self.stdout.write(f"{old_name} -> {new_name}{' (duplicate)' if duplicate else ''}")
+            if dry_run:
+                planned.add(new_name)
+                merged += duplicate
+                moved += not duplicate
+                reclaimed += size if duplicate else 0
+                continue
+
+            old_path = content_storage.path(old_name)
+            if duplicate:
+                merged += 1
+                reclaimed += size
+            else:
+                new_path = content_storage.path(new_name)
+                os.makedirs(os.path.dirname(new_path), exist_ok=True)
+                os.replace(old_path, new_path)
+                moved += 1
+
+            for model, field in fields:
+                rows = model.objects.filter(**{field: old_name})
+                rows.filter(original_name="").update(original_name=os.path.basename(old_name)[:255])
+                rows.update(**{field: new_name})
+            if duplicate and os.path.exists(old_path):
+                os.remove(old_path)
+
+        if options["prune"]:
+            reclaimed += self.prune(fields, dry_run)
+
+        prefix = "Would move" if dry_run else "Moved"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {moved} files into {BLOB_DIR}/, merged {merged} duplicates "
+            f"({reclaimed / (1024 * 1024):.1f} MB reclaimed); {missing} referenced files were missing."
+        ))
+
+    def prune(self, fields, dry_run):
+        referenced = set()
+        for model, field in fields:
+            referenced.update(model.objects.filter(**{f"{field}__startswith": BLOB_DIR + "/"}).values_list(field, flat=True))
+
+        reclaimed = 0
+        root = content_storage.path(BLOB_DIR)
+        for dirpath, _dirnames, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(path, content_storage.location).replace(os.sep, "/")
+                if name in referenced or filename.endswith(".upload") or blob_recently_used(path):
+                    continue
+                reclaimed += os.path.getsize(path)
+                self.stdout.write(f"orphan {name}")
+                if not dry_run:
+                    os.remove(path)
+        return reclaimed
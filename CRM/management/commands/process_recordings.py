@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from CRM.transcoding import (
+    claim_next_session, ffmpeg_binary, ffprobe_binary, process_session, requeue_stale_sessions,
+)
+
+
+class Command(BaseCommand):
+    help = "Transcode pending recorded sessions into HLS renditions with a poster and duration."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit when no sessions are pending.")
+        parser.add_argument("--poll", type=float, default=30.0, help="Seconds to wait between queue checks.")
+
+    def handle(self, *args, **options):
+        if not ffmpeg_binary() or not ffprobe_binary():
+            raise CommandError("ffmpeg and ffprobe must be installed and on PATH (or set FFMPEG_BINARY / FFPROBE_BINARY).")
+
+        requeued = requeue_stale_sessions()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f"Re-queued {requeued} session(s) left processing by a stopped worker."))
+
+        while True:
+            session = claim_next_session()
+            if session is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll"])
+                continue
+
+            self.stdout.write(f"Processing recorded session #{session.pk} ({session.title})...")
+            try:
+                recorded = process_session(session)
+            except Exception as exc:
+                self.stderr.write(self.style.ERROR(f"Session #{session.pk} failed: {exc}"))
+            else:
+                if recorded:
+                    self.stdout.write(self.style.SUCCESS(f"Session #{session.pk} ready."))
+                else:
+                    self.stdout.write(f"Session #{session.pk} changed while processing; output discarded.")
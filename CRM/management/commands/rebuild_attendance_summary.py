@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from CRM.attendance import rebuild_monthly_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild the AttendanceMonthlySummary rollup from all Attendance rows."
+
+    def handle(self, *args, **options):
+        count = rebuild_monthly_summaries()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} monthly attendance summary rows."))
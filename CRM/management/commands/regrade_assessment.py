@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from CRM.models import Assessment
+from CRM.scoring import regrade_assessment
+
+
+class Command(BaseCommand):
+    help = (
+        "Rescore stored assessment submissions against the current answer key, e.g. after a "
+        "correct_option fix. Only scores that change are written."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("assessment_ids", nargs="*", type=int, help="Assessments to regrade.")
+        parser.add_argument("--batch", type=int, help="Regrade every assessment of this batch id.")
+        parser.add_argument("--all", action="store_true", help="Regrade every assessment.")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would change without saving.")
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            assessments = Assessment.objects.all()
+        elif options["batch"]:
+            assessments = Assessment.objects.filter(batch_id=options["batch"])
+        elif options["assessment_ids"]:
+            assessments = Assessment.objects.filter(id__in=options["assessment_ids"])
+            missing = set(options["assessment_ids"]) - set(assessments.values_list("id", flat=True))
+            if missing:
+                raise CommandError(f"Unknown assessment id(s): {', '.join(map(str, sorted(missing)))}")
+        else:
+            raise CommandError("Give assessment ids, --batch <id> or --all.")
+
+        totals = {"submissions": 0, "changed": 0}
+        for assessment in assessments.order_by("id"):
+            result = regrade_assessment(assessment, dry_run=options["dry_run"])
+            totals["submissions"] += result["submissions"]
+            totals["changed"] += result["changed"]
+            old_marks, new_marks = result["total_marks"]
+            marks = f", total marks {old_marks} -> {new_marks}" if old_marks != new_marks else ""
+            self.stdout.write(
+                f"#{assessment.pk} {assessment.title}: {result['changed']} of {result['submissions']} "
+                f"submission(s) rescored{marks}"
+            )
+
+        verb = "would change" if options["dry_run"] else "changed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['changed']} of {totals['submissions']} submission score(s) {verb}."
+        ))
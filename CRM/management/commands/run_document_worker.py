@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from CRM.jobs import claim_next_job, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = "Process queued undertaking/certificate/LOR generation jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit when the queue is empty.")
+        parser.add_argument("--workers", type=int, default=None,
+                            help="PDF render processes per job (default: PDF_RENDER_WORKERS or one per core).")
+        parser.add_argument("--poll", type=float, default=5.0, help="Seconds to wait between queue checks.")
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f"Re-queued {requeued} job(s) left running by a stopped worker."))
+
+        while True:
+            job = claim_next_job()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll"])
+                continue
+
+            self.stdout.write(f"Running {job} for {job.total} interns...")
+            try:
+                run_job(job, max_workers=options["workers"])
+            except Exception as exc:
+                self.stderr.write(self.style.ERROR(f"Job #{job.pk} failed: {exc}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"Job #{job.pk} finished."))
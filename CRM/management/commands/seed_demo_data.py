@@ -0,0 +1,344 @@
+import random
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from CRM import counters
+from CRM.attendance import rebuild_monthly_summaries
+from CRM.models import (
+    Assessment, AssessmentMCQ, AssessmentSubmission, Assignment, AssignmentSubmission, Attendance, Batch,
+    Course, DailySessionUpdate, Doubt, DoubtResolution, InternProfile, InternProject, Project,
+    ProjectSubmission, TrainerProfile, User,
+)
+
+
+TOPICS = [
+    "Variables and types", "Control flow", "Functions", "Collections", "OOP basics", "Modules",
+    "File handling", "Error handling", "Testing", "SQL joins", "REST APIs", "Django models",
+    "Django views", "Templates", "Forms", "Authentication", "Deployment", "Git workflows",
+]
+
+
+@contextmanager
+def backdated(*fields):
+    """Let bulk_create write explicit values into auto_now_add fields."""
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def field(model, name):
+    return model._meta.get_field(name)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a realistic demo dataset (courses, batches, trainers, interns, a year of attendance, "
+        "coursework, submissions, doubts and projects) for load testing. All demo users share the "
+        "password given with --password."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", default="demo", help="Prefix for usernames, course and batch names.")
+        parser.add_argument("--courses", type=int, default=3)
+        parser.add_argument("--batches", type=int, default=4, help="Batches per course.")
+        parser.add_argument("--trainers", type=int, default=6)
+        parser.add_argument("--interns", type=int, default=25, help="Interns per batch.")
+        parser.add_argument("--days", type=int, default=365, help="Days of attendance (Sundays are skipped).")
+        parser.add_argument("--assignments", type=int, default=8, help="Assignments per batch.")
+        parser.add_argument("--assessments", type=int, default=4, help="Assessments per batch.")
+        parser.add_argument("--mcqs", type=int, default=20, help="Questions per assessment.")
+        parser.add_argument("--doubts", type=int, default=3, help="Doubts per intern.")
+        parser.add_argument("--projects", type=int, default=2, help="Projects per batch.")
+        parser.add_argument("--password", default="demo12345")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed, for repeatable datasets.")
+        parser.add_argument("--flush", action="store_true", help="Delete an existing dataset with this prefix first.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.prefix = prefix = options["prefix"]
+
+        existing = Course.objects.filter(name__startswith=f"{prefix} ")
+        if existing.exists() or User.objects.filter(username__startswith=f"{prefix}_").exists():
+            if not options["flush"]:
+                raise CommandError(f'A "{prefix}" dataset already exists; pass --flush to replace it.')
+            self.flush()
+
+        with transaction.atomic():
+            self.seed(options)
+
+        # bulk_create skips the signals that keep these in step
+        summaries = rebuild_monthly_summaries()
+        counters.invalidate_global()
+        counters.invalidate_all_interns()
+        counters.invalidate_trainers(TrainerProfile.objects.values_list("user_id", flat=True))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {Course.objects.filter(name__startswith=f'{prefix} ').count()} courses, "
+            f"{self.batch_count} batches, {len(self.trainers)} trainers, {len(self.interns)} interns, "
+            f"{self.attendance_count} attendance rows ({summaries} monthly summaries). "
+            f"Log in as {prefix}_admin / {prefix}_trainer1 / {prefix}_intern1 with the demo password."
+        ))
+
+    def flush(self):
+        prefix = self.prefix
+        self.stdout.write(f'Deleting the existing "{prefix}" dataset...')
+        with transaction.atomic():
+            if self.table_exists(Project):
+                Project.objects.filter(title__startswith=f"{prefix} ").delete()
+            Course.objects.filter(name__startswith=f"{prefix} ").delete()
+            # InternProfile.delete() removes the user too, but a queryset delete does not
+            User.objects.filter(username__startswith=f"{prefix}_").delete()
+
+    @staticmethod
+    def table_exists(model):
+        return model._meta.db_table in connection.introspection.table_names()
+
+    def aware(self, day, hour=10):
+        return timezone.make_aware(datetime.combine(day, time(hour, self.rng.randrange(60))))
+
+    # -----------------------
+    # Seeding
+    # -----------------------
+    def seed(self, options):
+        rng, prefix = self.rng, self.prefix
+        password = make_password(options["password"])
+        today = timezone.localdate()
+        start = today - timedelta(days=options["days"] - 1)
+
+        # People
+        User.objects.create(
+            username=f"{prefix}_admin", password=password, role="admin",
+            is_staff=True, is_superuser=True, first_name="Demo", last_name="Admin",
+        )
+        trainer_users = User.objects.bulk_create([
+            User(username=f"{prefix}_trainer{i}", password=password, role="trainer",
+                 first_name="Trainer", last_name=str(i), email=f"{prefix}_trainer{i}@example.com")
+            for i in range(1, options["trainers"] + 1)
+        ])
+        self.trainers = TrainerProfile.objects.bulk_create([
+            TrainerProfile(user=user, expertise=rng.choice(["Python", "Web", "Data", "DevOps"]))
+            for user in trainer_users
+        ])
+
+        # Courses and batches
+        batches = []
+        for c in range(1, options["courses"] + 1):
+            course = Course.objects.create(name=f"{prefix} Course {c}", description="Generated demo course")
+            for b in range(1, options["batches"] + 1):
+                batches.append(Batch(
+                    name=f"{prefix} Batch {c}.{b}", course=course,
+                    trainer=self.trainers[len(batches) % len(self.trainers)],
+                    start_date=start, end_date=today + timedelta(days=30), timings="10:00 - 13:00",
+                ))
+        batches = Batch.objects.bulk_create(batches)
+        self.batch_count = len(batches)
+
+        # Interns, numbered on from the last VCLPI id like registration does
+        last = InternProfile.objects.filter(unique_id__startswith="VCLPI").order_by("-id").first()
+        next_number = int(last.unique_id.replace("VCLPI", "")) + 1 if last else 1
+        intern_users = User.objects.bulk_create([
+            User(username=f"{prefix}_intern{i}", password=password, role="intern",
+                 first_name="Intern", last_name=str(i), email=f"{prefix}_intern{i}@example.com")
+            for i in range(1, len(batches) * options["interns"] + 1)
+        ])
+        self.interns = InternProfile.objects.bulk_create([
+            InternProfile(
+                user=user, unique_id=f"VCLPI{next_number + i:03d}", batch=batches[i // options["interns"]],
+                college="Demo College", qualification="B.Tech", project_title=f"Capstone {i + 1}",
+                internship_status=rng.choices(["Ongoing", "Completed", "Dropped"], [70, 25, 5])[0],
+            )
+            for i, user in enumerate(intern_users)
+        ])
+        interns_by_batch = {}
+        for intern in self.interns:
+            interns_by_batch.setdefault(intern.batch_id, []).append(intern)
+
+        self.seed_attendance(batches, interns_by_batch, start, options["days"])
+        self.seed_daily_updates(batches, start, options["days"])
+        self.seed_assignments(batches, interns_by_batch, start, today, options["assignments"])
+        self.seed_assessments(batches, interns_by_batch, start, today, options["assessments"], options["mcqs"])
+        self.seed_doubts(interns_by_batch, batches, start, options["days"], options["doubts"])
+        self.seed_projects(batches, interns_by_batch, start, today, options["projects"])
+
+    def seed_attendance(self, batches, interns_by_batch, start, days):
+        rng = self.rng
+        rows = []
+        self.attendance_count = 0
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            if day.weekday() == 6:
+                continue
+            for batch in batches:
+                for intern in interns_by_batch.get(batch.id, []):
+                    rows.append(Attendance(
+                        intern=intern, trainer_id=batch.trainer_id, batch=batch, date=day,
+                        status="Present" if rng.random() < 0.85 else "Absent",
+                    ))
+            if len(rows) >= 5000:
+                Attendance.objects.bulk_create(rows)
+                self.attendance_count += len(rows)
+                rows = []
+        Attendance.objects.bulk_create(rows)
+        self.attendance_count += len(rows)
+
+    def seed_daily_updates(self, batches, start, days):
+        rng = self.rng
+        rows = []
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            if day.weekday() == 6:
+                continue
+            for batch in batches:
+                rows.append(DailySessionUpdate(
+                    trainer_id=batch.trainer_id, batch=batch, date=day, created_at=self.aware(day, 13),
+                    topic_covered=rng.choice(TOPICS), summary="Covered the planned material.",
+                ))
+        with backdated(field(DailySessionUpdate, "date"), field(DailySessionUpdate, "created_at")):
+            DailySessionUpdate.objects.bulk_create(rows, batch_size=2000)
+
+    def seed_assignments(self, batches, interns_by_batch, start, today, per_batch):
+        rng = self.rng
+        span = max((today - start).days, 1)
+        assignments = []
+        for batch in batches:
+            for n in range(1, per_batch + 1):
+                created = start + timedelta(days=span * n // (per_batch + 1))
+                assignments.append(Assignment(
+                    batch=batch, trainer_id=batch.trainer_id, title=f"Assignment {n}: {rng.choice(TOPICS)}",
+                    description="Demo assignment", deadline=self.aware(created + timedelta(days=7), 23),
+                    created_at=self.aware(created),
+                ))
+        with backdated(field(Assignment, "created_at")):
+            assignments = Assignment.objects.bulk_create(assignments)
+
+        submissions = []
+        for assignment in assignments:
+            for intern in interns_by_batch.get(assignment.batch_id, []):
+                if rng.random() < 0.8:
+                    graded = rng.random() < 0.7
+                    submissions.append(AssignmentSubmission(
+                        assignment=assignment, intern=intern, file="assignment_submissions/demo.pdf",
+                        submitted_at=assignment.deadline - timedelta(days=rng.randrange(1, 6)),
+                        graded=graded, score=rng.randrange(40, 101) if graded else None,
+                    ))
+        with backdated(field(AssignmentSubmission, "submitted_at")):
+            AssignmentSubmission.objects.bulk_create(submissions, batch_size=2000)
+
+    def seed_assessments(self, batches, interns_by_batch, start, today, per_batch, mcq_count):
+        rng = self.rng
+        span = max((today - start).days, 1)
+        assessments = []
+        for batch in batches:
+            for n in range(1, per_batch + 1):
+                created = start + timedelta(days=span * n // (per_batch + 1))
+                assessments.append(Assessment(
+                    batch=batch, trainer_id=batch.trainer_id, title=f"Assessment {n}",
+                    question_file="assessments/questions/demo.txt", total_marks=mcq_count,
+                    created_at=self.aware(created),
+                ))
+        with backdated(field(Assessment, "created_at")):
+            assessments = Assessment.objects.bulk_create(assessments)
+
+        AssessmentMCQ.objects.bulk_create([
+            AssessmentMCQ(
+                assessment=assessment, question_text=f"Question {q} about {rng.choice(TOPICS)}?",
+                option_1="Option A", option_2="Option B", option_3="Option C", option_4="Option D",
+                correct_option=rng.randint(1, 4),
+            )
+            for assessment in assessments
+            for q in range(1, mcq_count + 1)
+        ], batch_size=2000)
+        mcqs = {}
+        for mcq_id, assessment_id, correct in AssessmentMCQ.objects.filter(
+            assessment__in=assessments
+        ).values_list("id", "assessment_id", "correct_option"):
+            mcqs.setdefault(assessment_id, []).append((mcq_id, correct))
+
+        submissions = []
+        for assessment in assessments:
+            questions = mcqs.get(assessment.id, [])
+            for intern in interns_by_batch.get(assessment.batch_id, []):
+                if rng.random() >= 0.75:
+                    continue
+                answers = {
+                    str(mcq_id): correct if rng.random() < 0.7 else rng.randint(1, 4)
+                    for mcq_id, correct in questions
+                }
+                right = sum(answers[str(mcq_id)] == correct for mcq_id, correct in questions)
+                submissions.append(AssessmentSubmission(
+                    assessment=assessment, intern=intern, answers=answers, score=right,
+                    submitted_at=assessment.created_at + timedelta(days=rng.randrange(1, 4)),
+                ))
+        with backdated(field(AssessmentSubmission, "submitted_at")):
+            AssessmentSubmission.objects.bulk_create(submissions, batch_size=2000)
+
+    def seed_doubts(self, interns_by_batch, batches, start, days, per_intern):
+        rng = self.rng
+        trainer_for = {batch.id: batch.trainer_id for batch in batches}
+        doubts = []
+        for batch_id, interns in interns_by_batch.items():
+            for intern in interns:
+                for _ in range(per_intern):
+                    day = start + timedelta(days=rng.randrange(days))
+                    doubts.append(Doubt(
+                        intern=intern, trainer_id=trainer_for[batch_id], batch_id=batch_id,
+                        question=f"How does {rng.choice(TOPICS).lower()} work?",
+                        created_at=self.aware(day, 15), resolved=rng.random() < 0.7,
+                    ))
+        with backdated(field(Doubt, "created_at")):
+            doubts = Doubt.objects.bulk_create(doubts, batch_size=2000)
+        DoubtResolution.objects.bulk_create([
+            DoubtResolution(doubt=doubt, answer="See the session notes.")
+            for doubt in doubts if doubt.resolved
+        ], batch_size=2000)
+
+    def seed_projects(self, batches, interns_by_batch, start, today, per_batch):
+        missing = [m.__name__ for m in (Project, ProjectSubmission, InternProject) if not self.table_exists(m)]
+        if missing:
+            self.stderr.write(self.style.WARNING(
+                f"Skipping projects: no table for {', '.join(missing)} (run makemigrations/migrate first)."
+            ))
+            return
+
+        rng = self.rng
+        submissions = []
+        intern_projects = []
+        for batch in batches:
+            interns = interns_by_batch.get(batch.id, [])
+            for n in range(1, per_batch + 1):
+                project = Project.objects.create(
+                    title=f"{self.prefix} Project {batch.id}.{n}", introduction="Demo project",
+                    status="assigned", trainer_id=batch.trainer_id,
+                )
+                project.batches.add(batch)
+                for intern in interns:
+                    status = rng.choices(["not_submitted", "submitted", "resubmitted", "reviewed"], [20, 40, 10, 30])[0]
+                    submissions.append(ProjectSubmission(
+                        project=project, intern=intern, status=status,
+                        github_url=f"https://github.com/{self.prefix}/{intern.unique_id.lower()}-{n}",
+                        submitted_at=None if status == "not_submitted" else self.aware(
+                            start + timedelta(days=rng.randrange(max((today - start).days, 1)))
+                        ),
+                    ))
+            for intern in interns:
+                viewed = rng.random() < 0.5
+                intern_projects.append(InternProject(
+                    intern=intern, trainer_id=batch.trainer_id, project_title=intern.project_title,
+                    description="Demo capstone project",
+                    github_url=f"https://github.com/{self.prefix}/{intern.unique_id.lower()}",
+                    status="Viewed" if viewed else "Pending",
+                    score=rng.randrange(50, 101) if viewed else None,
+                    submitted_at=self.aware(start + timedelta(days=rng.randrange(max((today - start).days, 1)))),
+                ))
+        ProjectSubmission.objects.bulk_create(submissions, batch_size=2000)
+        with backdated(field(InternProject, "submitted_at")):
+            InternProject.objects.bulk_create(intern_projects, batch_size=2000)
@@ -0,0 +1,177 @@
+import codecs
+import re
+
+from django.db import transaction
+
+from .models import Assessment, AssessmentMCQ
+
+
+# =====================
+# MCQ Ingestion
+# =====================
+# A question paper is plain text made of blank-line separated blocks:
+#
+#     What does HTTP stand for?
+#     HyperText Transfer Protocol
+#     High Transfer Text Protocol
+#     HyperText Transmission Process
+#     Home Tool Transfer Protocol
+#     Answer: 1
+#
+# The first line is the question, the last line is "<label>: <option number>"
+# and the lines in between are 2-4 options. Every block is validated before
+# anything is written, so a paper with one bad block creates nothing and the
+# trainer gets every problem at once, by line number.
+#
+# Uploads are parsed as a stream of lines (TXT in chunks, PDF page by page),
+# so memory does not grow with the size of the bank. PDF text extraction
+# rarely keeps blank lines and a block may run across a page break, so an
+# "Answer: <n>" line also ends a block.
+
+MIN_OPTIONS = 2
+MAX_OPTIONS = 4
+MAX_OPTION_LENGTH = AssessmentMCQ._meta.get_field("option_1").max_length
+BULK_BATCH_SIZE = 500
+
+ANSWER_RE = re.compile(r"^(?:correct\s+)?(?:answer|ans)\s*:\s*\d+$", re.IGNORECASE)
+
+
+def _blocks(lines):
+    """
+    Yield (first line number, [lines]) for each block of `lines`, ending a
+    block at a blank line or right after its answer line.
+    """
+    start, block = None, []
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if line:
+            if start is None:
+                start = number
+            block.append(line)
+            if not ANSWER_RE.match(line):
+                continue
+        if block:
+            yield start, block
+            start, block = None, []
+    if block:
+        yield start, block
+
+
+def _parse_block(start, lines):
+    """Return (mcq dict, None) for a valid block, or (None, error message)."""
+    if len(lines) < MIN_OPTIONS + 2:
+        return None, f"Line {start}: expected a question, {MIN_OPTIONS}-{MAX_OPTIONS} options and an answer line."
+
+    question_text, options, answer = lines[0], lines[1:-1], lines[-1]
+    answer_line = start + len(lines) - 1
+    if len(options) > MAX_OPTIONS:
+        return None, f"Line {start}: {len(options)} options found, at most {MAX_OPTIONS} are allowed."
+
+    label, sep, value = answer.partition(":")
+    if not sep:
+        return None, f'Line {answer_line}: the last line must be the answer, e.g. "Answer: 2".'
+    try:
+        correct_option = int(value.strip())
+    except ValueError:
+        return None, f'Line {answer_line}: "{value.strip()}" is not an option number.'
+    if not 1 <= correct_option <= len(options):
+        return None, f"Line {answer_line}: answer {correct_option} is not one of the {len(options)} options."
+
+    for offset, option in enumerate(options, start=1):
+        if len(option) > MAX_OPTION_LENGTH:
+            return None, f"Line {start + offset}: options are limited to {MAX_OPTION_LENGTH} characters."
+
+    return {
+        "question_text": question_text,
+        "options": options,
+        "correct_option": correct_option,
+    }, None
+
+
+def iter_mcqs(lines):
+    """Yield (mcq, error) per block of `lines`, one of the two being None."""
+    for start, block in _blocks(lines):
+        yield _parse_block(start, block)
+
+
+def parse_mcq_lines(lines):
+    """
+    Parse and validate a whole paper. Returns (mcqs, errors); `errors` lists
+    one message per malformed block and is empty when the paper is usable.
+    """
+    mcqs, errors = [], []
+    for mcq, error in iter_mcqs(lines):
+        if error:
+            errors.append(error)
+        else:
+            mcqs.append(mcq)
+    if not mcqs and not errors:
+        errors.append("No questions found in the file.")
+    return mcqs, errors
+
+
+def parse_mcq_text(text):
+    return parse_mcq_lines(text.splitlines())
+
+
+# -----------------------
+# Upload readers
+# -----------------------
+def txt_lines(file):
+    """Decoded lines of an uploaded text file, read in chunks."""
+    file.seek(0)
+    return codecs.iterdecode(file, "utf-8-sig")
+
+
+def pdf_lines(file):
+    """Text lines of an uploaded PDF, extracted one page at a time."""
+    # Only PDF uploads need pypdf, so it is not imported with the views
+    from pypdf import PdfReader
+
+    file.seek(0)
+    for page in PdfReader(file).pages:
+        yield from (page.extract_text() or "").splitlines()
+
+
+def parse_mcq_txt(file):
+    try:
+        return parse_mcq_lines(txt_lines(file))
+    except UnicodeDecodeError:
+        return [], ["The file is not UTF-8 encoded text."]
+
+
+def parse_mcq_pdf(file):
+    from pypdf.errors import PyPdfError
+
+    try:
+        return parse_mcq_lines(pdf_lines(file))
+    except PyPdfError:
+        return [], ["The PDF could not be read."]
+
+
+def create_assessment_with_mcqs(*, batch_id, trainer, title, question_file, mcqs):
+    """Create the assessment and all of its MCQs in one transaction."""
+    with transaction.atomic():
+        assessment = Assessment.objects.create(
+            batch_id=batch_id,
+            trainer=trainer,
+            title=title,
+            question_file=question_file,
+            total_marks=len(mcqs),
+        )
+        AssessmentMCQ.objects.bulk_create(
+            [
+                AssessmentMCQ(
+                    assessment=assessment,
+                    question_text=mcq["question_text"],
+                    option_1=mcq["options"][0],
+                    option_2=mcq["options"][1],
+                    option_3=mcq["options"][2] if len(mcq["options"]) > 2 else "",
+                    option_4=mcq["options"][3] if len(mcq["options"]) > 3 else "",
+                    correct_option=mcq["correct_option"],
+                )
+                for mcq in mcqs
+            ],
+            batch_size=BULK_BATCH_SIZE,
+        )
+    return assessment
@@ -0,0 +1,173 @@
+import json
+import logging
+import os
+import re
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+# =====================
+# Request Metrics Store
+# =====================
+# RequestMetricsMiddleware (CRM/middleware.py) appends one JSON line per
+# request to REQUEST_METRICS_DIR/requests-YYYY-MM-DD.jsonl. Files older than
+# REQUEST_METRICS_RETENTION_DAYS are deleted when a new day's file starts, so
+# the store rolls without any cleanup job. summarize() aggregates the recent
+# lines per view for the admin dashboard.
+
+FILE_PREFIX = "requests-"
+DEFAULT_RETENTION_DAYS = 7
+DEFAULT_QUERY_BUDGET = 50
+
+_SELECT_LIST_RE = re.compile(r"^SELECT .+? FROM ", re.S)
+_IN_LIST_RE = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)")
+_NUMBER_RE = re.compile(r"\b\d+\b")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_SPACE_RE = re.compile(r"\s+")
+
+_last_rotation_day = None
+
+
+def metrics_dir():
+    return getattr(settings, "REQUEST_METRICS_DIR", os.path.join(settings.BASE_DIR, "request_metrics"))
+
+
+def retention_days():
+    return getattr(settings, "REQUEST_METRICS_RETENTION_DAYS", DEFAULT_RETENTION_DAYS)
+
+
+def query_budget(view_name):
+    budgets = getattr(settings, "REQUEST_QUERY_BUDGETS", {})
+    return budgets.get(view_name, getattr(settings, "REQUEST_QUERY_BUDGET_DEFAULT", DEFAULT_QUERY_BUDGET))
+
+
+def fingerprint(sql):
+    """
+    SQL with the column list, literals and IN-list lengths folded, so repeats
+    of one query shape match and read as "SELECT … FROM table WHERE ...".
+    """
+    sql = _SELECT_LIST_RE.sub("SELECT … FROM ", sql)
+    sql = _IN_LIST_RE.sub("(%s…)", sql)
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+# -----------------------
+# Writing
+# -----------------------
+def _path_for(day):
+    return os.path.join(metrics_dir(), f"{FILE_PREFIX}{day:%Y-%m-%d}.jsonl")
+
+
+def _rotate(today):
+    """Delete day files that have fallen out of the retention window."""
+    oldest = today - timedelta(days=retention_days() - 1)
+    try:
+        names = os.listdir(metrics_dir())
+    except OSError:
+        return
+    for name in names:
+        if not (name.startswith(FILE_PREFIX) and name.endswith(".jsonl")):
+            continue
+        try:
+            day = datetime.strptime(name[len(FILE_PREFIX):-len(".jsonl")], "%Y-%m-%d").date()
+        except ValueError:
+            continue
+        if day < oldest:
+            try:
+                os.remove(os.path.join(metrics_dir(), name))
+            except OSError:
+                pass
+
+
+def record(entry):
+    """Append one request's metrics. Never raises: metrics must not break requests."""
+    global _last_rotation_day
+
+    today = datetime.now().date()
+    try:
+        os.makedirs(metrics_dir(), exist_ok=True)
+        if _last_rotation_day != today:
+            _rotate(today)
+            _last_rotation_day = today
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        # One write() per line on an O_APPEND file, so lines from
+        # concurrent workers do not interleave
+        with open(_path_for(today), "a", encoding="utf-8") as f:
+            f.write(line)
+    except Exception:
+        logger.warning("Could not record request metrics", exc_info=True)
+
+
+# -----------------------
+# Reading
+# -----------------------
+def iter_entries(hours=24):
+    cutoff = time.time() - hours * 3600
+    today = datetime.now().date()
+    days = min(retention_days(), hours // 24 + 2)
+    for offset in range(days - 1, -1, -1):
+        try:
+            f = open(_path_for(today - timedelta(days=offset)), encoding="utf-8")
+        except OSError:
+            continue
+        with f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("ts", 0) >= cutoff:
+                    yield entry
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def summarize(hours=24):
+    """Per-view aggregates over the last `hours`, worst offenders first."""
+    grouped = defaultdict(list)
+    for entry in iter_entries(hours):
+        grouped[entry["view"]].append(entry)
+
+    rows = []
+    for view, entries in grouped.items():
+        queries = [e["queries"] for e in entries]
+        sql_ms = [e["sql_ms"] for e in entries]
+        duplicates = defaultdict(lambda: {"count": 0, "requests": 0})
+        for e in entries:
+            for dup in e.get("duplicates", []):
+                item = duplicates[dup["sql"]]
+                item["count"] = max(item["count"], dup["count"])
+                item["requests"] += 1
+        rows.append({
+            "view": view,
+            "requests": len(entries),
+            "budget": query_budget(view),
+            "over_budget": sum(1 for e in entries if e.get("over_budget")),
+            "avg_queries": round(sum(queries) / len(entries), 1),
+            "p95_queries": _percentile(queries, 0.95),
+            "max_queries": max(queries),
+            "avg_sql_ms": round(sum(sql_ms) / len(entries), 1),
+            "p95_sql_ms": round(_percentile(sql_ms, 0.95), 1),
+            "avg_total_ms": round(sum(e["total_ms"] for e in entries) / len(entries), 1),
+            "avg_template_ms": round(sum(e.get("template_ms", 0) for e in entries) / len(entries), 1),
+            "avg_bytes": int(sum(e.get("bytes") or 0 for e in entries) / len(entries)),
+            "duplicates": sorted(
+                ({"sql": sql, **stats} for sql, stats in duplicates.items()),
+                key=lambda d: -d["count"],
+            )[:5],
+        })
+    rows.sort(key=lambda r: (-r["over_budget"], -r["p95_queries"]))
+    return rows
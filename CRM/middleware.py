@@ -0,0 +1,164 @@
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+# =====================
+# Request Metrics
+# =====================
+# For each request: the resolved view name, number of SQL queries and their
+# total time, queries repeated with the same shape (the N+1 signature),
+# template render time and response size. Entries go to the rolling store in
+# CRM/metrics.py; requests over REQUEST_QUERY_BUDGETS[view] (or
+# REQUEST_QUERY_BUDGET_DEFAULT) are flagged and logged.
+#
+# A streamed response (CSV/XLSX exports, ZIPs) runs most of its queries while
+# the server iterates over it, after the view has returned, so its entry is
+# written when the stream is closed and covers the streaming too. Responses
+# streaming a file (FileResponse) are recorded straight away: they do not
+# query, and wrapping them would give up the server's sendfile path.
+
+_current = ContextVar("request_metrics", default=None)
+
+
+class _RequestRecorder:
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_seconds += time.perf_counter() - start
+            self.queries += 1
+            self.shapes[sql] += 1
+
+    def duplicates(self, limit=5):
+        repeated = Counter()
+        for sql, count in self.shapes.items():
+            repeated[metrics.fingerprint(sql)] += count
+        return [
+            {"sql": sql[:300], "count": count}
+            for sql, count in repeated.most_common(limit)
+            if count > 1
+        ]
+
+
+@contextmanager
+def _recording(recorder):
+    """Count the queries (and template renders) of this thread into `recorder`."""
+    token = _current.set(recorder)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            yield
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed_template_render():
+    """
+    Add the time spent in the block to the request being recorded, if any.
+    Used by CRM.template_backends; nested renders are only counted once.
+    """
+    recorder = _current.get()
+    if recorder is None:
+        yield
+        return
+    recorder.template_depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.template_depth -= 1
+        if recorder.template_depth == 0:
+            recorder.template_seconds += time.perf_counter() - start
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "REQUEST_METRICS_ENABLED", True)
+        self.sample_rate = getattr(settings, "REQUEST_METRICS_SAMPLE_RATE", 1.0)
+
+    def __call__(self, request):
+        if not self.enabled or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        recorder = _RequestRecorder()
+        start = time.perf_counter()
+        with _recording(recorder):
+            response = self.get_response(request)
+
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return response
+        view = match.view_name or match._func_path
+
+        if response.streaming and not response.is_async and getattr(response, "file_to_stream", None) is None:
+            response.streaming_content = self._recorded_stream(
+                response.streaming_content, recorder,
+                lambda size: self._record(request, response, view, recorder, start, size),
+            )
+            return response
+
+        if response.streaming:
+            size = int(response["Content-Length"]) if response.has_header("Content-Length") else None
+        else:
+            size = len(response.content)
+        self._record(request, response, view, recorder, start, size)
+        if settings.DEBUG:
+            response["X-Query-Count"] = str(recorder.queries)
+            response["X-SQL-Time-Ms"] = f"{recorder.sql_seconds * 1000:.1f}"
+        return response
+
+    @staticmethod
+    def _recorded_stream(content, recorder, finish):
+        """Yield `content` while still recording; `finish(bytes sent)` when it closes."""
+        size = 0
+        try:
+            with _recording(recorder):
+                for chunk in content:
+                    size += len(chunk)
+                    yield chunk
+        finally:
+            finish(size)
+
+    def _record(self, request, response, view, recorder, start, size):
+        budget = metrics.query_budget(view)
+        over_budget = bool(budget) and recorder.queries > budget
+        metrics.record({
+            "ts": round(time.time(), 3),
+            "view": view,
+            "method": request.method,
+            "path": request.path[:200],
+            "status": response.status_code,
+            "user": request.user.pk if getattr(request, "user", None) and request.user.is_authenticated else None,
+            "queries": recorder.queries,
+            "sql_ms": round(recorder.sql_seconds * 1000, 2),
+            "template_ms": round(recorder.template_seconds * 1000, 2),
+            "total_ms": round((time.perf_counter() - start) * 1000, 2),
+            "bytes": size,
+            "duplicates": recorder.duplicates(),
+            "over_budget": over_budget,
+        })
+        if over_budget:
+            logger.warning("%s ran %d queries (budget %d) for %s", view, recorder.queries, budget, request.path)
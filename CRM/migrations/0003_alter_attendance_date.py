@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('CRM', '0002_curriculum_batch'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attendance',
+            name='date',
+            field=models.DateField(default=django.utils.timezone.localdate),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_summaries(apps, schema_editor):
+    # The monthly report reads only the rollup, so fill it for existing rows
+    from CRM.attendance import rebuild_monthly_summaries
+
+    rebuild_monthly_summaries(
+        apps.get_model('CRM', 'Attendance'),
+        apps.get_model('CRM', 'AttendanceMonthlySummary'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('CRM', '0003_alter_attendance_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceMonthlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('present_count', models.PositiveIntegerField(default=0)),
+                ('absent_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='CRM.batch')),
+                ('intern', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='CRM.internprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['batch', 'year', 'month'], name='crm_attsum_batch_month_idx')],
+                'unique_together': {('intern', 'batch', 'year', 'month')},
+            },
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
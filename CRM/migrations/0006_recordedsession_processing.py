@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('CRM', '0005_documentjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recordedsession',
+            name='processing_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='recordedsession',
+            name='processing_error',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='recordedsession',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='recordedsession',
+            name='duration',
+            field=models.DurationField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='recordedsession',
+            name='hls_dir',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='recordedsession',
+            name='poster',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='recordedsession',
+            name='renditions',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
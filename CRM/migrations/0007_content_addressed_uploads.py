@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:20
+
+import CRM.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('CRM', '0006_recordedsession_processing'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='assignment',
+            name='file',
+            field=models.FileField(blank=True, null=True, storage=CRM.storage.get_content_storage, upload_to='assignments/'),
+        ),
+        migrations.AlterField(
+            model_name='assignmentsubmission',
+            name='file',
+            field=models.FileField(storage=CRM.storage.get_content_storage, upload_to='assignment_submissions/'),
+        ),
+        migrations.AlterField(
+            model_name='curriculum',
+            name='file',
+            field=models.FileField(storage=CRM.storage.get_content_storage, upload_to='curriculums/'),
+        ),
+        migrations.AlterField(
+            model_name='lessonfile',
+            name='file',
+            field=models.FileField(storage=CRM.storage.get_content_storage, upload_to='lessons/'),
+        ),
+    ]
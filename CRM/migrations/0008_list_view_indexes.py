@@ -0,0 +1,73 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('CRM', '0007_content_addressed_uploads'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['batch', '-created_at'], name='crm_assess_batch_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['batch', '-created_at'], name='crm_assign_batch_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['trainer', '-created_at'], name='crm_assign_trainer_cr_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['batch', '-date'], name='crm_att_batch_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailysessionupdate',
+            index=models.Index(fields=['trainer', '-date'], name='crm_dsu_trainer_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailysessionupdate',
+            index=models.Index(fields=['batch', '-date'], name='crm_dsu_batch_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doubt',
+            index=models.Index(fields=['trainer', '-created_at'], name='crm_doubt_trainer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doubt',
+            index=models.Index(condition=models.Q(('resolved', False)), fields=['trainer', '-created_at'], name='crm_doubt_trainer_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doubt',
+            index=models.Index(fields=['intern', '-created_at'], name='crm_doubt_intern_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doubt',
+            index=models.Index(fields=['-created_at'], name='crm_doubt_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lessonfile',
+            index=models.Index(fields=['trainer', '-uploaded_at'], name='crm_lesson_trainer_up_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lessonfile',
+            index=models.Index(fields=['-uploaded_at'], name='crm_lesson_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recordedsession',
+            index=models.Index(fields=['batch', '-uploaded_at'], name='crm_recsess_batch_up_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recordedsession',
+            index=models.Index(fields=['trainer', '-uploaded_at'], name='crm_recsess_trainer_up_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recordedsession',
+            index=models.Index(fields=['processing_status', 'uploaded_at'], name='crm_recsess_status_up_idx'),
+        ),
+    ]
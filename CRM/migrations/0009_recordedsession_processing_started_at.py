@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('CRM', '0008_list_view_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recordedsession',
+            name='processing_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('CRM', '0009_recordedsession_processing_started_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Project',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('introduction', models.TextField(blank=True, null=True)),
+                ('description_file', models.FileField(blank=True, null=True, upload_to='project_descriptions/')),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('assigned', 'Assigned')], default='draft', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('batches', models.ManyToManyField(blank=True, to='CRM.batch')),
+                ('trainer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_projects', to='CRM.trainerprofile')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='InternProject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('project_title', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('github_url', models.URLField(blank=True, null=True)),
+                ('file', models.FileField(blank=True, null=True, upload_to='intern_projects/')),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Viewed', 'Viewed by Trainer')], default='Pending', max_length=20)),
+                ('score', models.DecimalField(blank=True, decimal_places=2, help_text="Trainer's score (percentage or points)", max_digits=5, null=True)),
+                ('submitted_at', models.DateTimeField(auto_now_add=True)),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('intern', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='intern_projects', to='CRM.internprofile')),
+                ('trainer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='intern_projects', to='CRM.trainerprofile')),
+            ],
+            options={
+                'ordering': ('-submitted_at',),
+                'indexes': [models.Index(fields=['intern', '-submitted_at'], name='crm_iproj_intern_sub_idx')],
+                'unique_together': {('intern', 'project_title')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('description', models.TextField(blank=True, null=True)),
+                ('file', models.FileField(blank=True, null=True, upload_to='project_submissions/')),
+                ('github_url', models.URLField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('not_submitted', 'Not Submitted'), ('submitted', 'Submitted'), ('resubmitted', 'Resubmitted'), ('reviewed', 'Reviewed')], default='not_submitted', max_length=20)),
+                ('submitted_at', models.DateTimeField(blank=True, null=True)),
+                ('intern', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='CRM.internprofile')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='CRM.project')),
+            ],
+            options={
+                'unique_together': {('project', 'intern')},
+            },
+        ),
+    ]
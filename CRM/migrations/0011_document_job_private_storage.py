@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:20
+
+import os
+
+import CRM.storage
+from django.conf import settings
+from django.core.files.move import file_move_safe
+from django.db import migrations, models
+
+
+def move_archives_out_of_media(apps, schema_editor):
+    # ZIPs of earlier jobs were written under MEDIA_ROOT/document_jobs/
+    storage = CRM.storage.get_document_job_storage()
+    DocumentJob = apps.get_model('CRM', 'DocumentJob')
+    for job in DocumentJob.objects.exclude(result_file='').exclude(result_file__isnull=True):
+        old_path = os.path.join(settings.MEDIA_ROOT, job.result_file.name)
+        if not os.path.exists(old_path):
+            continue
+        name = os.path.basename(job.result_file.name)
+        os.makedirs(storage.location, exist_ok=True)
+        file_move_safe(old_path, storage.path(name), allow_overwrite=True)
+        DocumentJob.objects.filter(pk=job.pk).update(result_file=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('CRM', '0010_project_internproject_projectsubmission'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='documentjob',
+            name='result_file',
+            field=models.FileField(blank=True, null=True, storage=CRM.storage.get_document_job_storage, upload_to='document_jobs/'),
+        ),
+        migrations.RunPython(move_archives_out_of_media, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:05
+
+import os
+
+from django.db import migrations, models
+
+
+def name_legacy_uploads(apps, schema_editor):
+    # Files not yet moved into blobs/ still carry the name they were uploaded under
+    for model_name in ('Assignment', 'AssignmentSubmission', 'Curriculum', 'LessonFile'):
+        model = apps.get_model('CRM', model_name)
+        rows = model.objects.exclude(file='').exclude(file__isnull=True).exclude(file__startswith='blobs/')
+        for pk, name in rows.values_list('pk', 'file'):
+            model.objects.filter(pk=pk).update(original_name=os.path.basename(name)[:255])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('CRM', '0011_document_job_private_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assignment',
+            name='original_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='assignmentsubmission',
+            name='original_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='curriculum',
+            name='original_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='lessonfile',
+            name='original_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.RunPython(name_legacy_uploads, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('CRM', '0012_upload_original_name'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='assessment',
+            name='crm_assess_batch_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='assignment',
+            name='crm_assign_batch_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='assignment',
+            name='crm_assign_trainer_cr_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='doubt',
+            name='crm_doubt_intern_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='lessonfile',
+            name='crm_lesson_trainer_up_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='lessonfile',
+            name='crm_lesson_uploaded_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='recordedsession',
+            name='crm_recsess_batch_up_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='recordedsession',
+            name='crm_recsess_trainer_up_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='recordedsession',
+            name='crm_recsess_status_up_idx',
+        ),
+    ]
@@ -1,6 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
+from django.utils import timezone
+
+from .storage import get_content_storage, get_document_job_storage
 
 User = settings.AUTH_USER_MODEL
 
@@ -176,16 +179,40 @@ class Attendance(models.Model):
     intern = models.ForeignKey(InternProfile, on_delete=models.CASCADE, related_name="attendance_records")
     trainer = models.ForeignKey(TrainerProfile, on_delete=models.CASCADE, related_name="attendance_marked")
     batch = models.ForeignKey(Batch, on_delete=models.CASCADE, related_name="attendance")
-    date = models.DateField(auto_now_add=True)
+    date = models.DateField(default=timezone.localdate)  # set explicitly when marking a past date
     status = models.CharField(max_length=10, choices=(("Present", "Present"), ("Absent", "Absent")))
 
     class Meta:
         unique_together = ('intern', 'date')  # prevent duplicate entries
+        indexes = [
+            # Batch attendance list/report (filter by batch, by day, newest first)
+            models.Index(fields=['batch', '-date'], name='crm_att_batch_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.intern.unique_id} - {self.date} - {self.status}"
 
 
+class AttendanceMonthlySummary(models.Model):
+    """Per-intern present/absent totals for one month, kept in step with Attendance."""
+    intern = models.ForeignKey(InternProfile, on_delete=models.CASCADE, related_name="attendance_summaries")
+    batch = models.ForeignKey(Batch, on_delete=models.CASCADE, related_name="attendance_summaries")
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    present_count = models.PositiveIntegerField(default=0)
+    absent_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('intern', 'batch', 'year', 'month')
+        indexes = [
+            models.Index(fields=['batch', 'year', 'month'], name='crm_attsum_batch_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.intern.unique_id} - {self.year}-{self.month:02d}"
+
+
 # =====================
 # File Sharing (Lessons)
 # =====================
@@ -193,7 +220,8 @@ class LessonFile(models.Model):
     trainer = models.ForeignKey(TrainerProfile, on_delete=models.CASCADE, related_name="uploaded_files")
     batches = models.ManyToManyField("Batch", related_name="lessons")
     title = models.CharField(max_length=255)
-    file = models.FileField(upload_to="lessons/")
+    file = models.FileField(upload_to="lessons/", storage=get_content_storage)
+    original_name = models.CharField(max_length=255, blank=True)  # as uploaded; `file` is named by hash
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -212,6 +240,10 @@ class DailySessionUpdate(models.Model):
 
     class Meta:
         unique_together = ('trainer', 'batch', 'date')
+        indexes = [
+            models.Index(fields=['trainer', '-date'], name='crm_dsu_trainer_date_idx'),
+            models.Index(fields=['batch', '-date'], name='crm_dsu_batch_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.batch.name} - {self.date}"
@@ -225,6 +257,16 @@ class Doubt(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     resolved = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Trainer's doubt lists. The ORM filters resolved=False as
+            # `NOT resolved`, which only a partial index can serve.
+            models.Index(fields=['trainer', '-created_at'], name='crm_doubt_trainer_created_idx'),
+            models.Index(fields=['trainer', '-created_at'], condition=models.Q(resolved=False),
+                         name='crm_doubt_trainer_open_idx'),
+            models.Index(fields=['-created_at'], name='crm_doubt_created_idx'),
+        ]
+
     def __str__(self):
         return f"Doubt by {self.intern.unique_id} - {self.trainer.user.username}"
 
@@ -239,6 +281,13 @@ class DoubtResolution(models.Model):
 
 
 class RecordedSession(models.Model):
+    PROCESSING_CHOICES = (
+        ("pending", "Pending"),
+        ("processing", "Processing"),
+        ("ready", "Ready"),
+        ("failed", "Failed"),
+    )
+
     batch = models.ForeignKey(Batch, on_delete=models.CASCADE, related_name="recorded_sessions")
     trainer = models.ForeignKey(TrainerProfile, on_delete=models.CASCADE, related_name="recorded_sessions")
     title = models.CharField(max_length=255)
@@ -246,6 +295,20 @@ class RecordedSession(models.Model):
     uploaded_at = models.DateTimeField(auto_now_add=True)
     description = models.TextField(blank=True, null=True)
 
+    # Filled in by `python manage.py process_recordings` (CRM/transcoding.py)
+    processing_status = models.CharField(max_length=20, choices=PROCESSING_CHOICES, default="pending")
+    processing_error = models.TextField(blank=True, null=True)
+    processing_started_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    duration = models.DurationField(null=True, blank=True)
+    hls_dir = models.CharField(max_length=255, blank=True)  # relative to MEDIA_ROOT
+    poster = models.CharField(max_length=255, blank=True)  # file name inside hls_dir
+    renditions = models.JSONField(default=list, blank=True)
+
+    @property
+    def is_ready(self):
+        return self.processing_status == "ready" and bool(self.hls_dir)
+
     def __str__(self):
         return f"{self.title} - {self.batch.name}"
 
@@ -255,7 +318,8 @@ class Assignment(models.Model):
     trainer = models.ForeignKey(TrainerProfile, on_delete=models.CASCADE, related_name="created_assignments")
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
-    file = models.FileField(upload_to="assignments/", null=True, blank=True)
+    file = models.FileField(upload_to="assignments/", storage=get_content_storage, null=True, blank=True)
+    original_name = models.CharField(max_length=255, blank=True)  # as uploaded; `file` is named by hash
     deadline = models.DateTimeField()
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -266,7 +330,8 @@ class Assignment(models.Model):
 class AssignmentSubmission(models.Model):
     assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name="submissions")
     intern = models.ForeignKey(InternProfile, on_delete=models.CASCADE, related_name="assignment_submissions")
-    file = models.FileField(upload_to="assignment_submissions/")
+    file = models.FileField(upload_to="assignment_submissions/", storage=get_content_storage)
+    original_name = models.CharField(max_length=255, blank=True)  # as uploaded; `file` is named by hash
     submitted_at = models.DateTimeField(auto_now_add=True)
     graded = models.BooleanField(default=False)
     score = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
@@ -286,7 +351,7 @@ class Assessment(models.Model):
     question_file = models.FileField(upload_to="assessments/questions/")
     created_at = models.DateTimeField(auto_now_add=True)
     total_marks = models.PositiveIntegerField(default=0)
-    
+
     def __str__(self):
         return f"{self.title} - {self.batch.name}"
 
@@ -324,7 +389,8 @@ class Curriculum(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="curriculums")
     batch = models.ForeignKey('Batch', on_delete=models.CASCADE, related_name="curriculums", null=True, blank=True)
     title = models.CharField(max_length=255)
-    file = models.FileField(upload_to="curriculums/")
+    file = models.FileField(upload_to="curriculums/", storage=get_content_storage)
+    original_name = models.CharField(max_length=255, blank=True)  # as uploaded; `file` is named by hash
     description = models.TextField(blank=True, null=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     uploaded_by = models.ForeignKey(TrainerProfile, on_delete=models.SET_NULL, null=True, blank=True)
@@ -432,6 +498,9 @@ class InternProject(models.Model):
     class Meta:
         unique_together = ("intern", "project_title") 
         ordering = ("-submitted_at",)
+        indexes = [
+            models.Index(fields=['intern', '-submitted_at'], name='crm_iproj_intern_sub_idx'),
+        ]
 
     def mark_viewed(self, score=None):
         self.status = "Viewed"
@@ -442,3 +511,43 @@ class InternProject(models.Model):
 
     def __str__(self):
         return f"{self.intern.unique_id} - {self.project_title}"
+
+
+class DocumentJob(models.Model):
+    """Background request to generate undertaking/certificate/LOR PDFs into one ZIP."""
+    KIND_CHOICES = (
+        ("undertaking", "Undertaking Letters"),
+        ("certificate", "Completion Certificates"),
+        ("lor", "Letters of Recommendation"),
+    )
+    STATUS_CHOICES = (
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    )
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    intern_ids = models.JSONField(default=list)
+    label = models.CharField(max_length=255, blank=True)  # e.g. batch name, used for the ZIP name
+
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    result_file = models.FileField(upload_to="document_jobs/", storage=get_document_job_storage, null=True, blank=True)
+    error = models.TextField(blank=True, null=True)
+
+    requested_by = models.ForeignKey("User", on_delete=models.SET_NULL, null=True, blank=True, related_name="document_jobs")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("-created_at",)
+
+    @property
+    def progress(self):
+        return round(self.processed * 100 / self.total) if self.total else 0
+
+    def __str__(self):
+        return f"{self.get_kind_display()} job #{self.pk} ({self.status})"
@@ -0,0 +1,176 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+logger = logging.getLogger(__name__)
+
+
+# =====================
+# Rendered PDF Cache
+# =====================
+# Certificates, LORs and undertakings are pure functions of their HTML, so the
+# rendered bytes are stored under PDF_CACHE_DIR keyed by a hash of the HTML
+# plus the mtimes of any images it embeds. Re-downloads and re-zips are served
+# from disk; the least recently used files are pruned past PDF_CACHE_MAX_BYTES,
+# checked every PRUNE_EVERY stores so a cache miss does not walk the directory.
+# The documents carry personal data, so the cache lives outside MEDIA_ROOT.
+
+LEGACY_MEDIA_DIR = "pdf_cache"  # old location under MEDIA_ROOT
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+PRUNE_EVERY = 25  # stores between cache size checks
+
+_stores_since_prune = 0
+_prune_lock = threading.Lock()
+
+HITS_KEY = "pdf_cache:hits"
+MISSES_KEY = "pdf_cache:misses"
+
+
+def cache_root():
+    return str(getattr(settings, "PDF_CACHE_DIR", os.path.join(settings.BASE_DIR, "cache", "pdf")))
+
+
+def max_cache_bytes():
+    return getattr(settings, "PDF_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+
+
+def pdf_cache_key(html, asset_paths=()):
+    """
+    Hash the rendered HTML (covering template source and context data) and
+    the mtime of each asset file it references.
+    """
+    digest = hashlib.sha256(html.encode("utf-8"))
+    for path in sorted(asset_paths):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = 0
+        digest.update(f"\0{path}:{mtime}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _path_for(key):
+    return os.path.join(cache_root(), key[:2], f"{key}.pdf")
+
+
+def _record(counter_key):
+    try:
+        cache.incr(counter_key)
+    except ValueError:
+        cache.add(counter_key, 1, None)
+
+
+def get_cached_pdf(key):
+    """Return the cached bytes for `key`, or None on a miss."""
+    path = _path_for(key)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        _record(MISSES_KEY)
+        logger.debug("PDF cache miss %s", key)
+        return None
+
+    # Bump the mtime so pruning treats this entry as recently used
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    _record(HITS_KEY)
+    logger.debug("PDF cache hit %s", key)
+    return data
+
+
+def store_pdf(key, data):
+    """Write `data` atomically under `key` and prune the cache if it is over size."""
+    path = _path_for(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        logger.warning("Could not write PDF cache entry %s", key, exc_info=True)
+        return
+    if _prune_due():
+        prune()
+
+
+def _prune_due():
+    global _stores_since_prune
+
+    with _prune_lock:
+        _stores_since_prune += 1
+        if _stores_since_prune < PRUNE_EVERY:
+            return False
+        _stores_since_prune = 0
+        return True
+
+
+def _remove_legacy_cache():
+    """Entries written under MEDIA_ROOT before the move are publicly served; drop them."""
+    legacy = os.path.join(settings.MEDIA_ROOT, LEGACY_MEDIA_DIR)
+    if os.path.isdir(legacy):
+        shutil.rmtree(legacy, ignore_errors=True)
+        logger.info("Removed the old PDF cache at %s", legacy)
+
+
+def prune(max_bytes=None):
+    """Delete least recently used entries until the cache is under `max_bytes`."""
+    max_bytes = max_cache_bytes() if max_bytes is None else max_bytes
+    _remove_legacy_cache()
+    return prune_directory(cache_root(), max_bytes, ".pdf")
+
+
+def prune_directory(root, max_bytes, suffix):
+    """
+    Delete the least recently used `suffix` files under `root` until their
+    total size is at most `max_bytes`. Returns the number removed. A file's
+    last use is the later of its mtime and atime, so callers may bump either.
+    """
+    entries = []
+    total = 0
+    for dirpath, _dirnames, filenames in os.walk(root):
+        for name in filenames:
+            if not name.endswith(suffix):
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((max(stat.st_mtime, stat.st_atime), stat.st_size, path))
+            total += stat.st_size
+
+    if total <= max_bytes:
+        return 0
+
+    removed = 0
+    for _used, size, path in sorted(entries):
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+        if total <= max_bytes:
+            break
+    logger.info("Pruned %d cached files from %s", removed, root)
+    return removed
+
+
+def cache_stats():
+    return {
+        "hits": cache.get(HITS_KEY, 0),
+        "misses": cache.get(MISSES_KEY, 0),
+    }
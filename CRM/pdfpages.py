@@ -0,0 +1,213 @@
+import hashlib
+import io
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from PIL import Image
+
+from .pdf_cache import prune_directory
+
+
+logger = logging.getLogger(__name__)
+
+
+# =====================
+# Lesson PDF Page Images
+# =====================
+# The secure lesson viewer shows each PDF page as a WebP image instead of
+# sending the PDF itself. Pages are rasterized on first request at one of a
+# few fixed widths and kept under MEDIA_ROOT/pdf_pages/<key>/<width>/<n>.webp,
+# where <key> hashes the PDF's path, size and mtime so a replaced upload never
+# serves stale pages. Least recently used images are pruned past
+# PDF_PAGE_CACHE_MAX_BYTES.
+
+PAGE_CACHE_DIR = "pdf_pages"
+PAGE_WIDTHS = (640, 1024, 1600)
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+WEBP_QUALITY = 80
+PRUNE_EVERY = 25  # renders between cache size checks
+
+_renders_since_prune = 0
+_prune_lock = threading.Lock()
+
+# PDFium is not thread-safe; serialize calls within a threaded server process
+_pdfium_lock = threading.Lock()
+
+
+class PageRenderError(Exception):
+    pass
+
+
+def cache_root():
+    return os.path.join(settings.MEDIA_ROOT, PAGE_CACHE_DIR)
+
+
+def max_cache_bytes():
+    return getattr(settings, "PDF_PAGE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+
+
+def document_key(path):
+    stat = os.stat(path)
+    identity = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()[:32]
+
+
+def closest_width(requested):
+    """The smallest fixed width at least as wide as `requested` (or the largest)."""
+    for width in PAGE_WIDTHS:
+        if width >= requested:
+            return width
+    return PAGE_WIDTHS[-1]
+
+
+# -----------------------
+# Rasterizers
+# -----------------------
+def _pdfium():
+    try:
+        import pypdfium2
+    except ImportError:
+        return None
+    return pypdfium2
+
+
+def _pdftoppm():
+    return shutil.which(getattr(settings, "PDFTOPPM_BINARY", "pdftoppm"))
+
+
+def _read_page_sizes(path):
+    pdfium = _pdfium()
+    if pdfium is None:
+        from pypdf import PdfReader
+        sizes = []
+        for page in PdfReader(path).pages:
+            width, height = float(page.mediabox.width), float(page.mediabox.height)
+            sizes.append((height, width) if page.rotation % 180 else (width, height))
+        return sizes
+
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(path)
+        try:
+            return [tuple(pdf.get_page_size(index)) for index in range(len(pdf))]
+        finally:
+            pdf.close()
+
+
+def _rasterize(path, page_number, width, page_width):
+    """Render 1-based `page_number` as a PIL image `width` pixels wide."""
+    pdfium = _pdfium()
+    if pdfium is not None:
+        with _pdfium_lock:
+            pdf = pdfium.PdfDocument(path)
+            try:
+                page = pdf[page_number - 1]
+                try:
+                    # to_pil() shares the bitmap buffer; copy it before the page is closed
+                    return page.render(scale=width / page_width).to_pil().copy()
+                finally:
+                    page.close()
+            finally:
+                pdf.close()
+
+    pdftoppm = _pdftoppm()
+    if pdftoppm is None:
+        raise PageRenderError("Neither pypdfium2 nor pdftoppm is available to render PDF pages.")
+    result = subprocess.run(
+        [pdftoppm, "-f", str(page_number), "-l", str(page_number), "-singlefile",
+         "-scale-to-x", str(width), "-scale-to-y", "-1", "-png", path, "-"],
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        raise PageRenderError(result.stderr.decode("utf-8", "replace").strip() or "pdftoppm failed")
+    image = Image.open(io.BytesIO(result.stdout))
+    image.load()
+    return image
+
+
+# -----------------------
+# Public API
+# -----------------------
+def can_rasterize():
+    """Whether this process has a rasterizer (pypdfium2 or pdftoppm) at all."""
+    return _pdfium() is not None or _pdftoppm() is not None
+
+
+def page_sizes(path):
+    """[(width, height)] in PDF points for every page, cached per file version."""
+    cache_key = f"pdf_pages:sizes:{document_key(path)}"
+    sizes = cache.get(cache_key)
+    if sizes is None:
+        sizes = _read_page_sizes(path)
+        cache.set(cache_key, sizes, None)
+    return sizes
+
+
+def page_image_path(path, page_number, width):
+    """
+    Path of the cached WebP for one page, rendering it first if needed.
+    Raises IndexError for a page the document does not have.
+    """
+    sizes = page_sizes(path)
+    if not 1 <= page_number <= len(sizes):
+        raise IndexError(page_number)
+
+    width = closest_width(width)
+    image_path = os.path.join(cache_root(), document_key(path), str(width), f"{page_number}.webp")
+    try:
+        stat = os.stat(image_path)
+    except OSError:
+        pass
+    else:
+        # Bump only the atime: pruning sees the page as recently used while
+        # the mtime, and so the ETag, stays put
+        try:
+            os.utime(image_path, ns=(time.time_ns(), stat.st_mtime_ns))
+        except OSError:
+            pass
+        return image_path
+
+    image = _rasterize(path, page_number, width, sizes[page_number - 1][0])
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB")
+
+    directory = os.path.dirname(image_path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            image.save(f, "WEBP", quality=WEBP_QUALITY, method=4)
+        os.replace(tmp_path, image_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    logger.debug("Rendered page %d of %s at %dpx", page_number, path, width)
+
+    if _prune_due():
+        prune()
+    return image_path
+
+
+def _prune_due():
+    """Count a render; true once every PRUNE_EVERY renders across threads."""
+    global _renders_since_prune
+
+    with _prune_lock:
+        _renders_since_prune += 1
+        if _renders_since_prune < PRUNE_EVERY:
+            return False
+        _renders_since_prune = 0
+        return True
+
+
+def prune(max_bytes=None):
+    """Delete least recently used page images until the cache is under `max_bytes`."""
+    max_bytes = max_cache_bytes() if max_bytes is None else max_bytes
+    return prune_directory(cache_root(), max_bytes, ".webp")
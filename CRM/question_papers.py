@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+
+# =====================
+# Cached Question Papers
+# =====================
+# When an exam starts, every intern of the batch opens take_assessment at
+# once. The question list is the same for all of them, so it is rendered once
+# per assessment and shared through the cache; only the header, CSRF token and
+# the submission check run per request. The paper is warmed when the
+# assessment is created and dropped whenever one of its MCQs changes (see
+# CRM/signals.py).
+
+ASSESSMENT_PAPER_CACHE_TIMEOUT = 24 * 60 * 60
+PAPER_TEMPLATE = "assessments/question_paper.html"
+
+
+def paper_key(assessment_id):
+    return f"assessment_paper:{assessment_id}"
+
+
+def render_paper(assessment):
+    return render_to_string(PAPER_TEMPLATE, {"mcqs": assessment.mcqs.order_by("id")})
+
+
+def question_paper(assessment):
+    """
+    The rendered MCQ list of `assessment`, from the cache when possible.
+    ASSESSMENT_PAPER_CACHE_TIMEOUT = 0 in settings turns the cache off.
+    """
+    timeout = getattr(settings, "ASSESSMENT_PAPER_CACHE_TIMEOUT", ASSESSMENT_PAPER_CACHE_TIMEOUT)
+    if not timeout:
+        return mark_safe(render_paper(assessment))
+
+    key = paper_key(assessment.pk)
+    html = cache.get(key)
+    if html is None:
+        html = render_paper(assessment)
+        cache.set(key, html, timeout)
+    # Built from an autoescaped template, so it is safe to embed as-is
+    return mark_safe(html)
+
+
+def invalidate_paper(assessment_id):
+    cache.delete(paper_key(assessment_id))
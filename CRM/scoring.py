@@ -0,0 +1,84 @@
+from collections import namedtuple
+from decimal import Decimal
+from operator import eq
+
+from django.db import transaction
+
+from .models import AssessmentSubmission
+
+
+# =====================
+# Assessment Scoring
+# =====================
+# An assessment's answer key is loaded once as two parallel tuples (MCQ ids as
+# the string keys used in AssessmentSubmission.answers, and correct options).
+# A submission is scored by mapping its answers onto the key's ids and
+# counting element-wise matches with map(eq, ...), so scoring a whole batch of
+# submissions never touches the MCQ table again. regrade_assessment() rescores
+# stored answers after a key correction and writes only the scores that moved.
+
+REGRADE_BATCH_SIZE = 500
+
+AnswerKey = namedtuple("AnswerKey", ["mcq_ids", "correct"])
+
+
+def answer_key(assessment):
+    rows = list(assessment.mcqs.order_by("id").values_list("id", "correct_option"))
+    return AnswerKey(
+        mcq_ids=tuple(str(mcq_id) for mcq_id, _ in rows),
+        correct=tuple(correct for _, correct in rows),
+    )
+
+
+def _option(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def selected_options(key, answers):
+    """The chosen option per MCQ of `key`, in key order (0 when unanswered)."""
+    return [_option(answers.get(mcq_id)) for mcq_id in key.mcq_ids]
+
+
+def score_answers(key, answers):
+    """Number of correct answers in an {mcq_id: option} mapping."""
+    return sum(map(eq, selected_options(key, answers), key.correct))
+
+
+def answers_from_post(key, data):
+    """{mcq_id: option} for the "mcq_<id>" radio fields of take_assessment."""
+    return {mcq_id: _option(data.get(f"mcq_{mcq_id}")) for mcq_id in key.mcq_ids}
+
+
+def regrade_assessment(assessment, dry_run=False):
+    """
+    Rescore every submission of `assessment` against its current answer key.
+    Returns {"submissions": n, "changed": n, "total_marks": (old, new)}.
+    """
+    key = answer_key(assessment)
+    changed = []
+    submissions = AssessmentSubmission.objects.filter(assessment=assessment).only("id", "answers", "score")
+    total = 0
+    for submission in submissions.iterator(chunk_size=REGRADE_BATCH_SIZE):
+        total += 1
+        score = Decimal(score_answers(key, submission.answers or {}))
+        if submission.score != score:
+            submission.score = score
+            changed.append(submission)
+
+    result = {
+        "submissions": total,
+        "changed": len(changed),
+        "total_marks": (assessment.total_marks, len(key.mcq_ids)),
+    }
+    if dry_run:
+        return result
+
+    with transaction.atomic():
+        AssessmentSubmission.objects.bulk_update(changed, ["score"], batch_size=REGRADE_BATCH_SIZE)
+        if assessment.total_marks != len(key.mcq_ids):
+            assessment.total_marks = len(key.mcq_ids)
+            assessment.save(update_fields=["total_marks"])
+    return result
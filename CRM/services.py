@@ -0,0 +1,156 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    Count, DecimalField, Exists, F, FilteredRelation, IntegerField, OuterRef, Q, Subquery, Sum, Value,
+)
+from django.db.models.functions import Coalesce
+
+from .models import Doubt, Assessment, Assignment, AssessmentSubmission, AssignmentSubmission, InternProfile
+
+
+def _count_subquery(queryset, group_field):
+    """
+    Wrap a correlated queryset as a scalar COUNT(*) subquery (0 when no rows match).
+    """
+    counted = (
+        queryset.order_by()
+        .values(group_field)
+        .annotate(total=Count('pk'))
+        .values('total')[:1]
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+# =====================
+# Intern Assessments
+# =====================
+def assessments_for_intern(intern):
+    """
+    Assessments of the intern's batch, newest first, each annotated with the
+    intern's `submission_id` and `submission_score` (None when not taken yet).
+    One LEFT JOIN: (assessment, intern) is unique, so rows never multiply.
+    """
+    return (
+        Assessment.objects.filter(batch_id=intern.batch_id)
+        .annotate(own_submission=FilteredRelation('submissions', condition=Q(submissions__intern=intern)))
+        .annotate(
+            submission_id=F('own_submission__id'),
+            submission_score=F('own_submission__score'),
+        )
+        .order_by('-created_at')
+    )
+
+
+# =====================
+# Pending Work (Intern)
+# =====================
+def pending_work_for_intern(intern):
+    """
+    Batch-scoped totals and pending counts for one intern, computed in a single
+    query. Only assessments/assignments of the intern's own batch are counted.
+    """
+    batch_assessments = Assessment.objects.filter(batch_id=OuterRef('batch_id'))
+    batch_assignments = Assignment.objects.filter(batch_id=OuterRef('batch_id'))
+
+    assessment_submitted = AssessmentSubmission.objects.filter(
+        assessment_id=OuterRef('pk'), intern_id=OuterRef(OuterRef('pk'))
+    )
+    assignment_submitted = AssignmentSubmission.objects.filter(
+        assignment_id=OuterRef('pk'), intern_id=OuterRef(OuterRef('pk'))
+    )
+
+    row = InternProfile.objects.filter(pk=intern.pk).annotate(
+        total_assessments=_count_subquery(batch_assessments, 'batch_id'),
+        pending_assessments=_count_subquery(batch_assessments.filter(~Exists(assessment_submitted)), 'batch_id'),
+        total_assignments=_count_subquery(batch_assignments, 'batch_id'),
+        pending_assignments=_count_subquery(batch_assignments.filter(~Exists(assignment_submitted)), 'batch_id'),
+        pending_doubts=_count_subquery(Doubt.objects.filter(intern_id=OuterRef('pk'), resolved=False), 'intern_id'),
+    ).values(
+        'total_assessments', 'pending_assessments',
+        'total_assignments', 'pending_assignments',
+        'pending_doubts',
+    ).first()
+
+    if row is None:
+        row = dict.fromkeys(
+            ['total_assessments', 'pending_assessments', 'total_assignments', 'pending_assignments', 'pending_doubts'], 0
+        )
+    return row
+
+
+# =====================
+# Batch Scoreboard (Assignments)
+# =====================
+BATCH_SCORES_CACHE_TIMEOUT = 60 * 60  # safety net, signals normally invalidate first
+
+
+def batch_scoreboard(batch):
+    """
+    Assignment totals for every intern of `batch` in one query. Only
+    submissions to this batch's assignments count, so an intern who moved
+    batches is not credited with work from the old one.
+    """
+    in_batch = Q(assignment_submissions__assignment__batch=batch)
+    total_assignments = Assignment.objects.filter(batch=batch).count()
+
+    interns = (
+        InternProfile.objects.filter(batch=batch)
+        .annotate(
+            submitted_count=Count('assignment_submissions', filter=in_batch),
+            graded_count=Count('assignment_submissions', filter=in_batch & Q(assignment_submissions__graded=True)),
+            total_score=Coalesce(
+                Sum('assignment_submissions__score', filter=in_batch),
+                Value(Decimal('0')),
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            ),
+        )
+        .order_by('id')
+        .values('id', 'unique_id', 'user__first_name', 'user__last_name',
+                'submitted_count', 'graded_count', 'total_score')
+    )
+
+    scoreboard = []
+    for row in interns:
+        graded = row['graded_count']
+        total_score = row['total_score']
+        scoreboard.append({
+            'intern_id': row['id'],
+            'unique_id': row['unique_id'],
+            'name': f"{row['user__first_name']} {row['user__last_name']}".strip(),
+            'total_assignments': total_assignments,
+            'submitted_count': row['submitted_count'],
+            'graded_count': graded,
+            'total_score': round(total_score, 2),
+            'average_score': round(total_score / graded, 2) if graded else 0,
+            'completion_rate': round(row['submitted_count'] / total_assignments * 100, 2) if total_assignments else 0,
+        })
+    return scoreboard
+
+
+def scoreboard_key(batch_id):
+    return f"batch_scores:{batch_id}"
+
+
+def invalidate_batch_scoreboards(*batch_ids):
+    cache.delete_many([scoreboard_key(batch_id) for batch_id in batch_ids])
+
+
+def cached_batch_scoreboard(batch):
+    """
+    batch_scoreboard() cached per batch. The signals in CRM/signals.py drop it
+    whenever a submission, grade, assignment, roster or intern name changes,
+    so a hit costs no query and changes show up at once.
+    BATCH_SCORES_CACHE_TIMEOUT = 0 in settings turns the cache off.
+    """
+    timeout = getattr(settings, 'BATCH_SCORES_CACHE_TIMEOUT', BATCH_SCORES_CACHE_TIMEOUT)
+    if not timeout:
+        return batch_scoreboard(batch)
+
+    key = scoreboard_key(batch.pk)
+    scoreboard = cache.get(key)
+    if scoreboard is None:
+        scoreboard = batch_scoreboard(batch)
+        cache.set(key, scoreboard, timeout)
+    return scoreboard
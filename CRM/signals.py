@@ -0,0 +1,138 @@
+import os
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from . import counters
+from .models import (
+    Doubt, Assessment, AssessmentMCQ, Assignment, AssessmentSubmission, AssignmentSubmission, Curriculum,
+    InternProfile, LessonFile, User,
+)
+from .question_papers import invalidate_paper
+from .services import invalidate_batch_scoreboards
+from .storage import content_storage, is_blob
+
+
+# =====================
+# Pending counter invalidation
+# =====================
+@receiver([post_save, post_delete], sender=Doubt)
+def doubt_changed(sender, instance, **kwargs):
+    counters.invalidate_global()
+    counters.invalidate_intern_profile(instance.intern_id)
+    counters.invalidate_trainer_profile(instance.trainer_id)
+
+
+@receiver([post_save, post_delete], sender=AssessmentSubmission)
+@receiver([post_save, post_delete], sender=AssignmentSubmission)
+def submission_changed(sender, instance, **kwargs):
+    counters.invalidate_intern_profile(instance.intern_id)
+
+
+@receiver(pre_save, sender=Assessment)
+@receiver(pre_save, sender=Assignment)
+def remember_coursework_batch(sender, instance, **kwargs):
+    # An edit may move it to another batch, whose interns' counts change too
+    if instance.pk is not None and not instance._state.adding:
+        instance._previous_batch_id = sender.objects.filter(pk=instance.pk).values_list('batch_id', flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Assessment)
+@receiver([post_save, post_delete], sender=Assignment)
+def coursework_changed(sender, instance, **kwargs):
+    batch_ids = {instance.batch_id, instance.__dict__.pop('_previous_batch_id', None)} - {None}
+    counters.invalidate_batch_interns(*batch_ids)
+    if sender is Assignment:
+        invalidate_batch_scoreboards(*batch_ids)
+
+
+@receiver(pre_save, sender=InternProfile)
+def remember_intern_batch(sender, instance, **kwargs):
+    if instance.pk is not None and not instance._state.adding:
+        instance._previous_batch_id = sender.objects.filter(pk=instance.pk).values_list('batch_id', flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=InternProfile)
+def intern_profile_changed(sender, instance, **kwargs):
+    # Moving an intern to another batch changes what is pending for them,
+    # and the scoreboards of both batches.
+    counters.invalidate_interns([instance.user_id])
+    batch_ids = {instance.batch_id, instance.__dict__.pop('_previous_batch_id', None)} - {None}
+    invalidate_batch_scoreboards(*batch_ids)
+
+
+# =====================
+# Batch scoreboard invalidation
+# =====================
+# Assignment, roster and batch moves are handled above with the counters.
+
+@receiver([post_save, post_delete], sender=AssignmentSubmission)
+def scored_submission_changed(sender, instance, **kwargs):
+    # Finds nothing in a cascade from a deleted assignment, which coursework_changed covers
+    batch_ids = Assignment.objects.filter(pk=instance.assignment_id).values_list('batch_id', flat=True)
+    invalidate_batch_scoreboards(*batch_ids)
+
+
+@receiver(post_save, sender=User)
+def user_renamed(sender, instance, update_fields=None, **kwargs):
+    # The scoreboard shows intern names; logins only save last_login
+    if update_fields is not None and not {'first_name', 'last_name'} & set(update_fields):
+        return
+    batch_ids = InternProfile.objects.filter(user_id=instance.pk, batch__isnull=False).values_list('batch_id', flat=True)
+    invalidate_batch_scoreboards(*batch_ids)
+
+
+# =====================
+# Question paper invalidation
+# =====================
+@receiver([post_save, post_delete], sender=AssessmentMCQ)
+def mcq_changed(sender, instance, **kwargs):
+    invalidate_paper(instance.assessment_id)
+
+
+@receiver(post_delete, sender=Assessment)
+def assessment_deleted(sender, instance, **kwargs):
+    invalidate_paper(instance.pk)
+
+
+# =====================
+# Content-addressed uploads
+# =====================
+def release_blob(name):
+    # After commit, so a rolled back delete never loses the file. Files from
+    # before blobs/ existed are left to `dedupe_uploads`.
+    if is_blob(name):
+        transaction.on_commit(lambda: content_storage.delete(name))
+
+
+@receiver(pre_save, sender=LessonFile)
+@receiver(pre_save, sender=Curriculum)
+@receiver(pre_save, sender=Assignment)
+@receiver(pre_save, sender=AssignmentSubmission)
+def remember_upload(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'file' not in update_fields:
+        return
+    if instance.file and not instance.file._committed:
+        # Still the uploaded file here; it is renamed to its hash when saved
+        instance.original_name = os.path.basename(instance.file.name)[:255]
+    if instance.pk is not None and not instance._state.adding:
+        instance._previous_file = sender.objects.filter(pk=instance.pk).values_list('file', flat=True).first()
+
+
+@receiver(post_save, sender=LessonFile)
+@receiver(post_save, sender=Curriculum)
+@receiver(post_save, sender=Assignment)
+@receiver(post_save, sender=AssignmentSubmission)
+def upload_replaced(sender, instance, **kwargs):
+    previous = instance.__dict__.pop('_previous_file', None)
+    if previous != instance.file.name:
+        release_blob(previous)
+
+
+@receiver(post_delete, sender=LessonFile)
+@receiver(post_delete, sender=Curriculum)
+@receiver(post_delete, sender=Assignment)
+@receiver(post_delete, sender=AssignmentSubmission)
+def upload_deleted(sender, instance, **kwargs):
+    release_blob(instance.file.name)
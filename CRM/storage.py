@@ -0,0 +1,245 @@
+import hashlib
+import os
+import tempfile
+import time
+from functools import wraps
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib import messages
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+from django.db.models import FileField
+from django.shortcuts import redirect
+from django.template.defaultfilters import filesizeformat
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+
+
+# =====================
+# Content-Addressed Uploads
+# =====================
+# Uploads are streamed to a temporary file and hashed chunk by chunk as they
+# arrive (HashingUploadHandler). ContentAddressedStorage then stores each
+# distinct file once under MEDIA_ROOT/blobs/<aa>/<sha256><ext>, so the same PDF
+# uploaded for several batches takes disk (and page cache) space only once.
+# The uploader's file name is kept on the row (original_name).
+#
+# A blob is deleted once no row refers to it any more (see signals.py). Blobs
+# written or reused within BLOB_GRACE_SECONDS are left alone, as an upload in
+# flight may be about to reference them; `dedupe_uploads --prune` sweeps those
+# up later.
+
+BLOB_DIR = "blobs"
+HASH_CHUNK_SIZE = 1024 * 1024
+BLOB_GRACE_SECONDS = 60 * 60
+
+
+def hash_file(content):
+    """sha256 hex digest of a Django File, reading it in chunks."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+def blob_name(digest, original_name=""):
+    ext = os.path.splitext(original_name)[1].lower()[:10]
+    return f"{BLOB_DIR}/{digest[:2]}/{digest}{ext}"
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(BLOB_DIR + "/")
+
+
+def content_addressed_fields():
+    """(model, field name) for every FileField stored in the content-addressed storage."""
+    for model in apps.get_app_config("CRM").get_models():
+        for field in model._meta.get_fields():
+            if isinstance(field, FileField) and field.storage is content_storage:
+                yield model, field.name
+
+
+def blob_in_use(name):
+    return any(
+        model._base_manager.filter(**{field: name}).exists()
+        for model, field in content_addressed_fields()
+    )
+
+
+def blob_recently_used(path):
+    try:
+        return time.time() - os.stat(path).st_mtime < BLOB_GRACE_SECONDS
+    except OSError:
+        return False
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage that names files after their sha256. Saving a file that
+    is already stored returns the existing blob without writing anything.
+    Files saved before this storage was introduced keep working by name.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The real name is chosen in _save() from the content hash
+        return name
+
+    def _save(self, name, content):
+        digest = getattr(content, "sha256", None) or hash_file(content)
+        name = blob_name(digest, name)
+        if self.exists(name):
+            # Mark it as in use so a concurrent delete() leaves it alone
+            try:
+                os.utime(self.path(name))
+            except OSError:
+                pass
+            else:
+                return name
+
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Same content under the same name, so a concurrent writer winning the
+        # race is harmless; both end with identical bytes in place.
+        if hasattr(content, "temporary_file_path"):
+            file_move_safe(content.temporary_file_path(), full_path, allow_overwrite=True)
+        else:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".upload")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    for chunk in content.chunks():
+                        f.write(chunk)
+                os.replace(tmp_path, full_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+        return name
+
+    def delete(self, name):
+        # Blobs may be shared by several rows: only the last reference frees one
+        if is_blob(name) and (blob_in_use(name) or blob_recently_used(self.path(name))):
+            return
+        super().delete(name)
+
+
+content_storage = ContentAddressedStorage()
+
+
+def get_content_storage():
+    """Callable used as FileField(storage=...) so migrations don't pin settings."""
+    return content_storage
+
+
+# -----------------------
+# Private files
+# -----------------------
+class DocumentJobStorage(FileSystemStorage):
+    """
+    Finished document job ZIPs, kept in DOCUMENT_JOB_DIR outside MEDIA_ROOT:
+    they hold interns' certificates and LORs, so they have no public URL and
+    are only served by the document_job_download view.
+    """
+
+    @property
+    def base_location(self):
+        return str(getattr(settings, "DOCUMENT_JOB_DIR", os.path.join(settings.BASE_DIR, "private", "document_jobs")))
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+    def url(self, name):
+        raise ValueError("Document job archives have no public URL.")
+
+
+document_job_storage = DocumentJobStorage()
+
+
+def get_document_job_storage():
+    return document_job_storage
+
+
+# -----------------------
+# Upload handler
+# -----------------------
+UPLOAD_FORM_OVERHEAD = 1024 * 1024  # the other form fields and multipart framing
+
+
+def upload_limit(field_name):
+    limits = getattr(settings, "UPLOAD_MAX_BYTES_BY_FIELD", {})
+    return limits.get(field_name, getattr(settings, "UPLOAD_MAX_BYTES", None))
+
+
+def hashing_uploads(*field_names):
+    """
+    Decorator for the views that accept the file fields `field_names`: uploads
+    go through HashingUploadHandler, and a request whose Content-Length already
+    exceeds the fields' limits is turned away before its body is read.
+
+    Upload handlers must be set before the body is parsed, which
+    CsrfViewMiddleware would otherwise do first; the CSRF check runs here
+    instead.
+    """
+    def decorator(view):
+        protected_view = csrf_protect(view)
+
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method == "POST":
+                limits = [upload_limit(name) for name in field_names]
+                if None not in limits:
+                    try:
+                        length = int(request.META.get("CONTENT_LENGTH") or 0)
+                    except ValueError:
+                        length = 0
+                    if length > sum(limits) + UPLOAD_FORM_OVERHEAD:
+                        messages.error(
+                            request, f"The upload is larger than the {filesizeformat(max(limits))} upload limit.",
+                        )
+                        return redirect(request.get_full_path())
+                request.upload_handlers = [HashingUploadHandler(request)]
+            return protected_view(request, *args, **kwargs)
+
+        return csrf_exempt(wrapped)
+
+    return decorator
+
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+    """
+    Stream each upload to a temporary file, hashing it on the way and
+    rejecting it as soon as it passes the size limit for its field.
+    Installed per view by @hashing_uploads.
+    """
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.digest = hashlib.sha256()
+        self.received = 0
+        self.limit = upload_limit(field_name)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.limit and self.received > self.limit:
+            self.file.close()
+            if self.request is not None and hasattr(self.request, "_messages"):
+                messages.error(
+                    self.request,
+                    f'"{self.file_name}" is larger than the {filesizeformat(self.limit)} upload limit.',
+                )
+            raise SkipFile()
+        self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        uploaded.sha256 = self.digest.hexdigest()
+        return uploaded
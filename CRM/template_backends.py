@@ -0,0 +1,26 @@
+from django.template.backends.django import DjangoTemplates, Template
+
+from .middleware import timed_template_render
+
+
+# =====================
+# Timed Template Backend
+# =====================
+# The stock Django backend, except that each render is timed for the request
+# metrics (see CRM/middleware.py). Selected by TEMPLATES[...]["BACKEND"] in
+# settings, so nothing is patched at import time.
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        with timed_template_render():
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        template = super().from_string(template_code)
+        return TimedTemplate(template.template, self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
@@ -0,0 +1,75 @@
+import json
+from datetime import date
+
+from django.contrib.messages import get_messages
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from CRM.attendance import bulk_mark_attendance
+from CRM.models import Attendance, AttendanceMonthlySummary, Batch, InternProfile
+
+from .utils import TEST_SETTINGS, seed
+
+
+DAY = date(2024, 3, 5)
+
+
+@override_settings(**TEST_SETTINGS)
+class BulkMarkAttendanceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "at", courses=1, batches=2, trainers=1, interns=3, days=1,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.batch, cls.other_batch = Batch.objects.filter(name__startswith="at").order_by("id")
+        cls.trainer = cls.batch.trainer
+        cls.interns = list(InternProfile.objects.filter(batch=cls.batch).order_by("id"))
+        cls.outsider = InternProfile.objects.filter(batch=cls.other_batch).first()
+
+    def statuses(self):
+        return dict(Attendance.objects.filter(date=DAY).values_list("intern_id", "status"))
+
+    def test_created_updated_and_unchanged_counts(self):
+        first, second, third = (intern.id for intern in self.interns)
+        result = bulk_mark_attendance(self.trainer, self.batch, DAY, {first: "Present", second: "Absent"})
+        self.assertEqual(result, {"created": 2, "updated": 0, "unchanged": 0})
+
+        result = bulk_mark_attendance(
+            self.trainer, self.batch, DAY, {first: "Present", second: "Present", third: "Absent"},
+        )
+        self.assertEqual(result, {"created": 1, "updated": 1, "unchanged": 1})
+        self.assertEqual(self.statuses(), {first: "Present", second: "Present", third: "Absent"})
+
+        summary = AttendanceMonthlySummary.objects.get(intern_id=second, year=DAY.year, month=DAY.month)
+        self.assertEqual((summary.present_count, summary.absent_count), (1, 0))
+
+    def test_unknown_interns_and_statuses_are_skipped(self):
+        first = self.interns[0].id
+        result = bulk_mark_attendance(self.trainer, self.batch, DAY, {
+            first: "Present",
+            self.outsider.id: "Present",  # another batch
+            999999: "Absent",  # no such intern
+            self.interns[1].id: "Late",
+        })
+        self.assertEqual(result, {"created": 1, "updated": 0, "unchanged": 0})
+        self.assertEqual(self.statuses(), {first: "Present"})
+
+    def test_impossible_date_is_rejected(self):
+        self.client.force_login(self.trainer.user)
+        response = self.client.post(reverse("mark_attendance"), {
+            "batch": self.batch.id, "date": "2025-02-30", "save_attendance": "1",
+            f"status_{self.interns[0].id}": "Present",
+        })
+        self.assertRedirects(response, reverse("mark_attendance"), fetch_redirect_response=False)
+        self.assertEqual(
+            [str(message) for message in get_messages(response.wsgi_request)], ["Please select a valid date."],
+        )
+
+        response = self.client.post(
+            reverse("bulk_attendance_api"),
+            json.dumps({"batch": self.batch.id, "date": "2025-02-30", "records": {}}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Attendance.objects.filter(date__year=2025, date__month=2).exists())
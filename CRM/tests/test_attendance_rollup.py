@@ -0,0 +1,96 @@
+from datetime import date
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from CRM.attendance import bulk_mark_attendance, monthly_summary, rebuild_monthly_summaries
+from CRM.models import AttendanceMonthlySummary, Batch, InternProfile, User
+
+from .utils import TEST_SETTINGS, seed
+
+
+@override_settings(**TEST_SETTINGS)
+class MonthlyRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "mr", courses=1, batches=1, trainers=1, interns=2, days=0,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.batch = Batch.objects.get(name__startswith="mr")
+        cls.first, cls.second = InternProfile.objects.filter(batch=cls.batch).order_by("unique_id")
+        trainer = cls.batch.trainer
+        for day, first, second in [(3, "Present", "Absent"), (4, "Present", "Present"), (5, "Absent", "Present")]:
+            bulk_mark_attendance(trainer, cls.batch, date(2024, 3, day), {cls.first.id: first, cls.second.id: second})
+        bulk_mark_attendance(trainer, cls.batch, date(2024, 4, 1), {cls.first.id: "Present"})
+
+    def counts(self, year, month):
+        return [
+            (row["intern__unique_id"], row["present_count"], row["absent_count"])
+            for row in monthly_summary(self.batch, year, month)
+        ]
+
+    def test_rollup_follows_attendance_writes(self):
+        self.assertEqual(self.counts(2024, 3), [(self.first.unique_id, 2, 1), (self.second.unique_id, 2, 1)])
+        self.assertEqual(self.counts(2024, 4), [(self.first.unique_id, 1, 0)])
+
+    def test_rebuild_matches_incremental_rollup(self):
+        before = sorted(AttendanceMonthlySummary.objects.values_list(
+            "intern_id", "batch_id", "year", "month", "present_count", "absent_count",
+        ))
+        AttendanceMonthlySummary.objects.all().delete()
+        self.assertEqual(rebuild_monthly_summaries(), 3)
+        after = sorted(AttendanceMonthlySummary.objects.values_list(
+            "intern_id", "batch_id", "year", "month", "present_count", "absent_count",
+        ))
+        self.assertEqual(after, before)
+
+    def test_monthly_report_reads_the_rollup(self):
+        self.client.force_login(User.objects.get(username="mr_admin"))
+        url = reverse("attendance_report")
+        response = self.client.get(url, {"batch": self.batch.id, "month": "March", "year": "2024"})
+        self.assertEqual(
+            [(row["intern__unique_id"], row["present_count"]) for row in response.context["summary"]],
+            [(self.first.unique_id, 2), (self.second.unique_id, 2)],
+        )
+        # An out-of-range year falls back to this year instead of failing
+        response = self.client.get(url, {"batch": self.batch.id, "month": "March", "year": "99999"})
+        self.assertEqual(response.status_code, 200)
+
+
+class MonthlyRollupBackfillTests(TransactionTestCase):
+    """Migration 0004 fills the rollup for attendance recorded before it existed."""
+
+    before = [("CRM", "0003_alter_attendance_date")]
+    after = [("CRM", "0004_attendancemonthlysummary")]
+
+    def tearDown(self):
+        # Leave the schema fully migrated for the other tests
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_backfill(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        apps = executor.loader.project_state(self.before).apps
+
+        course = apps.get_model("CRM", "Course").objects.create(name="Old course")
+        user = apps.get_model("CRM", "User").objects.create(username="old_trainer", password="x", role="trainer")
+        trainer = apps.get_model("CRM", "TrainerProfile").objects.create(user=user)
+        batch = apps.get_model("CRM", "Batch").objects.create(name="Old batch", course=course, trainer=trainer)
+        user = apps.get_model("CRM", "User").objects.create(username="old_intern", password="x", role="intern")
+        intern = apps.get_model("CRM", "InternProfile").objects.create(user=user, unique_id="OLD001", batch=batch)
+        for day, status in [(1, "Present"), (2, "Absent"), (3, "Present")]:
+            apps.get_model("CRM", "Attendance").objects.create(
+                intern=intern, trainer=trainer, batch=batch, date=date(2023, 11, day), status=status,
+            )
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.after)
+        apps = executor.loader.project_state(self.after).apps
+        summaries = apps.get_model("CRM", "AttendanceMonthlySummary").objects.values_list(
+            "intern_id", "year", "month", "present_count", "absent_count",
+        )
+        self.assertEqual(list(summaries), [(intern.id, 2023, 11, 2, 1)])
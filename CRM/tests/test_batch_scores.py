@@ -0,0 +1,82 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from CRM.models import Assignment, AssignmentSubmission, Batch, InternProfile, User
+from CRM.services import cached_batch_scoreboard
+
+from .utils import TEST_SETTINGS, seed
+
+
+@override_settings(**TEST_SETTINGS)
+class CachedScoreboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "bs", courses=1, batches=2, trainers=1, interns=2, days=0,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.batch, cls.other_batch = Batch.objects.filter(name__startswith="bs").order_by("id")
+        cls.first, cls.second = InternProfile.objects.filter(batch=cls.batch).order_by("id")
+        cls.assignment = Assignment.objects.create(
+            batch=cls.batch, trainer_id=cls.batch.trainer_id, title="Week 1", deadline=timezone.now(),
+        )
+        cls.submissions = [
+            AssignmentSubmission.objects.create(
+                assignment=cls.assignment, intern=intern, file="a.pdf", graded=True, score=score,
+            )
+            for intern, score in ((cls.first, Decimal("8")), (cls.second, Decimal("6")))
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def scores(self):
+        return {row["intern_id"]: row["total_score"] for row in cached_batch_scoreboard(self.batch)}
+
+    def test_hit_costs_no_query(self):
+        cached_batch_scoreboard(self.batch)
+        with self.assertNumQueries(0):
+            cached_batch_scoreboard(self.batch)
+
+    def test_regrade_with_the_same_total(self):
+        self.assertEqual(self.scores(), {self.first.pk: 8, self.second.pk: 6})
+        first, second = self.submissions
+        first.score, second.score = second.score, first.score
+        first.save()
+        second.save()
+        self.assertEqual(self.scores(), {self.first.pk: 6, self.second.pk: 8})
+
+    def test_roster_and_name_changes(self):
+        self.scores()
+        self.second.batch = self.other_batch
+        self.second.save()
+        self.assertEqual(self.scores(), {self.first.pk: 8})
+
+        user = self.first.user
+        user.first_name = "Renamed"
+        user.save()
+        self.assertEqual(cached_batch_scoreboard(self.batch)[0]["name"], f"Renamed {user.last_name}".strip())
+
+        # A login does not drop the cache
+        cached_batch_scoreboard(self.batch)
+        user.save(update_fields=["last_login"])
+        with self.assertNumQueries(0):
+            cached_batch_scoreboard(self.batch)
+
+    def test_assignment_delete(self):
+        self.scores()
+        self.assignment.delete()
+        self.assertEqual(self.scores(), {self.first.pk: 0, self.second.pk: 0})
+
+    def test_chart_labels_are_escaped(self):
+        user = self.first.user
+        user.first_name, user.last_name = "O'Neil", "</script>"
+        user.save()
+        self.client.force_login(User.objects.get(username="bs_admin"))
+        response = self.client.get(f"{reverse('batch_scores')}?batch_id={self.batch.id}")
+        self.assertContains(response, "'O\\u0027Neil \\u003C/script\\u003E'")
+        self.assertNotContains(response, "</script>',")
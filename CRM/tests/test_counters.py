@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from CRM import counters
+from CRM.models import AssessmentSubmission, Batch, InternProfile
+
+from .utils import TEST_SETTINGS, make_assessment, seed
+
+
+@override_settings(**TEST_SETTINGS)
+class PendingCountersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "pc", courses=1, batches=3, trainers=1, interns=1, days=1,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.batches = list(Batch.objects.filter(name__startswith="pc").order_by("id"))
+        cls.users = [InternProfile.objects.get(batch=batch).user for batch in cls.batches]
+
+    def setUp(self):
+        cache.clear()
+
+    def cached(self, user):
+        return cache.get(counters.intern_key(user.id)) is not None
+
+    def pending_assessments(self, user):
+        return counters.get_pending_counts(user)["pending_assessments_count"]
+
+    def test_counts_follow_assessments_and_submissions(self):
+        user = self.users[0]
+        self.assertEqual(self.pending_assessments(user), 0)
+
+        assessment = make_assessment(self.batches[0], [1])
+        self.assertFalse(self.cached(user))
+        self.assertEqual(self.pending_assessments(user), 1)
+
+        AssessmentSubmission.objects.create(assessment=assessment, intern=user.intern_profile, answers={}, score=0)
+        self.assertFalse(self.cached(user))
+        self.assertEqual(self.pending_assessments(user), 0)
+
+    def test_editing_coursework_only_touches_its_batches(self):
+        assessment = make_assessment(self.batches[0], [1])
+        for user in self.users:
+            counters.get_pending_counts(user)
+
+        assessment.title = "Renamed"
+        assessment.save()
+        self.assertEqual([self.cached(user) for user in self.users], [False, True, True])
+
+        # Moving it to another batch refreshes both the old and the new batch
+        for user in self.users:
+            counters.get_pending_counts(user)
+        assessment.batch = self.batches[1]
+        assessment.save()
+        self.assertEqual([self.cached(user) for user in self.users], [False, False, True])
+        self.assertEqual([self.pending_assessments(user) for user in self.users], [0, 1, 0])
+
+        assessment.delete()
+        self.assertEqual([self.cached(user) for user in self.users], [True, False, True])
@@ -0,0 +1,131 @@
+import io
+import os
+import zipfile
+from concurrent.futures import Future
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from CRM import documents
+from CRM.models import Batch, InternProfile, User
+
+from .utils import TEST_SETTINGS, seed, temporary_dirs
+
+
+class FakePool:
+    """Runs submissions inline and records how the pool was used."""
+
+    instances = []
+
+    def __init__(self, max_workers, initializer=None):
+        self.max_workers = max_workers
+        self.shut_down = False
+        FakePool.instances.append(self)
+
+    def submit(self, fn, item):
+        future = Future()
+        future.set_result(fn(item))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+def fake_render(item):
+    key, template_name, context = item
+    return key, f"{template_name}:{context['n']}".encode()
+
+
+@mock.patch.object(documents, "_render_item", fake_render)
+@mock.patch.object(documents, "ProcessPoolExecutor", FakePool)
+class RenderDocumentsTests(SimpleTestCase):
+    items = [(n, "doc.html", {"n": n}) for n in range(6)]
+
+    def setUp(self):
+        FakePool.instances = []
+
+    def test_serial_by_default(self):
+        rendered = dict(documents.render_documents(self.items))
+        self.assertEqual(rendered[5], b"doc.html:5")
+        self.assertEqual(FakePool.instances, [])
+
+    @override_settings(PDF_RENDER_WORKERS=3)
+    def test_pool_is_capped_and_shut_down_when_the_consumer_stops(self):
+        stream = documents.render_documents(self.items, max_workers=documents.render_workers())
+        next(stream)
+        stream.close()
+        [pool] = FakePool.instances
+        self.assertEqual(pool.max_workers, 3)
+        self.assertTrue(pool.shut_down)
+
+        # Never more workers than documents
+        list(documents.render_documents(self.items[:2], max_workers=8))
+        self.assertEqual(FakePool.instances[-1].max_workers, 2)
+
+
+@override_settings(**TEST_SETTINGS)
+class BrandingImageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "bi", courses=1, batches=1, trainers=1, interns=1, days=0,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.intern = InternProfile.objects.select_related("user", "batch__course").get(user__username="bi_intern1")
+
+    def setUp(self):
+        temporary_dirs(self, "MEDIA_ROOT", "PDF_CACHE_DIR")
+
+    def test_templates_reference_images_by_name(self):
+        _filename, template_name, context = documents.build_document("certificate", self.intern)
+        self.assertEqual(context["logo_path"], "branding:vinduslogo.jpg")
+        self.assertEqual(documents.context_assets(context), [
+            os.path.join(settings.BASE_DIR, "static", "images", "vinduslogo.jpg"),
+            os.path.join(settings.BASE_DIR, "static", "images", "signature.png"),
+        ])
+        # Only the known branding files can be resolved
+        self.assertIsNone(documents.branding_link_callback("branding:../../settings.py", None))
+        self.assertIsNone(documents.branding_link_callback("logo.png", None))
+
+        pdf_bytes = documents.render_pdf_bytes(template_name, context)
+        # Logo and signature, each with its alpha mask
+        self.assertEqual(pdf_bytes.count(b"/Subtype /Image"), 4)
+
+
+@override_settings(**TEST_SETTINGS)
+class DocumentZipDownloadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "dz", courses=1, batches=1, trainers=1, interns=3, days=0,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.admin = User.objects.get(username="dz_admin")
+        cls.batch = Batch.objects.get(name__startswith="dz")
+        cls.interns = InternProfile.objects.filter(batch=cls.batch)
+        cls.interns.update(internship_status="Ongoing", undertaking_generated=False)
+
+    def setUp(self):
+        temporary_dirs(self, "MEDIA_ROOT", "PDF_CACHE_DIR")
+        self.client.force_login(self.admin)
+
+    @override_settings(PDF_RENDER_WORKERS=4)
+    def test_batch_zip_is_streamed_without_a_process_pool(self):
+        with mock.patch.object(documents, "ProcessPoolExecutor", side_effect=AssertionError("pool in a request")):
+            response = self.client.get(reverse("undertaking_batch", args=[self.batch.id]))
+            self.assertTrue(response.streaming)
+            # Nothing is rendered or flagged until the body is consumed
+            self.assertEqual(self.interns.filter(undertaking_generated=True).count(), 0)
+            body = b"".join(response.streaming_content)
+
+        with zipfile.ZipFile(io.BytesIO(body)) as zf:
+            names = zf.namelist()
+            self.assertEqual(len(names), 3)
+            self.assertTrue(all(zf.read(name).startswith(b"%PDF") for name in names))
+        self.assertEqual(self.interns.filter(undertaking_generated=True).count(), 3)
+
+        # Already issued interns are not offered again
+        response = self.client.get(reverse("undertaking_batch", args=[self.batch.id]))
+        self.assertFalse(response.streaming)
@@ -0,0 +1,60 @@
+import csv
+import io
+from datetime import date
+
+import openpyxl
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from CRM.exports import XLSX_CONTENT_TYPE
+from CRM.models import Attendance, Batch, User
+
+from .utils import TEST_SETTINGS, seed
+
+
+@override_settings(**TEST_SETTINGS)
+class AttendanceExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "ex", courses=1, batches=1, trainers=1, interns=3, days=3,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.batch = Batch.objects.get(name__startswith="ex")
+        cls.day = Attendance.objects.filter(batch=cls.batch).latest("date").date
+
+    def setUp(self):
+        self.client.force_login(User.objects.get(username="ex_admin"))
+
+    def export(self, kind):
+        response = self.client.get(reverse("attendance_report"), {
+            "batch": self.batch.id, "date": f"{self.day:%Y-%m-%d}", "export": kind,
+        })
+        self.assertEqual(response.status_code, 200)
+        return response, b"".join(response.streaming_content)
+
+    def test_excel(self):
+        response, body = self.export("excel")
+        self.assertEqual(response["Content-Type"], XLSX_CONTENT_TYPE)
+        self.assertIn('filename="attendance_report.xlsx"', response["Content-Disposition"])
+
+        sheet = openpyxl.load_workbook(io.BytesIO(body), read_only=True)["Attendance Report"]
+        rows = [list(row) for row in sheet.iter_rows(values_only=True)]
+        self.assertEqual(rows[:2], [["Attendance Report"], ["Batch", self.batch.name]])
+        self.assertEqual(rows[3][:5], ["Date", "Intern Name", "Unique ID", "Status", "Trainer"])
+        self.assertEqual(sum(1 for row in rows if row[:1] == [f"{self.day:%Y-%m-%d}"]), 3)
+
+    def test_csv_matches_excel_layout(self):
+        response, body = self.export("csv")
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(io.StringIO(body.decode())))
+        self.assertEqual(rows[0], ["Attendance Report"])
+        self.assertIn(["Intern Name", "Unique ID", "Present Days", "Absent Days"], rows)
+        self.assertEqual(len(rows[rows.index(["Summary"]) + 2:]), 3)
+
+    def test_empty_day_renders_the_page(self):
+        response = self.client.get(reverse("attendance_report"), {
+            "batch": self.batch.id, "date": f"{date(2000, 1, 3):%Y-%m-%d}", "export": "excel",
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.streaming)
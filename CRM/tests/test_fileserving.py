@@ -0,0 +1,150 @@
+import os
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from CRM.fileserving import parse_range
+from CRM.models import Batch, InternProfile, LessonFile, RecordedSession
+
+from .utils import TEST_SETTINGS, seed, temporary_dirs
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_whole_file(self):
+        self.assertIsNone(parse_range(None, 100))
+        self.assertIsNone(parse_range("", 100))
+        self.assertIsNone(parse_range("bytes=0-1,5-6", 100))
+        self.assertIsNone(parse_range("items=0-1", 100))
+
+    def test_single_ranges(self):
+        self.assertEqual(parse_range("bytes=0-9", 100), (0, 9))
+        self.assertEqual(parse_range("bytes=90-", 100), (90, 99))
+        self.assertEqual(parse_range("bytes=50-500", 100), (50, 99))
+        self.assertEqual(parse_range("bytes=-10", 100), (90, 99))
+        self.assertEqual(parse_range("bytes=-500", 100), (0, 99))
+
+    def test_unsatisfiable(self):
+        self.assertEqual(parse_range("bytes=100-", 100), "invalid")
+        self.assertEqual(parse_range("bytes=9-3", 100), "invalid")
+        self.assertEqual(parse_range("bytes=-0", 100), "invalid")
+
+
+VIDEO = bytes(range(256)) * 40  # 10240 bytes
+
+
+@override_settings(**TEST_SETTINGS, VIDEO_STREAM_CHUNK_SIZE=1024, VIDEO_STREAM_MAX_RANGE=4096)
+class RecordedSessionStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "rs", courses=1, batches=2, trainers=1, interns=1, days=0,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.batch, other_batch = Batch.objects.filter(name__startswith="rs").order_by("id")
+        cls.intern = InternProfile.objects.get(batch=cls.batch)
+        cls.outsider = InternProfile.objects.get(batch=other_batch)
+        cls.session = RecordedSession.objects.create(
+            batch=cls.batch, trainer=cls.batch.trainer, title="Week 1", video="recorded_sessions/week1.mp4",
+        )
+        cls.url = reverse("recorded_session_stream", args=[cls.session.pk])
+
+    def setUp(self):
+        media_root = temporary_dirs(self, "MEDIA_ROOT")["MEDIA_ROOT"]
+        os.makedirs(os.path.join(media_root, "recorded_sessions"))
+        with open(os.path.join(media_root, "recorded_sessions", "week1.mp4"), "wb") as f:
+            f.write(VIDEO)
+        self.client.force_login(self.intern.user)
+
+    def test_whole_file(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "video/mp4")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Content-Length"], str(len(VIDEO)))
+        chunks = list(response.streaming_content)
+        self.assertEqual(b"".join(chunks), VIDEO)
+        self.assertEqual(max(len(chunk) for chunk in chunks), 1024)
+
+    def test_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=100-199")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(VIDEO)}")
+        self.assertEqual(b"".join(response.streaming_content), VIDEO[100:200])
+
+        # Open-ended ranges are capped, the player asks for the rest as it plays
+        response = self.client.get(self.url, HTTP_RANGE="bytes=1000-")
+        self.assertEqual(response["Content-Range"], f"bytes 1000-5095/{len(VIDEO)}")
+        self.assertEqual(b"".join(response.streaming_content), VIDEO[1000:5096])
+
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(VIDEO)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(VIDEO)}")
+
+    def test_conditional_requests(self):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        # A range for an older version of the file gets the whole new file
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+
+    def test_permissions(self):
+        self.client.force_login(self.outsider.user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        self.client.force_login(self.batch.trainer.user)
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE="bytes=0-0").status_code, 206)
+
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_missing_file_and_unprocessed_hls(self):
+        self.assertEqual(
+            self.client.get(reverse("recorded_session_hls", args=[self.session.pk, "master.m3u8"])).status_code, 404,
+        )
+        os.remove(self.session.video.path)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+PDF = b"%PDF-1.4\n" + bytes(range(256)) * 8
+
+
+@override_settings(**TEST_SETTINGS)
+class SecurePDFViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "sp", courses=1, batches=1, trainers=1, interns=1, days=0,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.batch = Batch.objects.get(name__startswith="sp")
+
+    def setUp(self):
+        temporary_dirs(self, "MEDIA_ROOT")
+        self.lesson = LessonFile.objects.create(
+            trainer=self.batch.trainer, title="Deck", file=ContentFile(PDF, name="deck.pdf"),
+        )
+        self.url = reverse("secure_pdf_view", args=[self.lesson.pk])
+        self.client.force_login(self.batch.trainer.user)
+
+    def test_whole_file_and_ranges(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(response["X-Frame-Options"], "SAMEORIGIN")
+        self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+        self.assertEqual(b"".join(response.streaming_content), PDF)
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-8")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 0-8/{len(PDF)}")
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF-1.4\n")
+
+    def test_missing_file(self):
+        os.remove(self.lesson.file.path)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
@@ -0,0 +1,37 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from CRM.models import Attendance
+
+from .utils import TEST_SETTINGS, seed
+
+
+@override_settings(**TEST_SETTINGS)
+class BenchmarkIndexesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "bi", courses=1, batches=1, trainers=1, interns=3, days=10,
+            assignments=0, assessments=0, doubts=2, projects=0,
+        )
+
+    def test_list_queries_use_their_indexes(self):
+        out = StringIO()
+        call_command("benchmark_indexes", prefix="bi", repeat=1, stdout=out)
+        report = out.getvalue()
+
+        self.assertIn("6 indexes dropped for 'before'", report)
+        self.assertNotIn("not used", report)
+        self.assertIn("crm_att_batch_date_idx", report)
+
+        # The indexes were only dropped inside the rolled back transaction
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Attendance._meta.db_table)
+        self.assertIn("crm_att_batch_date_idx", constraints)
+
+    def test_missing_dataset(self):
+        with self.assertRaises(CommandError):
+            call_command("benchmark_indexes", prefix="nope", stdout=StringIO())
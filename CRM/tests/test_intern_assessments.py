@@ -0,0 +1,54 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from CRM.models import AssessmentSubmission, Batch, InternProfile
+from CRM.services import assessments_for_intern
+
+from .utils import TEST_SETTINGS, make_assessment, seed
+
+
+@override_settings(**TEST_SETTINGS)
+class InternAssessmentsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "ia", courses=1, batches=2, trainers=1, interns=3, days=0,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.batch, cls.other_batch = Batch.objects.filter(name__startswith="ia").order_by("id")
+        cls.intern, cls.classmate, _ = InternProfile.objects.filter(batch=cls.batch).order_by("id")
+        cls.older = make_assessment(cls.batch, [1], title="Older")
+        cls.newer = make_assessment(cls.batch, [1, 2], title="Newer")
+        cls.elsewhere = make_assessment(cls.other_batch, [1], title="Other batch")
+        cls.submission = AssessmentSubmission.objects.create(
+            assessment=cls.older, intern=cls.intern, answers={}, score=1,
+        )
+        # Classmates' submissions must not add rows
+        for assessment in (cls.older, cls.newer):
+            AssessmentSubmission.objects.create(assessment=assessment, intern=cls.classmate, answers={}, score=0)
+
+    def test_batch_assessments_with_own_submission(self):
+        with self.assertNumQueries(1):
+            rows = [
+                (a.title, a.submission_id, a.submission_score) for a in assessments_for_intern(self.intern)
+            ]
+        self.assertEqual(rows, [("Newer", None, None), ("Older", self.submission.id, 1)])
+
+    def test_views(self):
+        self.client.force_login(self.intern.user)
+        response = self.client.get(reverse("intern_assessments"))
+        self.assertEqual(
+            [(row["assessment"].title, row["is_submitted"]) for row in response.context["assignment_data"]],
+            [("Newer", False), ("Older", True)],
+        )
+
+        self.assertRedirects(
+            self.client.get(reverse("take_assessment", args=[self.older.id])),
+            reverse("assessment_result", args=[self.submission.id]), fetch_redirect_response=False,
+        )
+        self.assertEqual(self.client.get(reverse("take_assessment", args=[self.newer.id])).status_code, 200)
+        self.assertRedirects(
+            self.client.get(reverse("take_assessment", args=[self.elsewhere.id])), reverse("dashboard"),
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(self.client.get(reverse("take_assessment", args=[999999])).status_code, 404)
@@ -0,0 +1,85 @@
+import os
+import zipfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import slugify
+
+from CRM.jobs import claim_next_job, queue_document_job, requeue_stale_jobs, run_job
+from CRM.models import Batch, DocumentJob, InternProfile, User
+
+from .utils import TEST_SETTINGS, seed, temporary_dirs
+
+
+@override_settings(**TEST_SETTINGS)
+class DocumentJobTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "dj", courses=1, batches=1, trainers=1, interns=3, days=0,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.admin = User.objects.get(username="dj_admin")
+        cls.batch = Batch.objects.get(name__startswith="dj")
+        cls.interns = InternProfile.objects.filter(batch=cls.batch)
+        cls.interns.update(internship_status="Completed", completion_certificate_generated=False)
+
+    def setUp(self):
+        self.dirs = temporary_dirs(self, "MEDIA_ROOT", "PDF_CACHE_DIR", "DOCUMENT_JOB_DIR")
+
+    def test_queue_skips_ineligible_interns(self):
+        self.assertIsNone(queue_document_job("undertaking", self.interns))
+        job = queue_document_job("certificate", self.interns, user=self.admin, label=self.batch.name)
+        self.assertEqual((job.status, job.total), ("queued", 3))
+
+    def test_claim_and_requeue(self):
+        first = queue_document_job("certificate", self.interns)
+        second = queue_document_job("certificate", self.interns)
+        self.assertEqual(claim_next_job(), first)
+        self.assertEqual(claim_next_job(), second)
+        self.assertIsNone(claim_next_job())
+
+        # A worker that died long ago leaves its job running; only that one is requeued
+        DocumentJob.objects.filter(pk=first.pk).update(started_at=timezone.now() - timedelta(hours=3))
+        self.assertEqual(requeue_stale_jobs(), 1)
+        self.assertEqual(
+            dict(DocumentJob.objects.values_list("pk", "status")), {first.pk: "queued", second.pk: "running"},
+        )
+
+    def test_archive_is_private_and_only_served_by_the_view(self):
+        job = queue_document_job("certificate", self.interns, user=self.admin, label=self.batch.name)
+        run_job(claim_next_job(), max_workers=1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed), ("done", 3))
+
+        # Outside MEDIA_ROOT, under a name that cannot be guessed from the job
+        path = job.result_file.path
+        self.assertTrue(path.startswith(self.dirs["DOCUMENT_JOB_DIR"] + os.sep))
+        self.assertEqual(os.listdir(settings.MEDIA_ROOT), [])
+        self.assertNotIn(job.kind, job.result_file.name)
+        with zipfile.ZipFile(path) as zf:
+            self.assertEqual(len(zf.namelist()), 3)
+        self.assertFalse(self.interns.filter(completion_certificate_generated=False).exists())
+
+        url = reverse("document_job_download", args=[job.pk])
+        self.client.force_login(self.interns[0].user)
+        self.assertRedirects(self.client.get(url), reverse("dashboard"), fetch_redirect_response=False)
+
+        self.client.force_login(self.admin)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'filename="{slugify(job.label)}_certificate.zip"', response["Content-Disposition"])
+        self.assertEqual(b"".join(response.streaming_content)[:2], b"PK")
+        response.close()
+
+    def test_create_ignores_a_foreign_referer(self):
+        self.client.force_login(self.admin)
+        response = self.client.post(
+            reverse("document_job_create"), {"kind": "certificate", "intern_ids": ["1", "x"]},
+            HTTP_REFERER="https://evil.example/",
+        )
+        self.assertRedirects(response, reverse("document_job_list"), fetch_redirect_response=False)
+        self.assertFalse(DocumentJob.objects.exists())
@@ -0,0 +1,97 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from CRM import leaderboard
+from CRM.leaderboard import _rank_in_python, batch_leaderboard, leaderboard_queryset, supports_window_functions
+from CRM.models import AssessmentSubmission, Batch, InternProfile, User
+
+from .utils import TEST_SETTINGS, make_assessment, seed
+
+
+@override_settings(**TEST_SETTINGS)
+class LeaderboardRankingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "lr", courses=1, batches=1, trainers=1, interns=5, days=1,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.batch = Batch.objects.get(name__startswith="lr")
+        cls.interns = list(InternProfile.objects.filter(batch=cls.batch).order_by("id"))
+        first = make_assessment(cls.batch, [1, 1])
+        second = make_assessment(cls.batch, [1, 1])
+        # Two ties (2 + 1 and 1 + 2), one lower score and two interns with nothing
+        for intern, scores in zip(cls.interns, [(2, 1), (1, 2), (1, 0)]):
+            for assessment, score in zip((first, second), scores):
+                AssessmentSubmission.objects.create(assessment=assessment, intern=intern, answers={}, score=score)
+
+    def test_python_ranking_matches_window_functions(self):
+        if not supports_window_functions():
+            self.skipTest("The database has no window functions to compare against.")
+        from_database = list(leaderboard_queryset(self.batch))
+        without_windows = [
+            {k: v for k, v in row.items() if k not in ("rank", "percentile")} for row in from_database
+        ]
+        from_python = _rank_in_python(without_windows)
+
+        self.assertEqual([row["rank"] for row in from_database], [1, 1, 3, 4, 4])
+        self.assertEqual([row["rank"] for row in from_python], [row["rank"] for row in from_database])
+        for python_row, database_row in zip(from_python, from_database):
+            self.assertAlmostEqual(python_row["percentile"], database_row["percentile"])
+
+    def test_pages_keep_batch_wide_ranks(self):
+        for windows in (True, False):
+            with self.subTest(windows=windows), \
+                    mock.patch.object(leaderboard, "supports_window_functions", return_value=windows):
+                page = batch_leaderboard(self.batch, offset=2, limit=2)
+                self.assertEqual([(row["rank"], row["total_score"]) for row in page], [(3, 1), (4, 0)])
+                self.assertEqual(page[0]["percentile"], 60.0)
+                self.assertEqual(page[0]["intern_id"], self.interns[2].id)
+
+
+@override_settings(**TEST_SETTINGS)
+class LeaderboardAccessTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "la", courses=1, batches=1, trainers=1, interns=4, days=1,
+            assignments=0, assessments=2, mcqs=3, doubts=0, projects=0,
+        )
+        cls.intern = User.objects.get(username="la_intern1")
+        cls.batch = Batch.objects.get(pk=cls.intern.intern_profile.batch_id)
+        cls.url = f"{reverse('batch_leaderboard_api', args=[cls.batch.id])}?matrix=1"
+
+    def test_trainer_gets_every_row_of_the_matrix(self):
+        self.client.force_login(self.batch.trainer.user)
+        rows = self.client.get(self.url).json()["results"]
+        self.assertEqual(len(rows), 4)
+        self.assertTrue(all("scores" in row for row in rows))
+
+    def test_intern_only_gets_their_own_scores(self):
+        self.client.force_login(self.intern)
+        rows = self.client.get(self.url).json()["results"]
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(
+            [row["intern_id"] for row in rows if "scores" in row],
+            [self.intern.intern_profile.id],
+        )
+
+    def test_user_without_a_profile_is_refused(self):
+        user = User.objects.create_user("la_orphan", password="x", role="intern")
+        self.client.force_login(user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json()["status"], "error")
+        self.assertRedirects(
+            self.client.get(reverse("batch_assessment_scores")), reverse("dashboard"), fetch_redirect_response=False,
+        )
+
+    def test_bad_paging_parameters(self):
+        self.client.force_login(self.batch.trainer.user)
+        url = reverse("batch_leaderboard_api", args=[self.batch.id])
+        for query in ("limit=x", "limit=0", "offset=-1"):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f"{url}?{query}").status_code, 400)
+        self.assertEqual(self.client.get(f"{url}?limit=100000").json()["limit"], 500)
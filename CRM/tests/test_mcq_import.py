@@ -0,0 +1,170 @@
+import io
+
+from django.contrib.messages import get_messages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from reportlab.pdfgen import canvas
+
+from CRM.mcq_import import parse_mcq_lines, parse_mcq_txt, txt_lines
+from CRM.models import Assessment, AssessmentMCQ, Batch
+
+from .utils import TEST_SETTINGS, seed, temporary_dirs
+
+
+PAPER = """What does HTTP stand for?
+HyperText Transfer Protocol
+High Transfer Text Protocol
+Answer: 1
+
+2 + 2 = ?
+3
+4
+5
+Ans: 2
+"""
+
+
+def make_pdf(pages):
+    """A PDF with one text line per entry of each page in `pages`."""
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=(600, 800))
+    for lines in pages:
+        for number, line in enumerate(lines):
+            pdf.drawString(72, 720 - 20 * number, line)
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+class ParseMCQLinesTests(SimpleTestCase):
+    def test_valid_paper(self):
+        mcqs, errors = parse_mcq_lines([
+            "What does HTTP stand for?",
+            "HyperText Transfer Protocol",
+            "High Transfer Text Protocol",
+            "Answer: 1",
+            "",
+            "2 + 2 = ?",
+            "3",
+            "4",
+            "5",
+            "Ans: 2",
+        ])
+        self.assertEqual(errors, [])
+        self.assertEqual(len(mcqs), 2)
+        self.assertEqual(mcqs[1], {"question_text": "2 + 2 = ?", "options": ["3", "4", "5"], "correct_option": 2})
+
+    def test_answer_line_ends_a_block(self):
+        # PDF text extraction drops blank lines between questions
+        mcqs, errors = parse_mcq_lines(["Q1", "a", "b", "Answer: 2", "Q2", "c", "d", "Answer: 1"])
+        self.assertEqual(errors, [])
+        self.assertEqual([mcq["question_text"] for mcq in mcqs], ["Q1", "Q2"])
+
+    def test_errors_carry_line_numbers(self):
+        mcqs, errors = parse_mcq_lines([
+            "Q1", "a", "b", "Answer: 3",
+            "",
+            "Q2", "a", "Answer: 1",
+            "",
+            "Q3", "a", "b", "c", "d", "e", "Answer: 1",
+            "",
+            "Q4", "a", "b", "Answer: x",
+        ])
+        self.assertEqual(mcqs, [])
+        self.assertEqual(errors, [
+            "Line 4: answer 3 is not one of the 2 options.",
+            "Line 6: expected a question, 2-4 options and an answer line.",
+            "Line 10: 5 options found, at most 4 are allowed.",
+            'Line 21: "x" is not an option number.',
+        ])
+
+    def test_empty_paper(self):
+        self.assertEqual(parse_mcq_lines(["", "  "]), ([], ["No questions found in the file."]))
+
+
+class UploadReaderTests(SimpleTestCase):
+    def test_text_is_read_as_a_stream(self):
+        file = SimpleUploadedFile("quiz.txt", b"\xef\xbb\xbf" + PAPER.replace("\n", "\r\n").encode())
+        lines = txt_lines(file)
+        self.assertNotIsInstance(lines, list)
+        self.assertEqual(next(lines).strip(), "What does HTTP stand for?")  # BOM dropped
+        self.assertEqual(len(parse_mcq_txt(file)[0]), 2)
+
+    def test_lines_and_characters_split_across_chunks(self):
+        file = SimpleUploadedFile("quiz.txt", ("Café?\n" + "é" * 100 + "\nb\nAnswer: 1\n").encode())
+        file.DEFAULT_CHUNK_SIZE = 7
+        mcqs, errors = parse_mcq_txt(file)
+        self.assertEqual(errors, [])
+        self.assertEqual(mcqs[0]["question_text"], "Café?")
+        self.assertEqual(mcqs[0]["options"][0], "é" * 100)
+
+
+@override_settings(**TEST_SETTINGS)
+class CreateAssessmentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "mi", courses=1, batches=1, trainers=1, interns=1, days=0,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.batch = Batch.objects.get(name__startswith="mi")
+
+    def setUp(self):
+        temporary_dirs(self, "MEDIA_ROOT")
+        self.client.force_login(self.batch.trainer.user)
+
+    def create(self, name, data):
+        return self.client.post(reverse("create_assessment"), {
+            "title": "Quiz", "batch": self.batch.id, "file": SimpleUploadedFile(name, data),
+        })
+
+    def messages(self, response):
+        return [str(message) for message in get_messages(response.wsgi_request)]
+
+    def test_valid_paper(self):
+        response = self.create("quiz.txt", PAPER.encode())
+        self.assertRedirects(response, reverse("view_assessments"), fetch_redirect_response=False)
+        assessment = Assessment.objects.get()
+        self.assertEqual(assessment.total_marks, 2)
+        self.assertEqual(
+            list(assessment.mcqs.order_by("id").values_list("question_text", "option_3", "correct_option")),
+            [("What does HTTP stand for?", "", 1), ("2 + 2 = ?", "5", 2)],
+        )
+
+    def test_invalid_paper_creates_nothing(self):
+        paper = "\n\n".join(f"Q{n}\na\nb\nAnswer: 9" for n in range(12))
+        response = self.create("quiz.txt", (PAPER + "\n" + paper).encode())
+        self.assertRedirects(response, reverse("create_assessment"), fetch_redirect_response=False)
+        errors = self.messages(response)
+        self.assertEqual(len(errors), 11)
+        self.assertEqual(errors[0], "Line 15: answer 9 is not one of the 2 options.")
+        self.assertEqual(errors[-1], "...and 2 more problems.")
+        self.assertFalse(Assessment.objects.exists())
+        self.assertFalse(AssessmentMCQ.objects.exists())
+
+    def test_unreadable_files(self):
+        response = self.create("quiz.txt", b"\xff\xfe\x00bad")
+        self.assertEqual(self.messages(response), ["The file is not UTF-8 encoded text."])
+        self.assertIn("Only TXT or PDF files are supported.", self.messages(self.create("quiz.doc", b"Q")))
+        self.assertFalse(Assessment.objects.exists())
+
+    def test_pdf_paper_split_across_pages(self):
+        # Extracted PDF text has no blank lines, and a question runs onto the next page
+        data = make_pdf([
+            ["What does HTTP stand for?", "HyperText Transfer Protocol", "High Transfer Text Protocol",
+             "Answer: 1", "2 + 2 = ?", "3"],
+            ["4", "5", "Ans: 2"],
+        ])
+        self.create("quiz.pdf", data)
+        assessment = Assessment.objects.get()
+        self.assertEqual(
+            list(assessment.mcqs.order_by("id").values_list("question_text", "option_3", "correct_option")),
+            [("What does HTTP stand for?", "", 1), ("2 + 2 = ?", "5", 2)],
+        )
+
+    def test_unreadable_pdf(self):
+        with self.assertLogs("pypdf", "WARNING"):
+            response = self.create("quiz.pdf", b"%PDF-1.4 truncated")
+        self.assertEqual(self.messages(response), ["The PDF could not be read."])
+        self.assertFalse(Assessment.objects.exists())
@@ -0,0 +1,111 @@
+import os
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from CRM import documents, pdf_cache
+from CRM.models import InternProfile, User
+
+from .utils import TEST_SETTINGS, seed, temporary_dirs
+
+
+@override_settings(**TEST_SETTINGS)
+class PDFCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.dirs = temporary_dirs(self, "MEDIA_ROOT", "PDF_CACHE_DIR")
+        pdf_cache.cache.clear()
+
+    def entries(self):
+        return sorted(
+            name for _dirpath, _dirnames, filenames in os.walk(pdf_cache.cache_root()) for name in filenames
+        )
+
+    def test_key_covers_html_and_asset_mtimes(self):
+        asset = os.path.join(self.dirs["MEDIA_ROOT"], "logo.png")
+        with open(asset, "wb") as f:
+            f.write(b"logo")
+        key = pdf_cache.pdf_cache_key("<p>a</p>", [asset])
+        self.assertEqual(pdf_cache.pdf_cache_key("<p>a</p>", [asset]), key)
+        self.assertNotEqual(pdf_cache.pdf_cache_key("<p>b</p>", [asset]), key)
+
+        stat = os.stat(asset)
+        os.utime(asset, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertNotEqual(pdf_cache.pdf_cache_key("<p>a</p>", [asset]), key)
+
+    def test_miss_then_hit(self):
+        key = pdf_cache.pdf_cache_key("<p>a</p>")
+        self.assertIsNone(pdf_cache.get_cached_pdf(key))
+        pdf_cache.store_pdf(key, b"%PDF-1")
+        self.assertEqual(pdf_cache.get_cached_pdf(key), b"%PDF-1")
+        self.assertEqual(pdf_cache.cache_stats(), {"hits": 1, "misses": 1})
+        self.assertEqual(self.entries(), [f"{key}.pdf"])
+
+    def test_html_to_pdf_renders_each_document_once(self):
+        with mock.patch.object(documents.pisa, "CreatePDF", wraps=documents.pisa.CreatePDF) as create_pdf:
+            first = documents.html_to_pdf("<p>Certificate</p>")
+            second = documents.html_to_pdf("<p>Certificate</p>")
+        self.assertTrue(first.startswith(b"%PDF"))
+        self.assertEqual(second, first)
+        self.assertEqual(create_pdf.call_count, 1)
+
+    def test_prune_drops_least_recently_used_entries(self):
+        keys = [pdf_cache.pdf_cache_key(f"<p>{n}</p>") for n in range(3)]
+        for n, key in enumerate(keys):
+            pdf_cache.store_pdf(key, b"x" * 100)
+            path = pdf_cache._path_for(key)
+            os.utime(path, (1_000_000 + n, 1_000_000 + n))
+        # Reading the oldest entry makes it the most recently used
+        pdf_cache.get_cached_pdf(keys[0])
+
+        legacy = os.path.join(settings.MEDIA_ROOT, pdf_cache.LEGACY_MEDIA_DIR)
+        os.makedirs(legacy)
+        self.assertEqual(pdf_cache.prune(max_bytes=200), 1)
+        self.assertEqual(self.entries(), sorted(f"{key}.pdf" for key in (keys[0], keys[2])))
+        self.assertFalse(os.path.exists(legacy))
+
+    def test_store_prunes_every_few_writes(self):
+        with mock.patch.object(pdf_cache, "_stores_since_prune", 0), \
+                mock.patch.object(pdf_cache, "prune") as prune:
+            for n in range(pdf_cache.PRUNE_EVERY - 1):
+                pdf_cache.store_pdf(pdf_cache.pdf_cache_key(str(n)), b"x")
+            prune.assert_not_called()
+            pdf_cache.store_pdf(pdf_cache.pdf_cache_key("last"), b"x")
+            prune.assert_called_once_with()
+
+
+@override_settings(**TEST_SETTINGS)
+class CertificateDownloadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "cd", courses=1, batches=1, trainers=1, interns=1, days=0,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.admin = User.objects.get(username="cd_admin")
+        cls.intern = InternProfile.objects.get(user__username="cd_intern1")
+        cls.intern.internship_status = "Completed"
+        cls.intern.save()
+
+    def setUp(self):
+        temporary_dirs(self, "MEDIA_ROOT", "PDF_CACHE_DIR")
+        pdf_cache.cache.clear()
+        self.client.force_login(self.admin)
+
+    def test_single_certificate_is_rendered_once(self):
+        url = reverse("download_certificate", args=[self.intern.id])
+        first = self.client.get(url)
+        self.assertEqual(first["Content-Type"], "application/pdf")
+        self.assertIn(f"Certificate_{self.intern.unique_id}_", first["Content-Disposition"])
+        self.intern.refresh_from_db()
+        self.assertTrue(self.intern.completion_certificate_generated)
+
+        second = self.client.get(url)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(pdf_cache.cache_stats(), {"hits": 1, "misses": 1})
+
+    def test_only_admins_may_download(self):
+        self.client.force_login(self.intern.user)
+        response = self.client.get(reverse("download_certificate", args=[self.intern.id]))
+        self.assertRedirects(response, reverse("dashboard"), fetch_redirect_response=False)
@@ -0,0 +1,102 @@
+import io
+import os
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from reportlab.pdfgen import canvas
+
+from CRM import pdfpages
+from CRM.models import Batch, LessonFile
+
+from .utils import TEST_SETTINGS, seed, temporary_dirs
+
+
+def make_pdf(pages=2):
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=(600, 800))
+    for number in range(1, pages + 1):
+        pdf.drawString(100, 700, f"Page {number}")
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+@override_settings(**TEST_SETTINGS)
+class LessonPageImageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "pp", courses=1, batches=1, trainers=1, interns=1, days=0,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.batch = Batch.objects.get(name__startswith="pp")
+
+    def setUp(self):
+        temporary_dirs(self, "MEDIA_ROOT")
+        self.lesson = LessonFile.objects.create(
+            trainer=self.batch.trainer, title="Deck", file=ContentFile(make_pdf(), name="deck.pdf"),
+        )
+        self.lesson.batches.set([self.batch])
+        self.client.force_login(self.batch.trainer.user)
+
+    def page_url(self, page, width=1024):
+        return reverse("lesson_page_image", args=[self.lesson.pk, page, width])
+
+    def test_viewer_lists_versioned_pages(self):
+        response = self.client.get(reverse("pdf_viewer_page", args=[self.lesson.pk]))
+        pages = response.context["pages"]
+        self.assertEqual([(page["number"], page["width"], page["height"]) for page in pages], [(1, 600, 800), (2, 600, 800)])
+        version = pdfpages.document_key(self.lesson.file.path)
+        self.assertEqual(pages[0]["src"], f"{self.page_url(1)}?v={version}")
+        self.assertEqual(pages[1]["srcset"].count(f"?v={version}"), len(pdfpages.PAGE_WIDTHS))
+        self.assertNotContains(response, reverse("secure_pdf_view", args=[self.lesson.pk]))
+
+    def test_pages_are_rendered_once_and_revalidated(self):
+        with mock.patch.object(pdfpages, "_rasterize", wraps=pdfpages._rasterize) as rasterize:
+            first = self.client.get(self.page_url(2))
+            second = self.client.get(self.page_url(2))
+        self.assertEqual(rasterize.call_count, 1)
+        self.assertEqual(first["Content-Type"], "image/webp")
+        body = b"".join(first.streaming_content)
+        self.assertEqual(body[8:12], b"WEBP")
+        self.assertEqual(b"".join(second.streaming_content), body)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+        self.assertEqual(self.client.get(self.page_url(2), HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+
+    def test_bad_pages_and_widths(self):
+        self.assertEqual(self.client.get(self.page_url(3)).status_code, 404)
+        self.assertEqual(self.client.get(self.page_url(1, width=1000)).status_code, 404)
+        os.remove(self.lesson.file.path)
+        self.assertEqual(self.client.get(self.page_url(1)).status_code, 404)
+
+    def test_render_failure_is_a_503(self):
+        with mock.patch.object(pdfpages, "_rasterize", side_effect=pdfpages.PageRenderError("boom")), \
+                self.assertLogs("CRM.views", "ERROR"):
+            response = self.client.get(self.page_url(1))
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(os.path.exists(pdfpages.cache_root()))
+
+    def test_embed_fallback(self):
+        url = reverse("pdf_viewer_page", args=[self.lesson.pk])
+        with mock.patch.object(pdfpages, "_pdfium", return_value=None), \
+                mock.patch.object(pdfpages, "_pdftoppm", return_value=None):
+            self.assertTrue(self.client.get(url).context["embed"])
+
+        # A PDF whose pages cannot be read is embedded instead
+        with open(self.lesson.file.path, "wb") as f:
+            f.write(b"not a pdf")
+        with self.assertLogs("CRM.views", "ERROR"):
+            self.assertTrue(self.client.get(url).context["embed"])
+
+    def test_prune_keeps_recently_viewed_pages(self):
+        paths = [pdfpages.page_image_path(self.lesson.file.path, page, 640) for page in (1, 2)]
+        os.utime(paths[0], (1_000_000, 1_000_000))
+        os.utime(paths[1], (2_000_000, 2_000_000))
+        # Viewing page 1 again makes it the most recently used
+        pdfpages.page_image_path(self.lesson.file.path, 1, 640)
+
+        self.assertEqual(pdfpages.prune(max_bytes=os.path.getsize(paths[0])), 1)
+        self.assertEqual([os.path.exists(path) for path in paths], [True, False])
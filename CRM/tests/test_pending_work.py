@@ -0,0 +1,49 @@
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from CRM.models import Assignment, AssignmentSubmission, AssessmentSubmission, Batch, Doubt, InternProfile
+from CRM.services import pending_work_for_intern
+
+from .utils import TEST_SETTINGS, make_assessment, seed
+
+
+@override_settings(**TEST_SETTINGS)
+class PendingWorkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "pw", courses=1, batches=2, trainers=1, interns=1, days=0,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.batch, cls.old_batch = Batch.objects.filter(name__startswith="pw").order_by("id")
+        cls.intern = InternProfile.objects.get(batch=cls.batch)
+
+        taken = make_assessment(cls.batch, [1], title="Taken")
+        make_assessment(cls.batch, [1], title="Open")
+        AssessmentSubmission.objects.create(assessment=taken, intern=cls.intern, answers={}, score=1)
+        assignments = [
+            Assignment.objects.create(batch=batch, trainer_id=batch.trainer_id, title=title, deadline=timezone.now())
+            for batch, title in ((cls.batch, "Current"), (cls.old_batch, "From the old batch"))
+        ]
+        # Work done before moving batches does not count towards the new one
+        AssignmentSubmission.objects.create(assignment=assignments[1], intern=cls.intern, file="a.pdf")
+        for resolved in (False, False, True):
+            Doubt.objects.create(
+                intern=cls.intern, trainer=cls.batch.trainer, batch=cls.batch, question="?", resolved=resolved,
+            )
+
+    def test_counts_are_batch_scoped_and_use_one_query(self):
+        with self.assertNumQueries(1):
+            work = pending_work_for_intern(self.intern)
+        self.assertEqual(work, {
+            "total_assessments": 2, "pending_assessments": 1,
+            "total_assignments": 1, "pending_assignments": 1,
+            "pending_doubts": 2,
+        })
+
+    def test_intern_without_a_batch(self):
+        self.intern.batch = None
+        self.intern.save()
+        work = pending_work_for_intern(self.intern)
+        self.assertEqual(work["total_assessments"] + work["total_assignments"], 0)
+        self.assertEqual(work["pending_doubts"], 2)
@@ -0,0 +1,80 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from CRM.models import Batch, User
+
+from .utils import TEST_SETTINGS, make_assessment, seed
+
+
+# =====================
+# Query Budgets
+# =====================
+# The heavy views must issue a fixed number of queries however many interns,
+# assessments or attendance rows a batch has; a failure here usually means an
+# N+1 crept back in. Budgets are for a warm cache (the sidebar counters and
+# scoreboards are cached), which is the steady state in production.
+
+@override_settings(**TEST_SETTINGS)
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "qb", courses=1, batches=2, trainers=2, interns=6, days=20,
+            assignments=3, assessments=3, mcqs=5, doubts=1, projects=1,
+        )
+        cls.admin = User.objects.get(username="qb_admin")
+        cls.intern = User.objects.get(username="qb_intern1")
+        cls.batch = Batch.objects.get(pk=cls.intern.intern_profile.batch_id)
+        cls.trainer = cls.batch.trainer.user
+
+    def setUp(self):
+        cache.clear()
+
+    def assertQueryBudget(self, user, url, budget):
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(url).status_code, 200)  # warm the caches
+        with self.assertNumQueries(budget):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_attendance_report_day(self):
+        url = f"{reverse('attendance_report')}?batch={self.batch.id}&date={date.today():%Y-%m-%d}"
+        self.assertQueryBudget(self.admin, url, 7)
+
+    def test_attendance_report_month(self):
+        today = date.today()
+        url = f"{reverse('attendance_report')}?batch={self.batch.id}&month={today:%B}&year={today.year}"
+        self.assertQueryBudget(self.admin, url, 7)
+
+    def test_batch_scores(self):
+        url = f"{reverse('batch_scores')}?batch_id={self.batch.id}"
+        self.assertQueryBudget(self.admin, url, 4)
+
+    def test_batch_assessment_scores(self):
+        url = f"{reverse('batch_assessment_scores')}?batch_id={self.batch.id}"
+        response = self.assertQueryBudget(self.admin, url, 6)
+        self.assertEqual(len(response.context["scoreboard"]), 6)
+
+    def test_batch_leaderboard_api(self):
+        url = f"{reverse('batch_leaderboard_api', args=[self.batch.id])}?limit=500&matrix=1"
+        response = self.assertQueryBudget(self.trainer, url, 9)
+        self.assertEqual(len(response.json()["results"]), 6)
+
+    def test_intern_overview(self):
+        self.assertQueryBudget(self.intern, reverse("intern_overview"), 17)
+
+    def test_take_assessment(self):
+        assessment = make_assessment(self.batch, [1, 2, 3, 4])
+        response = self.assertQueryBudget(self.intern, reverse("take_assessment", args=[assessment.id]), 4)
+        self.assertContains(response, "Question 4")
+
+
+class MigrationTests(TestCase):
+    def test_models_match_migrations(self):
+        # Exits non-zero when a model change has no migration
+        call_command("makemigrations", "CRM", check=True, dry_run=True, verbosity=0)
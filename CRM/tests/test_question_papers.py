@@ -0,0 +1,63 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from CRM import question_papers
+from CRM.models import Batch, InternProfile
+from CRM.question_papers import paper_key, question_paper
+
+from .utils import TEST_SETTINGS, make_assessment, seed
+
+
+@override_settings(**TEST_SETTINGS)
+class QuestionPaperCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "ci", courses=1, batches=1, trainers=1, interns=2, days=1,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.batch = Batch.objects.get(name__startswith="ci")
+        cls.interns = list(InternProfile.objects.filter(batch=cls.batch).order_by("id"))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_question_paper_follows_mcq_changes(self):
+        assessment = make_assessment(self.batch, [1, 2])
+        self.assertIn("Question 1", question_paper(assessment))
+        self.assertIsNotNone(cache.get(paper_key(assessment.id)))
+
+        mcq = assessment.mcqs.order_by("id").first()
+        mcq.question_text = "Reworded question"
+        mcq.save()
+        self.assertIsNone(cache.get(paper_key(assessment.id)))
+        self.assertIn("Reworded question", question_paper(assessment))
+
+        assessment_id = assessment.id
+        assessment.delete()
+        self.assertIsNone(cache.get(paper_key(assessment_id)))
+
+    def test_interns_share_one_rendering(self):
+        assessment = make_assessment(self.batch, [1, 2])
+        assessment.mcqs.filter(question_text="Question 1").update(question_text="Is <b>2 > 1</b>?")
+        url = reverse("take_assessment", args=[assessment.id])
+
+        with mock.patch.object(question_papers, "render_paper", wraps=question_papers.render_paper) as render:
+            responses = []
+            for intern in self.interns:
+                self.client.force_login(intern.user)
+                responses.append(self.client.get(url))
+        self.assertEqual(render.call_count, 1)
+        for response in responses:
+            self.assertContains(response, "Is &lt;b&gt;2 &gt; 1&lt;/b&gt;?")
+            self.assertContains(response, 'name="csrfmiddlewaretoken"')
+        self.assertNotEqual(responses[0].context["csrf_token"], responses[1].context["csrf_token"])
+
+    @override_settings(ASSESSMENT_PAPER_CACHE_TIMEOUT=0)
+    def test_cache_can_be_turned_off(self):
+        assessment = make_assessment(self.batch, [1])
+        self.assertIn("Question 1", question_paper(assessment))
+        self.assertIsNone(cache.get(paper_key(assessment.id)))
@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from CRM import metrics
+from CRM.models import Batch, User
+
+from .utils import TEST_SETTINGS, seed
+
+
+class FingerprintTests(SimpleTestCase):
+    def test_literals_and_in_lists_are_folded(self):
+        self.assertEqual(
+            metrics.fingerprint('SELECT "a", "b" FROM "t" WHERE "id" IN (%s, %s, %s) AND "name" = \'x\' LIMIT 21'),
+            'SELECT … FROM "t" WHERE "id" IN (%s…) AND "name" = ? LIMIT ?',
+        )
+        self.assertEqual(
+            metrics.fingerprint("SELECT x FROM t WHERE id IN (%s, %s)"),
+            metrics.fingerprint("SELECT y FROM t WHERE id IN (%s, %s, %s, %s)"),
+        )
+
+
+@override_settings(**TEST_SETTINGS)
+class RequestMetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "rm", courses=1, batches=1, trainers=1, interns=3, days=3,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.admin = User.objects.get(username="rm_admin")
+        cls.batch = Batch.objects.get(name__startswith="rm")
+
+    def setUp(self):
+        self.directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(REQUEST_METRICS_ENABLED=True, REQUEST_METRICS_DIR=self.directory))
+        self.client.force_login(self.admin)
+
+    def recorded(self, url):
+        """(metrics entry, body, queries run) for one GET of `url`, body consumed."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+            body = b"".join(response.streaming_content) if response.streaming else response.content
+            response.close()
+        [name] = os.listdir(self.directory)
+        with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+            return json.loads(f.read().splitlines()[-1]), body, len(queries)
+
+    def test_rendered_page(self):
+        entry, body, queries = self.recorded(f"{reverse('attendance_report')}?batch={self.batch.id}")
+        self.assertEqual(entry["view"], "attendance_report")
+        self.assertEqual(entry["bytes"], len(body))
+        self.assertEqual(entry["queries"], queries)
+        self.assertGreater(entry["template_ms"], 0)
+        self.assertFalse(entry["over_budget"])
+
+    def test_streamed_export_is_recorded_when_closed(self):
+        entry, body, queries = self.recorded(
+            f"{reverse('attendance_report')}?batch={self.batch.id}&date={date.today():%Y-%m-%d}&export=csv"
+        )
+        # The report rows are queried while the CSV streams, after the view returned
+        self.assertEqual(entry["bytes"], len(body))
+        self.assertEqual(entry["queries"], queries)
+
+    @override_settings(REQUEST_QUERY_BUDGETS={"attendance_report": 2})
+    def test_over_budget_views_are_flagged_and_summarized(self):
+        url = f"{reverse('attendance_report')}?batch={self.batch.id}"
+        with self.assertLogs("CRM.middleware", "WARNING") as logs:
+            entry, _body, queries = self.recorded(url)
+            self.recorded(url)
+        self.assertTrue(entry["over_budget"])
+        self.assertIn(f"attendance_report ran {queries} queries (budget 2)", logs.output[0])
+
+        [row] = metrics.summarize()
+        self.assertEqual((row["view"], row["requests"], row["over_budget"], row["budget"]), ("attendance_report", 2, 2, 2))
+        self.assertEqual(row["max_queries"], queries)
+
+    def test_old_day_files_are_rotated(self):
+        today = date.today()
+        old = os.path.join(self.directory, f"requests-{today - timedelta(days=30):%Y-%m-%d}.jsonl")
+        recent = os.path.join(self.directory, f"requests-{today - timedelta(days=1):%Y-%m-%d}.jsonl")
+        for path in (old, recent):
+            open(path, "w").close()
+
+        with mock.patch.object(metrics, "_last_rotation_day", None):
+            metrics.record({"view": "x", "ts": 0})
+        self.assertFalse(os.path.exists(old))
+        self.assertTrue(os.path.exists(recent))
@@ -0,0 +1,92 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from CRM.models import AssessmentMCQ, AssessmentSubmission, Batch, InternProfile
+from CRM.scoring import answer_key, regrade_assessment, score_answers
+
+from .utils import TEST_SETTINGS, make_assessment, seed
+
+
+@override_settings(**TEST_SETTINGS)
+class ScoringTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "sc", courses=1, batches=1, trainers=1, interns=5, days=1,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.batch = Batch.objects.get(name__startswith="sc")
+        cls.interns = list(InternProfile.objects.filter(batch=cls.batch).order_by("id"))
+
+    def test_score_answers(self):
+        assessment = make_assessment(self.batch, [1, 2, 3])
+        key = answer_key(assessment)
+        first, second, third = key.mcq_ids
+        self.assertEqual(score_answers(key, {first: 1, second: 2, third: 3}), 3)
+        self.assertEqual(score_answers(key, {first: "1", second: 4}), 1)
+        self.assertEqual(score_answers(key, {first: "", second: None, "999": 1}), 0)
+        self.assertEqual(score_answers(key, {}), 0)
+
+    def test_regrade_assessment(self):
+        assessment = make_assessment(self.batch, [1, 2])
+        key = answer_key(assessment)
+        first, second = key.mcq_ids
+        for intern, answers in zip(self.interns, [{first: 1, second: 2}, {first: 1, second: 3}, {}]):
+            AssessmentSubmission.objects.create(
+                assessment=assessment, intern=intern, answers=answers, score=score_answers(key, answers),
+            )
+        # The key for the second question was wrong, and a third question is added
+        AssessmentMCQ.objects.filter(pk=second).update(correct_option=3)
+        AssessmentMCQ.objects.create(
+            assessment=assessment, question_text="Question 3", option_1="A", option_2="B", correct_option=1,
+        )
+
+        expected = {"submissions": 3, "changed": 2, "total_marks": (2, 3)}
+        self.assertEqual(regrade_assessment(assessment, dry_run=True), expected)
+        self.assertEqual(
+            list(assessment.submissions.order_by("intern_id").values_list("score", flat=True)),
+            [Decimal(2), Decimal(1), Decimal(0)],
+        )
+
+        self.assertEqual(regrade_assessment(assessment), expected)
+        self.assertEqual(
+            list(assessment.submissions.order_by("intern_id").values_list("score", flat=True)),
+            [Decimal(1), Decimal(2), Decimal(0)],
+        )
+        assessment.refresh_from_db()
+        self.assertEqual(assessment.total_marks, 3)
+        self.assertEqual(regrade_assessment(assessment)["changed"], 0)
+
+    def test_take_assessment_scores_the_posted_answers(self):
+        assessment = make_assessment(self.batch, [1, 2, 3])
+        first, second, third = answer_key(assessment).mcq_ids
+        self.client.force_login(self.interns[0].user)
+        response = self.client.post(reverse("take_assessment", args=[assessment.id]), {
+            f"mcq_{first}": "1", f"mcq_{second}": "3", f"mcq_{third}": "not a number", "mcq_999": "1",
+        })
+        submission = AssessmentSubmission.objects.get(assessment=assessment)
+        self.assertRedirects(response, reverse("assessment_result", args=[submission.id]), fetch_redirect_response=False)
+        self.assertEqual(submission.score, 1)
+        self.assertEqual(submission.answers, {str(first): 1, str(second): 3, str(third): 0})
+
+    def test_regrade_command(self):
+        assessment = make_assessment(self.batch, [1], title="Fixed key")
+        AssessmentSubmission.objects.create(assessment=assessment, intern=self.interns[0], answers={}, score=1)
+
+        out = StringIO()
+        call_command("regrade_assessment", "--batch", str(self.batch.id), "--dry-run", stdout=out)
+        self.assertIn(f"#{assessment.id} Fixed key: 1 of 1 submission(s) rescored", out.getvalue())
+        self.assertIn("1 of 1 submission score(s) would change.", out.getvalue())
+        self.assertEqual(assessment.submissions.get().score, 1)
+
+        call_command("regrade_assessment", str(assessment.id), stdout=StringIO())
+        self.assertEqual(assessment.submissions.get().score, 0)
+
+        with self.assertRaisesMessage(CommandError, "Unknown assessment id(s): 999999"):
+            call_command("regrade_assessment", "999999", stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command("regrade_assessment", stdout=StringIO())
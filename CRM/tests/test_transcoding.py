@@ -0,0 +1,127 @@
+import os
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from CRM import transcoding
+from CRM.models import Batch, RecordedSession
+
+from .utils import TEST_SETTINGS, seed, temporary_dirs
+
+
+def fake_rendition(path, out_dir, rendition, audio):
+    """Stand-in for the ffmpeg transcode: one playlist per rendition."""
+    name = rendition[0]
+    os.makedirs(os.path.join(out_dir, name))
+    with open(os.path.join(out_dir, name, "index.m3u8"), "w") as f:
+        f.write("#EXTM3U\n")
+    return {"name": name, "height": rendition[1], "bandwidth": 1000, "playlist": f"{name}/index.m3u8"}
+
+
+def fake_poster(path, out_dir, duration):
+    open(os.path.join(out_dir, transcoding.POSTER_NAME), "wb").close()
+    return transcoding.POSTER_NAME
+
+
+@override_settings(**TEST_SETTINGS)
+class TranscodingQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "tc", courses=1, batches=1, trainers=1, interns=1, days=0,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.batch = Batch.objects.get(name__startswith="tc")
+
+    def setUp(self):
+        temporary_dirs(self, "MEDIA_ROOT")
+        for step, fake in [
+            ("probe", mock.Mock(return_value=(61.4, 1280, 720))),
+            ("has_audio", mock.Mock(return_value=True)),
+            ("extract_poster", fake_poster),
+            ("transcode_rendition", fake_rendition),
+        ]:
+            self.enterContext(mock.patch.object(transcoding, step, fake))
+
+    def make_session(self, title="Week 1", **fields):
+        return RecordedSession.objects.create(
+            batch=self.batch, trainer=self.batch.trainer, title=title, video=f"recorded_sessions/{title}.mp4",
+            **fields,
+        )
+
+    def status(self, session):
+        session.refresh_from_db()
+        return session.processing_status
+
+    def test_claim_oldest_pending_first(self):
+        first = self.make_session("first")
+        second = self.make_session("second")
+        self.make_session("done", processing_status="ready")
+
+        self.assertEqual(transcoding.claim_next_session(), first)
+        self.assertEqual(transcoding.claim_next_session(), second)
+        self.assertIsNone(transcoding.claim_next_session())
+        self.assertIsNotNone(RecordedSession.objects.get(pk=first.pk).processing_started_at)
+
+    def test_requeue_only_stale_sessions(self):
+        now = timezone.now()
+        stale = self.make_session("stale", processing_status="processing", processing_started_at=now - timedelta(days=1))
+        unknown = self.make_session("unknown", processing_status="processing")
+        running = self.make_session("running", processing_status="processing", processing_started_at=now)
+
+        self.assertEqual(transcoding.requeue_stale_sessions(), 2)
+        self.assertEqual(
+            [self.status(session) for session in (stale, unknown, running)], ["pending", "pending", "processing"],
+        )
+
+    def test_process_session(self):
+        session = self.make_session()
+        self.assertTrue(transcoding.process_session(transcoding.claim_next_session()))
+
+        session.refresh_from_db()
+        self.assertTrue(session.is_ready)
+        self.assertEqual(session.duration, timedelta(seconds=61))
+        self.assertEqual([r["name"] for r in session.renditions], ["720p", "480p", "360p"])
+
+        out_dir = os.path.join(settings.MEDIA_ROOT, session.hls_dir)
+        self.assertEqual(
+            sorted(os.listdir(out_dir)), ["360p", "480p", "720p", transcoding.MASTER_PLAYLIST, transcoding.POSTER_NAME],
+        )
+        with open(os.path.join(out_dir, transcoding.MASTER_PLAYLIST)) as f:
+            self.assertIn("RESOLUTION=854x480", f.read())
+
+    def test_output_is_discarded_when_the_video_is_replaced(self):
+        session = self.make_session()
+        claimed = transcoding.claim_next_session()
+
+        def replace_upload(*args):
+            # The trainer uploads a new video while the old one is transcoding
+            replaced = RecordedSession.objects.get(pk=session.pk)
+            replaced.video = "recorded_sessions/week1-v2.mp4"
+            transcoding.reset_processing(replaced)
+            replaced.save()
+            return fake_rendition(*args)
+
+        with mock.patch.object(transcoding, "transcode_rendition", replace_upload):
+            self.assertFalse(transcoding.process_session(claimed))
+
+        session.refresh_from_db()
+        self.assertEqual((session.processing_status, session.hls_dir), ("pending", ""))
+        self.assertEqual(os.listdir(os.path.join(settings.MEDIA_ROOT, transcoding.HLS_ROOT)), [])
+
+    def test_failure_is_recorded(self):
+        session = self.make_session()
+        with mock.patch.object(transcoding, "probe", side_effect=transcoding.TranscodingError("No video stream")):
+            with self.assertRaises(transcoding.TranscodingError):
+                transcoding.process_session(transcoding.claim_next_session())
+
+        session.refresh_from_db()
+        self.assertEqual((session.processing_status, session.processing_error), ("failed", "No video stream"))
+        self.assertEqual(os.listdir(os.path.join(settings.MEDIA_ROOT, transcoding.HLS_ROOT)), [])
+
+    def test_renditions_never_upscale(self):
+        self.assertEqual([r[0] for r in transcoding.renditions_for(1080)], ["1080p", "720p", "480p", "360p"])
+        self.assertEqual([r[0] for r in transcoding.renditions_for(240)], ["360p"])
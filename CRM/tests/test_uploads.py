@@ -0,0 +1,124 @@
+import hashlib
+import os
+import time
+from io import StringIO
+
+from django.contrib.messages import get_messages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from CRM import storage
+from CRM.models import Batch, LessonFile
+
+from .utils import TEST_SETTINGS, seed, temporary_dirs
+
+
+DECK = b"%PDF-1.4 the same deck for every batch"
+
+
+@override_settings(**TEST_SETTINGS, UPLOAD_MAX_BYTES=1000, UPLOAD_MAX_BYTES_BY_FIELD={})
+class ContentAddressedUploadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "up", courses=1, batches=2, trainers=1, interns=1, days=0,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.batches = list(Batch.objects.filter(name__startswith="up").order_by("id"))
+        cls.trainer = cls.batches[0].trainer
+
+    def setUp(self):
+        temporary_dirs(self, "MEDIA_ROOT")
+        self.client.force_login(self.trainer.user)
+
+    def upload(self, name, data, batch, client=None):
+        return (client or self.client).post(reverse("upload_lesson"), {
+            "title": name, "batches": [batch.id], "file": SimpleUploadedFile(name, data),
+        })
+
+    def blob_path(self, data):
+        return storage.content_storage.path(storage.blob_name(hashlib.sha256(data).hexdigest(), "upload.pdf"))
+
+    def age(self, path):
+        old = time.time() - storage.BLOB_GRACE_SECONDS - 60
+        os.utime(path, (old, old))
+
+    def messages(self, response):
+        return [str(message) for message in get_messages(response.wsgi_request)]
+
+    def test_identical_uploads_share_one_blob_and_keep_their_names(self):
+        self.upload("Devtown_training.pdf", DECK, self.batches[0])
+        self.upload("Devtown_training_1.pdf", DECK, self.batches[1])
+
+        first, second = LessonFile.objects.order_by("id")
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(first.file.path, self.blob_path(DECK))
+        self.assertEqual((first.original_name, second.original_name), ("Devtown_training.pdf", "Devtown_training_1.pdf"))
+        self.assertEqual(len(os.listdir(os.path.dirname(self.blob_path(DECK)))), 1)
+
+    def test_blob_is_deleted_with_its_last_reference(self):
+        self.upload("a.pdf", DECK, self.batches[0])
+        self.upload("b.pdf", DECK, self.batches[1])
+        path = self.blob_path(DECK)
+        self.age(path)
+        first, second = LessonFile.objects.order_by("id")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(os.path.exists(path))
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(os.path.exists(path))
+
+    def test_replaced_file_is_released(self):
+        self.upload("v1.pdf", DECK, self.batches[0])
+        lesson = LessonFile.objects.get()
+        old_path = lesson.file.path
+        self.age(old_path)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("edit_lesson", args=[lesson.pk]), {
+                "title": "Deck", "file": SimpleUploadedFile("v2.pdf", b"%PDF-1.4 revised"),
+            })
+        lesson.refresh_from_db()
+        self.assertEqual(lesson.original_name, "v2.pdf")
+        self.assertTrue(os.path.exists(lesson.file.path))
+        self.assertFalse(os.path.exists(old_path))
+
+        # A title-only edit keeps the file and its name
+        self.client.post(reverse("edit_lesson", args=[lesson.pk]), {"title": "Renamed"})
+        lesson.refresh_from_db()
+        self.assertEqual((lesson.title, lesson.original_name), ("Renamed", "v2.pdf"))
+
+    def test_recently_reused_blob_is_kept_for_prune(self):
+        self.upload("a.pdf", DECK, self.batches[0])
+        path = self.blob_path(DECK)
+        with self.captureOnCommitCallbacks(execute=True):
+            LessonFile.objects.get().delete()
+        # An upload of the same content may be about to reference it
+        self.assertTrue(os.path.exists(path))
+
+        call_command("dedupe_uploads", prune=True, stdout=StringIO())
+        self.assertTrue(os.path.exists(path))
+        self.age(path)
+        call_command("dedupe_uploads", prune=True, stdout=StringIO())
+        self.assertFalse(os.path.exists(path))
+
+    def test_oversized_uploads_are_rejected(self):
+        # Over the field limit while streaming
+        response = self.upload("big.pdf", b"x" * 5000, self.batches[0])
+        self.assertEqual(self.messages(response), ['"big.pdf" is larger than the 1000\xa0bytes upload limit.'])
+
+        # Over it by Content-Length alone: turned away before the body is read
+        response = self.upload("huge.pdf", b"x" * (storage.UPLOAD_FORM_OVERHEAD + 2000), self.batches[0])
+        self.assertRedirects(response, reverse("upload_lesson"), fetch_redirect_response=False)
+        self.assertIn("The upload is larger than the 1000\xa0bytes upload limit.", self.messages(response))
+        self.assertFalse(LessonFile.objects.exists())
+
+    def test_csrf_is_still_checked(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.trainer.user)
+        self.assertEqual(self.upload("a.pdf", DECK, self.batches[0], client=client).status_code, 403)
+        self.assertFalse(LessonFile.objects.exists())
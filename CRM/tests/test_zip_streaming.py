@@ -0,0 +1,100 @@
+import io
+import zipfile
+from unittest import mock
+
+from django.contrib.messages import get_messages
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from CRM import documents
+from CRM.exports import zip_response, zip_stream
+from CRM.models import Batch, InternProfile, User
+
+from .utils import TEST_SETTINGS, seed, temporary_dirs
+
+
+class ZipStreamTests(SimpleTestCase):
+    def test_each_entry_is_sent_before_the_next_is_produced(self):
+        produced = []
+
+        def entries():
+            for n in range(3):
+                produced.append(n)
+                yield f"{n}.pdf", b"%PDF" + bytes([n]) * 1000
+
+        stream = zip_stream(entries())
+        first = next(stream)
+        self.assertEqual(produced, [0])
+        self.assertIn(b"0.pdf", first)
+
+        body = first + b"".join(stream)
+        with zipfile.ZipFile(io.BytesIO(body)) as zf:
+            self.assertEqual(zf.namelist(), ["0.pdf", "1.pdf", "2.pdf"])
+            self.assertEqual(zf.read("2.pdf"), b"%PDF" + b"\x02" * 1000)
+
+    def test_response_headers(self):
+        response = zip_response("batch.zip", iter([("a.pdf", b"a")]), zipfile.ZIP_STORED)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="batch.zip"')
+        with zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content))) as zf:
+            self.assertEqual(zf.getinfo("a.pdf").compress_type, zipfile.ZIP_STORED)
+
+
+@override_settings(**TEST_SETTINGS)
+class CertificateZipTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(
+            "cz", courses=1, batches=1, trainers=1, interns=3, days=0,
+            assignments=0, assessments=0, doubts=0, projects=0,
+        )
+        cls.admin = User.objects.get(username="cz_admin")
+        cls.batch = Batch.objects.get(name__startswith="cz")
+        cls.interns = InternProfile.objects.filter(batch=cls.batch).order_by("id")
+        cls.interns.update(internship_status="Completed", completion_certificate_generated=False)
+
+    def setUp(self):
+        temporary_dirs(self, "MEDIA_ROOT", "PDF_CACHE_DIR")
+        self.client.force_login(self.admin)
+
+    def download_batch(self):
+        return self.client.post(reverse("manage_certificates"), {"action": "download_batch", "batch_id": self.batch.id})
+
+    def test_failed_renders_are_skipped_and_left_pending(self):
+        broken = self.interns[1]
+        real_render = documents.render_pdf_bytes
+
+        def render(template_name, context):
+            return None if context["intern"].pk == broken.pk else real_render(template_name, context)
+
+        with mock.patch.object(documents, "render_pdf_bytes", render):
+            response = self.download_batch()
+            body = b"".join(response.streaming_content)
+
+        self.assertEqual(
+            [str(message) for message in get_messages(response.wsgi_request)],
+            ["Download of 3 certificate(s) started. Interns whose PDF could not be rendered are left pending "
+             "and can be downloaded again."],
+        )
+        with zipfile.ZipFile(io.BytesIO(body)) as zf:
+            self.assertEqual(len(zf.namelist()), 2)
+            self.assertNotIn(broken.unique_id, " ".join(zf.namelist()))
+        self.assertEqual(
+            list(self.interns.filter(completion_certificate_generated=False).values_list("pk", flat=True)),
+            [broken.pk],
+        )
+
+        # Only the pending intern is rendered next time
+        response = self.download_batch()
+        with zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content))) as zf:
+            self.assertEqual(len(zf.namelist()), 1)
+
+    def test_nothing_left_to_download(self):
+        self.interns.update(completion_certificate_generated=True)
+        response = self.download_batch()
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            [str(message) for message in get_messages(response.wsgi_request)],
+            ["No new certificates to generate. All selected interns already have a certificate."],
+        )
@@ -0,0 +1,44 @@
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from CRM.models import Assessment, AssessmentMCQ
+
+
+# Tests never write to the project's file cache or request_metrics/
+TEST_SETTINGS = dict(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    REQUEST_METRICS_ENABLED=False,
+)
+
+
+def seed(prefix, **options):
+    """A small seed_demo_data dataset whose usernames start with `prefix`."""
+    call_command("seed_demo_data", prefix=prefix, stdout=StringIO(), **options)
+
+
+def make_assessment(batch, mcqs, title="Quiz"):
+    """An assessment of `batch` with one MCQ per correct option in `mcqs`."""
+    assessment = Assessment.objects.create(
+        batch=batch, trainer_id=batch.trainer_id, title=title, total_marks=len(mcqs),
+    )
+    AssessmentMCQ.objects.bulk_create([
+        AssessmentMCQ(
+            assessment=assessment, question_text=f"Question {n}",
+            option_1="A", option_2="B", option_3="C", option_4="D", correct_option=correct,
+        )
+        for n, correct in enumerate(mcqs, start=1)
+    ])
+    return assessment
+
+
+def temporary_dirs(testcase, *setting_names):
+    """
+    Point each named directory setting (MEDIA_ROOT, PDF_CACHE_DIR, ...) at a
+    fresh temporary directory for the rest of `testcase`. Returns {name: path}.
+    """
+    paths = {name: testcase.enterContext(tempfile.TemporaryDirectory()) for name in setting_names}
+    testcase.enterContext(override_settings(**paths))
+    return paths
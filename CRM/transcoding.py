@@ -0,0 +1,239 @@
+import json
+import os
+import shutil
+import subprocess
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import RecordedSession
+
+
+# =====================
+# Recorded Session Processing (HLS)
+# =====================
+# `python manage.py process_recordings` picks up sessions whose
+# processing_status is "pending" and, using the local ffmpeg/ffprobe binaries:
+#   1. probes duration and source resolution,
+#   2. grabs a poster frame,
+#   3. transcodes an H.264/AAC rendition ladder segmented for HLS,
+#   4. writes a master playlist,
+# all under MEDIA_ROOT/recorded_sessions/hls/<pk>/. The original upload is
+# left untouched and is still served as the fallback.
+
+HLS_ROOT = os.path.join("recorded_sessions", "hls")
+HLS_SEGMENT_SECONDS = 6
+MASTER_PLAYLIST = "master.m3u8"
+POSTER_NAME = "poster.jpg"
+
+# (name, height, video bitrate, audio bitrate)
+RENDITION_LADDER = (
+    ("1080p", 1080, "5000k", "192k"),
+    ("720p", 720, "2800k", "128k"),
+    ("480p", 480, "1400k", "128k"),
+    ("360p", 360, "800k", "96k"),
+)
+
+
+PROCESSING_STALE_AFTER = 6 * 60 * 60  # seconds
+
+
+class TranscodingError(Exception):
+    pass
+
+
+def ffmpeg_binary():
+    return shutil.which(getattr(settings, "FFMPEG_BINARY", "ffmpeg"))
+
+
+def ffprobe_binary():
+    return shutil.which(getattr(settings, "FFPROBE_BINARY", "ffprobe"))
+
+
+def _run(args):
+    result = subprocess.run(args, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise TranscodingError(result.stderr.strip()[-2000:] or f"{args[0]} exited with {result.returncode}")
+    return result.stdout
+
+
+def _kbps(bitrate):
+    return int(bitrate.rstrip("k")) * 1000
+
+
+# -----------------------
+# Steps
+# -----------------------
+def probe(path):
+    """Return (duration_seconds, width, height) of the first video stream."""
+    output = _run([
+        ffprobe_binary(), "-v", "error",
+        "-print_format", "json", "-show_format", "-show_streams", path,
+    ])
+    info = json.loads(output)
+    video = next((s for s in info.get("streams", []) if s.get("codec_type") == "video"), None)
+    if video is None:
+        raise TranscodingError("No video stream found in the upload.")
+    duration = float(info.get("format", {}).get("duration") or video.get("duration") or 0)
+    return duration, int(video.get("width") or 0), int(video.get("height") or 0)
+
+
+def has_audio(path):
+    output = _run([
+        ffprobe_binary(), "-v", "error", "-select_streams", "a",
+        "-show_entries", "stream=index", "-of", "csv=p=0", path,
+    ])
+    return bool(output.strip())
+
+
+def extract_poster(path, out_dir, duration):
+    poster_path = os.path.join(out_dir, POSTER_NAME)
+    offset = min(5.0, duration / 10) if duration else 0
+    _run([
+        ffmpeg_binary(), "-y", "-v", "error",
+        "-ss", f"{offset:.2f}", "-i", path,
+        "-frames:v", "1", "-vf", "scale=640:-2", poster_path,
+    ])
+    return POSTER_NAME
+
+
+def renditions_for(source_height):
+    """Every ladder step not taller than the source (at least the smallest one)."""
+    ladder = [r for r in RENDITION_LADDER if r[1] <= source_height]
+    return ladder or [RENDITION_LADDER[-1]]
+
+
+def transcode_rendition(path, out_dir, rendition, audio):
+    name, height, video_bitrate, audio_bitrate = rendition
+    rendition_dir = os.path.join(out_dir, name)
+    os.makedirs(rendition_dir, exist_ok=True)
+
+    args = [
+        ffmpeg_binary(), "-y", "-v", "error", "-i", path,
+        "-vf", f"scale=-2:{height}",
+        "-c:v", "libx264", "-preset", "veryfast", "-profile:v", "main",
+        "-b:v", video_bitrate, "-maxrate", video_bitrate, "-bufsize", f"{_kbps(video_bitrate) * 2 // 1000}k",
+        # Keyframe on every segment boundary so all renditions switch cleanly
+        "-force_key_frames", f"expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})", "-sc_threshold", "0",
+    ]
+    if audio:
+        args += ["-c:a", "aac", "-b:a", audio_bitrate, "-ac", "2"]
+    else:
+        args += ["-an"]
+    args += [
+        "-f", "hls", "-hls_time", str(HLS_SEGMENT_SECONDS), "-hls_playlist_type", "vod",
+        "-hls_segment_filename", os.path.join(rendition_dir, "seg_%05d.ts"),
+        os.path.join(rendition_dir, "index.m3u8"),
+    ]
+    _run(args)
+
+    return {
+        "name": name,
+        "height": height,
+        "bandwidth": _kbps(video_bitrate) + (_kbps(audio_bitrate) if audio else 0),
+        "playlist": f"{name}/index.m3u8",
+    }
+
+
+def write_master_playlist(out_dir, renditions, source_width, source_height):
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3"]
+    for rendition in renditions:
+        width = round(source_width * rendition["height"] / source_height / 2) * 2 if source_height else 0
+        resolution = f",RESOLUTION={width}x{rendition['height']}" if width else ""
+        lines.append(f"#EXT-X-STREAM-INF:BANDWIDTH={rendition['bandwidth']}{resolution}")
+        lines.append(rendition["playlist"])
+    with open(os.path.join(out_dir, MASTER_PLAYLIST), "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+# -----------------------
+# Queue
+# -----------------------
+def claim_next_session():
+    """Atomically move the oldest pending session to processing."""
+    for session_id in RecordedSession.objects.filter(processing_status="pending").order_by("uploaded_at").values_list("id", flat=True)[:10]:
+        claimed = RecordedSession.objects.filter(pk=session_id, processing_status="pending").update(
+            processing_status="processing", processing_error=None, processing_started_at=timezone.now()
+        )
+        if claimed:
+            return RecordedSession.objects.get(pk=session_id)
+    return None
+
+
+def requeue_stale_sessions():
+    """
+    Put sessions whose worker died mid-transcode back in the queue: those
+    "processing" for longer than RECORDING_PROCESSING_STALE_AFTER seconds, or
+    claimed before the start time was recorded.
+    """
+    stale_after = getattr(settings, "RECORDING_PROCESSING_STALE_AFTER", PROCESSING_STALE_AFTER)
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    return RecordedSession.objects.filter(processing_status="processing").filter(
+        Q(processing_started_at__lt=cutoff) | Q(processing_started_at__isnull=True)
+    ).update(processing_status="pending", processing_started_at=None)
+
+
+def process_session(session):
+    """
+    Build the HLS renditions, poster and metadata for one claimed session.
+    Returns False when the video was replaced (or the session re-queued)
+    while transcoding, in which case the output is discarded.
+    """
+    relative_dir = os.path.join(HLS_ROOT, str(session.pk))
+    out_dir = os.path.join(settings.MEDIA_ROOT, relative_dir)
+    work_dir = out_dir + ".tmp"
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir)
+
+    # Results are only recorded while the row still describes the upload that
+    # was transcoded; replacing the video resets it to "pending" meanwhile.
+    claimed = RecordedSession.objects.filter(
+        pk=session.pk,
+        processing_status="processing",
+        processing_started_at=session.processing_started_at,
+        video=session.video.name,
+    )
+
+    try:
+        source = session.video.path
+        duration, width, height = probe(source)
+        audio = has_audio(source)
+        poster = extract_poster(source, work_dir, duration)
+        renditions = [transcode_rendition(source, work_dir, r, audio) for r in renditions_for(height)]
+        write_master_playlist(work_dir, renditions, width, height)
+    except Exception as exc:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        claimed.update(processing_status="failed", processing_error=str(exc), processed_at=timezone.now())
+        raise
+
+    if not claimed.exists():
+        shutil.rmtree(work_dir, ignore_errors=True)
+        return False
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(work_dir, out_dir)
+    return bool(claimed.update(
+        processing_status="ready",
+        processing_error=None,
+        processed_at=timezone.now(),
+        duration=timedelta(seconds=round(duration)),
+        hls_dir=relative_dir.replace(os.sep, "/"),
+        poster=poster,
+        renditions=renditions,
+    ))
+
+
+def reset_processing(session):
+    """Mark a session for reprocessing after its video was replaced."""
+    if session.hls_dir:
+        shutil.rmtree(os.path.join(settings.MEDIA_ROOT, session.hls_dir), ignore_errors=True)
+    session.processing_status = "pending"
+    session.processing_error = None
+    session.processing_started_at = None
+    session.processed_at = None
+    session.duration = None
+    session.hls_dir = ""
+    session.poster = ""
+    session.renditions = []
@@ -5,14 +5,26 @@ from django.core.exceptions import ValidationError
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse, HttpResponseForbidden
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils._os import safe_join
 from xhtml2pdf import pisa
 from django.template.loader import render_to_string
 import io
+import mimetypes
 from datetime import date
 import zipfile
 from .models import *
 from .forms import *
+from .services import assessments_for_intern, pending_work_for_intern
+from .documents import (
+    DOCUMENT_FLAGS, branding_image, branding_link_callback, build_document, document_zip_entries, eligible_interns,
+    render_pdf_bytes,
+)
+from .exports import zip_response
+from .fileserving import serve_protected_file
+from .storage import hashing_uploads
+from .transcoding import reset_processing
 
 
 def home(request):
@@ -137,9 +149,14 @@ def dashboard_view(request):
     elif request.user.role == "admin":
         return render(request, "dashboards/administratordashboard.html")
     elif request.user.role == "trainer":
-        return render(request, "dashboards/trainerdashboard.html")
+        trainer_profile = getattr(request.user, "trainer_profile", None)
+        # Leaderboards are fetched per batch from batch_leaderboard_api
+        batches = trainer_profile.assigned_batches.order_by("name") if trainer_profile else []
+        return render(request, "dashboards/trainerdashboard.html", {"leaderboard_batches": batches})
     elif request.user.role == "intern":
-        return render(request, "dashboards/interndashboard.html")
+        intern_profile = getattr(request.user, "intern_profile", None)
+        work = pending_work_for_intern(intern_profile) if intern_profile else None
+        return render(request, "dashboards/interndashboard.html", {"pending_work": work})
     else:
         return render(request, "dashboards/defaultdashboard.html")
 
@@ -150,7 +167,12 @@ def dashboard_view(request):
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import require_POST
 from .models import TrainerProfile, Batch, InternProfile, Attendance
+from .attendance import bulk_mark_attendance
+import json
 
 @login_required
 def mark_attendance(request):
@@ -176,14 +198,20 @@ def mark_attendance(request):
 
             # Save attendance
             if "save_attendance" in request.POST:
-                for intern in interns:
-                    status = request.POST.get(f"status_{intern.id}")
-                    if status:
-                        Attendance.objects.update_or_create(
-                            intern=intern,
-                            date=date,
-                            defaults={"trainer": trainer, "batch": selected_batch, "status": status},
-                        )
+                try:
+                    attendance_date = parse_date(date or "")
+                except ValueError:
+                    # Well formed but impossible, e.g. 2025-02-30
+                    attendance_date = None
+                if not attendance_date:
+                    messages.error(request, "Please select a valid date.")
+                    return redirect("mark_attendance")
+
+                statuses = {
+                    intern.id: request.POST.get(f"status_{intern.id}")
+                    for intern in interns
+                }
+                bulk_mark_attendance(trainer, selected_batch, attendance_date, statuses)
                 messages.success(request, f"Attendance saved for {selected_batch.name} on {date}.")
                 return redirect("mark_attendance")
 
@@ -193,10 +221,55 @@ def mark_attendance(request):
         "selected_batch": selected_batch,
     })
 
+
+@login_required
+@require_POST
+def bulk_attendance_api(request):
+    """
+    JSON roster endpoint for trainers:
+    {"batch": 3, "date": "2025-10-01", "records": {"<intern_id>": "Present", ...}}
+    """
+    if not hasattr(request.user, "trainer_profile"):
+        return JsonResponse({"status": "error", "message": "Only trainers can mark attendance."}, status=403)
+
+    trainer = request.user.trainer_profile
+    try:
+        payload = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({"status": "error", "message": "Invalid JSON body."}, status=400)
+
+    if not isinstance(payload, dict):
+        payload = {}
+    records = payload.get("records")
+    try:
+        attendance_date = parse_date(str(payload.get("date", "")))
+    except ValueError:
+        attendance_date = None
+    if not isinstance(records, dict) or not attendance_date:
+        return JsonResponse({"status": "error", "message": "'date' and 'records' are required."}, status=400)
+
+    batch_id = payload.get("batch")
+    if isinstance(batch_id, str) and batch_id.strip().isdigit():
+        batch_id = int(batch_id)
+    if not isinstance(batch_id, int) or isinstance(batch_id, bool):
+        return JsonResponse({"status": "error", "message": "'batch' must be a batch id."}, status=400)
+
+    batch = Batch.objects.filter(id=batch_id, trainer=trainer).first()
+    if batch is None:
+        return JsonResponse({"status": "error", "message": "Batch not found."}, status=404)
+
+    try:
+        counts = bulk_mark_attendance(trainer, batch, attendance_date, records)
+    except ValueError:
+        return JsonResponse({"status": "error", "message": "Intern ids must be integers."}, status=400)
+
+    return JsonResponse({"status": "success", "date": attendance_date.isoformat(), **counts})
+
 # =====================
 # File Upload / View
 # =====================
 @login_required
+@hashing_uploads("file")
 def upload_lesson(request):
     if request.user.role != "trainer":
         return redirect('dashboard')
@@ -222,8 +295,20 @@ from django.contrib.auth.decorators import login_required
 from django.http import HttpResponse
 from django.conf import settings
 from .models import LessonFile
+from .pdfpages import (
+    PAGE_WIDTHS,
+    PageRenderError,
+    can_rasterize,
+    document_key,
+    page_image_path,
+    page_sizes,
+)
+from django.urls import reverse
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 @login_required
 def view_lessons(request):
     user = request.user
@@ -240,6 +325,7 @@ def view_lessons(request):
     return render(request, "files/view.html", {"lessons": lessons})
 
 @login_required
+@hashing_uploads("file")
 def edit_lesson(request, pk):
     lesson = get_object_or_404(LessonFile, pk=pk)
 
@@ -289,26 +375,73 @@ def delete_lesson(request, pk):
 def secure_pdf_view(request, lesson_id):
     """Serve PDF with security headers to prevent download"""
     lesson = get_object_or_404(LessonFile, id=lesson_id)
-    
-    # Read the file
-    with open(lesson.file.path, 'rb') as pdf_file:
-        response = HttpResponse(pdf_file.read(), content_type='application/pdf')
-        
-        # Security headers to discourage downloading
-        response['Content-Disposition'] = 'inline; filename="document.pdf"'
-        response['X-Content-Type-Options'] = 'nosniff'
-        response['X-Frame-Options'] = 'SAMEORIGIN'
-        response['Cache-Control'] = 'no-cache, no-store, must-revalidate,private'
-        response['Pragma'] = 'no-cache'
-        response['Expires'] = '0'
-        
-        return response
+    if not lesson.file or not os.path.exists(lesson.file.path):
+        raise Http404("Lesson file not found.")
+
+    # Streamed with Range support so the viewer can render page 1 from the first chunk
+    response = serve_protected_file(request, lesson.file.path, 'application/pdf', filename='document.pdf')
+
+    # Security headers to discourage downloading
+    response['X-Content-Type-Options'] = 'nosniff'
+    response['X-Frame-Options'] = 'SAMEORIGIN'
+    return response
 
 @login_required
 def pdf_viewer_page(request, lesson_id):
     """Render a custom PDF viewer page"""
     lesson = get_object_or_404(LessonFile, id=lesson_id)
-    return render(request, 'files/pdf_viewer.html', {'lesson': lesson})
+    if not lesson.file or not os.path.exists(lesson.file.path):
+        raise Http404("Lesson file not found.")
+
+    # Pages are shown as server-rendered images; the browser lazy-loads the
+    # ones scrolled into view and never receives the PDF itself. Without a
+    # rasterizer, or for a PDF whose pages cannot be read, fall back to
+    # embedding the protected PDF as before.
+    if not can_rasterize():
+        return render(request, 'files/pdf_viewer.html', {'lesson': lesson, 'embed': True})
+
+    pages = []
+    try:
+        version = document_key(lesson.file.path)
+        for number, (width, height) in enumerate(page_sizes(lesson.file.path), start=1):
+            pages.append({
+                'number': number,
+                'width': round(width),
+                'height': round(height),
+                'srcset': ', '.join(
+                    f"{reverse('lesson_page_image', args=[lesson.id, number, w])}?v={version} {w}w"
+                    for w in PAGE_WIDTHS
+                ),
+                'src': f"{reverse('lesson_page_image', args=[lesson.id, number, PAGE_WIDTHS[1]])}?v={version}",
+            })
+    except Exception:
+        logger.exception("Could not read pages of lesson %s", lesson.id)
+        return render(request, 'files/pdf_viewer.html', {'lesson': lesson, 'embed': True})
+
+    return render(request, 'files/pdf_viewer.html', {'lesson': lesson, 'pages': pages})
+
+
+@login_required
+def lesson_page_image(request, lesson_id, page, width):
+    """One page of a lesson PDF as WebP, rendered and cached on first request."""
+    lesson = get_object_or_404(LessonFile, id=lesson_id)
+    if not lesson.file or not os.path.exists(lesson.file.path):
+        raise Http404("Lesson file not found.")
+    if width not in PAGE_WIDTHS:
+        raise Http404("Unsupported page width.")
+
+    try:
+        image_path = page_image_path(lesson.file.path, page, width)
+    except IndexError:
+        raise Http404("Page not found.")
+    except PageRenderError:
+        logger.exception("Could not render page %s of lesson %s", page, lesson.id)
+        return HttpResponse("This page could not be rendered.", status=503)
+
+    # The URL carries the document version (?v=...), so a cached page stays valid
+    response = serve_protected_file(request, image_path, 'image/webp', cache_control='private, max-age=86400')
+    response['X-Content-Type-Options'] = 'nosniff'
+    return response
 
 # -------------------------
 # Helper function to generate PDF
@@ -347,17 +480,6 @@ def undertaking_certificates_home(request):
     )
 
 
-def generate_pdf_from_html(html_content):
-    """
-    Utility: Generate PDF bytes from HTML
-    """
-    pdf_buffer = io.BytesIO()
-    pisa_status = pisa.CreatePDF(html_content, dest=pdf_buffer)
-    if pisa_status.err:
-        return None
-    pdf_buffer.seek(0)
-    return pdf_buffer
-
 @login_required
 def generate_intern_pdf(request, mode, identifier=None):
     """
@@ -385,13 +507,7 @@ def generate_intern_pdf(request, mode, identifier=None):
 
     elif mode == "multiple":
         intern_ids = request.POST.getlist("intern_ids")
-        interns = list(
-            InternProfile.objects.filter(
-                id__in=intern_ids,
-                internship_status="Ongoing",
-                undertaking_generated=False,
-            )
-        )
+        interns = list(eligible_interns("undertaking", InternProfile.objects.filter(id__in=intern_ids)))
         if not interns:
             return HttpResponse(
                 "None of the selected interns are eligible for certificate generation "
@@ -400,12 +516,7 @@ def generate_intern_pdf(request, mode, identifier=None):
 
     elif mode == "batch":
         batch = get_object_or_404(Batch, id=identifier)
-        interns = list(
-            batch.interns.filter(
-                internship_status="Ongoing",
-                undertaking_generated=False
-            )
-        )
+        interns = list(eligible_interns("undertaking", batch.interns.all()))
         if not interns:
             return HttpResponse(
                 f"No eligible interns in batch '{batch.name}' for certificate generation."
@@ -416,91 +527,34 @@ def generate_intern_pdf(request, mode, identifier=None):
     # ----------------------
     if len(interns) == 1:
         intern = interns[0]
-        logo_path = os.path.join(settings.BASE_DIR, 'static/images/vinduslogo.jpg')
-        signature_path = os.path.join(settings.BASE_DIR, 'static/images/signature.png')  # New image
-
-        context = {
-            "intern_name": intern.user.get_full_name(),
-            "course": intern.batch.course,
-            "batch": intern.batch,
-            "company": {
-                "name": "VINDUS ENVIRONMENT PRIVATE LIMITED",
-                "cin": "U62099TS2023PTC179794",
-                "address": "#9-110, Shanti Nagar, Dilsukhnagar, Hyderabad- 500 060",
-                "phone": "+914049525396",
-                "website": "www.vindusenvironment.com"
-            },
-            "today_date": date.today().strftime("%d-%m-%Y"),  # ✅ Fixed
-            "logo_path": logo_path,
-            "signature_path": signature_path,  # Add here
-
-        }
-
-        html_content = render_to_string("undertaking_letter.html", context)
-        pdf_buffer = generate_pdf_from_html(html_content)
-        if not pdf_buffer:
+        filename, template_name, context = build_document("undertaking", intern)
+        pdf_bytes = render_pdf_bytes(template_name, context)
+        if not pdf_bytes:
             return HttpResponse("Error generating PDF")
 
         intern.undertaking_generated = True
         intern.save()
 
-        response = HttpResponse(pdf_buffer, content_type="application/pdf")
-        filename = f"{intern.unique_id}_{intern.user.get_full_name()}_undertaking.pdf"
-        filename = filename.upper()
+        response = HttpResponse(pdf_bytes, content_type="application/pdf")
         response["Content-Disposition"] = f'attachment; filename="{filename}"'
         return response
 
     # ----------------------
     # MULTIPLE/BATCH => ZIP
     # ----------------------
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "w") as zip_file:
-        for intern in interns:
-            logo_path = os.path.join(settings.BASE_DIR, 'static/images/vinduslogo.jpg')
-            signature_path = os.path.join(settings.BASE_DIR, 'static/images/signature.png')  # New image
-
-            context = {
-                "intern_name": intern.user.get_full_name(),
-                "course": intern.batch.course,
-                "batch": intern.batch,
-                "company": {
-                    "name": "VINDUS ENVIRONMENT PRIVATE LIMITED",
-                    "cin": "U62099TS2023PTC179794",
-                    "address": "#9-110, Shanti Nagar, Dilsukhnagar, Hyderabad- 500 060",
-                    "phone": "+914049525396",
-                    "website": "www.vindusenvironment.com"
-                },
-                "today_date": date.today().strftime("%d-%m-%Y"),  # ✅ Fixed
-                "logo_path": logo_path,
-                "signature_path": signature_path,  # Add here
-
-            }
-            html_content = render_to_string("undertaking_letter.html", context)
-            pdf_buffer = generate_pdf_from_html(html_content)
-            if not pdf_buffer:
-                continue
-
-            filename = f"{intern.unique_id}_{intern.user.get_full_name()}_undertaking.pdf"
-            filename = filename.upper()
-            zip_file.writestr(filename, pdf_buffer.read())
-
-            intern.undertaking_generated = True
-            intern.save()
-
-    zip_buffer.seek(0)
-    response = HttpResponse(zip_buffer, content_type="application/zip")
+    # Streamed: each PDF goes out as soon as it is rendered
     if mode == "batch":
-        response["Content-Disposition"] = f'attachment; filename="{batch.name.upper()}_UNDERTAKINGS.ZIP"'
+        zip_filename = f"{batch.name.upper()}_UNDERTAKINGS.ZIP"
     else:
-        response["Content-Disposition"] = 'attachment; filename="UNDERTAKINGS.ZIP"'
-    return response
+        zip_filename = "UNDERTAKINGS.ZIP"
+    return zip_response(zip_filename, document_zip_entries("undertaking", interns), zipfile.ZIP_STORED)
 
 
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.views.generic import ListView, DetailView
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.views.generic.edit import CreateView, UpdateView, DeleteView
 from .models import Batch
 from .forms import BatchForm
@@ -585,42 +639,12 @@ def generate_pdf_for_intern(intern):
     """
     Renders an HTML template for a single intern's certificate and returns it as PDF bytes.
     """
-    # Get absolute path to logo
-    logo_path = os.path.join(settings.BASE_DIR, 'static', 'images', 'vinduslogo.jpg')
-    signature_path = os.path.join(settings.BASE_DIR, 'static', 'images', 'signature.png')
-
-    
-    context = {
-        'intern': intern,
-        'today_date': date.today().strftime("%d-%m-%Y"),
-        'logo_path': logo_path,
-        'signature_path': signature_path
-
-    }
-    
-    html_string = render_to_string('certificates/certificate_template.html', context)
-    result = io.BytesIO()
-    pisa_status = pisa.CreatePDF(io.StringIO(html_string), dest=result)
-
-    if pisa_status.err:
+    _filename, template_name, context = build_document('certificate', intern)
+    pdf_bytes = render_pdf_bytes(template_name, context)
+    if pdf_bytes is None:
         raise Exception('Error generating PDF')
-
-    pdf_bytes = result.getvalue()
-    result.close()
     return pdf_bytes
 
-def render_to_pdf(template_path, context_dict):
-    """
-    Utility function to render an HTML template to PDF bytes.
-    """
-    html = render_to_string(template_path, context_dict)
-    result = io.BytesIO()
-    pdf = pisa.CreatePDF(html, dest=result)
-    
-    if not pdf.err:
-        return result.getvalue()
-    return None
-
 # ================================
 # Certificate Management Views
 # ================================
@@ -681,28 +705,19 @@ def manage_certificates_view(request):
             )
 
         if interns_to_process and interns_to_process.exists():
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
-                count_generated = 0
-                for intern in interns_to_process:
-                    # Skip if certificate already generated
-                    if intern.completion_certificate_generated:
-                        continue
-
-                    pdf_bytes = generate_pdf_for_intern(intern)
-                    filename = f"Certificate_{intern.unique_id}_{intern.user.get_full_name()}.pdf"
-                    zf.writestr(filename, pdf_bytes)
-
-                    # Mark as generated
-                    intern.completion_certificate_generated = True
-                    intern.save(update_fields=['completion_certificate_generated'])
-                    count_generated += 1
+            # Skips interns whose certificate was already generated
+            pending = list(eligible_interns('certificate', interns_to_process))
+            count_generated = len(pending)
 
             if count_generated > 0:
-                zip_buffer.seek(0)
-                response = HttpResponse(zip_buffer, content_type='application/zip')
-                response['Content-Disposition'] = 'attachment; filename="certificates.zip"'
-                messages.success(request, f"Successfully generated {count_generated} new certificates.")
+                # Streamed; each intern is marked as generated once their PDF is sent
+                response = zip_response('certificates.zip', document_zip_entries('certificate', pending))
+                # Sent before the ZIP renders, so it cannot report the outcome
+                messages.info(
+                    request,
+                    f"Download of {count_generated} certificate(s) started. Interns whose PDF could not be "
+                    "rendered are left pending and can be downloaded again.",
+                )
                 return response
             else:
                 messages.warning(request, "No new certificates to generate. All selected interns already have a certificate.")
@@ -719,50 +734,6 @@ def manage_certificates_view(request):
     return render(request, 'certificates/manage_certificates.html', context)
 
 
-@login_required
-def download_certificate_view(request, intern_id):
-    """
-    Generates a single PDF certificate, but only if one hasn't been generated before.
-    """
-    if not (request.user.is_superuser or request.user.role == 'admin'):
-        messages.error(request, "You do not have permission to perform this action.")
-        return redirect('dashboard')
-
-    intern = get_object_or_404(InternProfile, id=intern_id)
-
-    # Prevent re-download
-    if intern.completion_certificate_generated:
-        messages.warning(request, f"Certificate for {intern.user.get_full_name()} has already been generated.")
-        return redirect('manage_certificates')
-
-    if intern.internship_status != 'Completed':
-        messages.error(request, f"Cannot generate certificate. {intern.user.get_full_name()}'s internship is not marked as completed.")
-        return redirect('manage_certificates')
-
-    pdf_bytes = generate_pdf_for_intern(intern)
-
-    # Mark certificate as generated
-    intern.completion_certificate_generated = True
-    intern.save(update_fields=['completion_certificate_generated'])
-
-    response = HttpResponse(pdf_bytes, content_type='application/pdf')
-    filename = f"Certificate_{intern.unique_id}_{intern.user.get_full_name()}.pdf"
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    return response
-
-
-# ================================
-# Helper Functions
-# ================================
-def render_to_pdf(template_path, context_dict):
-    template = render_to_string(template_path, context_dict)
-    pdf_bytes = io.BytesIO()
-    pisa_status = pisa.CreatePDF(template, dest=pdf_bytes)
-    if pisa_status.err:
-        return None
-    pdf_bytes.seek(0)
-    return pdf_bytes.getvalue()
-
 # ================================
 # Individual Certificate Download View
 # ================================
@@ -948,18 +919,6 @@ from django.template.loader import render_to_string
 from xhtml2pdf import pisa
 import io
 
-def render_to_pdf(template_path, context_dict):
-    """
-    Utility function to render HTML template to PDF
-    """
-    html = render_to_string(template_path, context_dict)
-    result = io.BytesIO()
-    pdf = pisa.CreatePDF(html, dest=result)
-    
-    if not pdf.err:
-        return result.getvalue()
-    return None 
-
 @login_required
 def manage_lor_view(request):
     """
@@ -1017,37 +976,15 @@ def manage_lor_view(request):
             interns_to_process = InternProfile.objects.filter(batch_id=batch_id, **base_filters).exclude(project_title__isnull=True).exclude(project_title__exact='')
 
         if interns_to_process and interns_to_process.exists():
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
-                logo_path = os.path.join(settings.BASE_DIR, 'static/images/vinduslogo.png')
-                signature_path = os.path.join(settings.BASE_DIR, 'static/images/signature.png')  # New image
-
-                for intern in interns_to_process:
-                    context = {
-                        'intern': intern,
-                        "company": {
-                            "name": "VINDUS ENVIRONMENT PRIVATE LIMITED",
-                            "cin": "U62099TS2023PTC179794",
-                            "address": "#9-110, Shanti Nagar, Dilsukhnagar, Hyderabad- 500 060",
-                            "phone": "+914049525396",
-                            "website": "www.vindusenvironment.com"
-                        },
-                        "today_date": date.today().strftime("%d-%m-%Y"),
-                        "logo_path": logo_path,
-                        "signature_path": signature_path  # Add here
-
-                    }
-                    pdf_bytes = render_to_pdf('lors/lor_template.html', context)
-                    if pdf_bytes:
-                        filename = f"LOR_{intern.unique_id}_{intern.user.get_full_name()}.pdf"
-                        zf.writestr(filename, pdf_bytes)
-
-            interns_to_process.update(lor_generated=True)
-
-            zip_buffer.seek(0)
-            response = HttpResponse(zip_buffer, content_type='application/zip')
-            response['Content-Disposition'] = 'attachment; filename="Letters_of_Recommendation.zip"'
-            messages.success(request, f"Successfully generated {interns_to_process.count()} new LORs.")
+            pending = list(eligible_interns('lor', interns_to_process))
+            # Streamed; each intern is marked as generated once their PDF is sent
+            response = zip_response('Letters_of_Recommendation.zip', document_zip_entries('lor', pending))
+            # Sent before the ZIP renders, so it cannot report the outcome
+            messages.info(
+                request,
+                f"Download of {len(pending)} LOR(s) started. Interns whose PDF could not be rendered "
+                "are left pending and can be downloaded again.",
+            )
             return response
         else:
             # ✅ MODIFIED: Improved warning message
@@ -1081,36 +1018,154 @@ def download_lor_view(request, intern_id):
         messages.error(request, "LOR cannot be generated because the project title is missing.")
         return redirect('manage_lor')
 
-    logo_path = os.path.join(settings.BASE_DIR, 'static/images/vinduslogo.png')
-    signature_path = os.path.join(settings.BASE_DIR, 'static/images/signature.png')  # New image
-
-    context = {
-        'intern': intern,
-        'company': {
-            "name": "VINDUS ENVIRONMENT PRIVATE LIMITED",
-            "cin": "U62099TS2023PTC179794",
-            "address": "#9-110, Shanti Nagar, Dilsukhnagar, Hyderabad-500060",
-            "phone": "+91 40 49525396",
-            "website": "www.vindusenvironment.com"
-        },
-        "today_date": date.today().strftime("%d-%m-%Y"),
-        "logo_path": logo_path,
-        "signature_path": signature_path,  # Add here
-
-    }
-
-    pdf_bytes = render_to_pdf('lors/lor_template.html', context)
+    filename, template_name, context = build_document('lor', intern)
+    pdf_bytes = render_pdf_bytes(template_name, context)
     if pdf_bytes:
         intern.lor_generated = True
         intern.save()
         response = HttpResponse(pdf_bytes, content_type='application/pdf')
-        filename = f"LOR_{intern.unique_id}_{intern.user.get_full_name()}.pdf"
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
         return response
 
     messages.error(request, "An unexpected error occurred while generating the LOR PDF.")
     return redirect('manage_lor')
 
+
+# ================================
+# Background Document Jobs
+# ================================
+from django.http import FileResponse, Http404
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.http import require_POST
+from .models import DocumentJob
+from .jobs import download_name, queue_document_job
+from .pdf_cache import cache_stats
+
+
+def _can_manage_documents(user):
+    return user.is_superuser or user.role == 'admin'
+
+
+@login_required
+@require_POST
+def document_job_create(request):
+    """
+    Queue undertaking/certificate/LOR generation for the selected interns
+    (scope=selected) or a whole batch (scope=batch) instead of rendering inline.
+    """
+    if not _can_manage_documents(request.user):
+        messages.error(request, "You do not have permission to perform this action.")
+        return redirect('dashboard')
+
+    back = request.META.get('HTTP_REFERER')
+    if not url_has_allowed_host_and_scheme(back, allowed_hosts={request.get_host()}, require_https=request.is_secure()):
+        back = 'document_job_list'
+    kind = request.POST.get('kind')
+    if kind not in DOCUMENT_FLAGS:
+        messages.error(request, "Unknown document type.")
+        return redirect(back)
+
+    label = ""
+    if request.POST.get('scope') == 'batch':
+        batch = Batch.objects.filter(id=request.POST.get('batch_id') or None).first()
+        if not batch:
+            messages.error(request, "Please filter by a batch first.")
+            return redirect(back)
+        interns = InternProfile.objects.filter(batch=batch)
+        label = batch.name
+    else:
+        intern_ids = request.POST.getlist('intern_ids')
+        if not intern_ids:
+            messages.error(request, "Please select at least one intern.")
+            return redirect(back)
+        if not all(intern_id.isdigit() for intern_id in intern_ids):
+            messages.error(request, "Invalid intern selection.")
+            return redirect(back)
+        interns = InternProfile.objects.filter(id__in=intern_ids)
+
+    job = queue_document_job(kind, interns, user=request.user, label=label)
+    if job is None:
+        messages.warning(request, "None of the selected interns are eligible for this document.")
+        return redirect(back)
+
+    messages.success(request, f"Queued {job.total} {job.get_kind_display().lower()} for background generation.")
+    return redirect('document_job_list')
+
+
+@login_required
+def document_job_list(request):
+    if not _can_manage_documents(request.user):
+        messages.error(request, "You do not have permission to access this page.")
+        return redirect('dashboard')
+
+    jobs = DocumentJob.objects.select_related('requested_by')[:50]
+    has_active = any(job.status in ("queued", "running") for job in jobs)
+    return render(request, 'documents/job_list.html', {
+        'jobs': jobs,
+        'has_active': has_active,
+        'pdf_cache': cache_stats(),
+    })
+
+
+@login_required
+def document_job_status(request, pk):
+    if not _can_manage_documents(request.user):
+        return JsonResponse({'status': 'error'}, status=403)
+
+    job = get_object_or_404(DocumentJob, pk=pk)
+    return JsonResponse({
+        'status': job.status,
+        'processed': job.processed,
+        'total': job.total,
+        'progress': job.progress,
+        'error': job.error,
+        'download_url': reverse('document_job_download', args=[job.pk]) if job.status == 'done' else None,
+    })
+
+
+@login_required
+def document_job_download(request, pk):
+    if not _can_manage_documents(request.user):
+        messages.error(request, "You do not have permission to perform this action.")
+        return redirect('dashboard')
+
+    job = get_object_or_404(DocumentJob, pk=pk, status='done')
+    if not job.result_file or not os.path.exists(job.result_file.path):
+        raise Http404("The generated archive is no longer available.")
+    return FileResponse(
+        open(job.result_file.path, 'rb'),
+        as_attachment=True,
+        filename=download_name(job),
+        content_type='application/zip',
+    )
+
+
+# =====================
+# Request Metrics Dashboard
+# =====================
+from .metrics import summarize
+
+
+@login_required
+def request_metrics_dashboard(request):
+    if not (request.user.is_superuser or request.user.role == 'admin'):
+        messages.error(request, "You do not have permission to access this page.")
+        return redirect('dashboard')
+
+    try:
+        hours = min(max(int(request.GET.get('hours', 24)), 1), 24 * 7)
+    except ValueError:
+        hours = 24
+
+    rows = summarize(hours)
+    return render(request, 'metrics/request_metrics.html', {
+        'rows': rows,
+        'hours': hours,
+        'hour_choices': [1, 6, 24, 72, 168],
+        'total_requests': sum(row['requests'] for row in rows),
+        'flagged_views': sum(1 for row in rows if row['over_budget']),
+    })
+
 @login_required
 def intern_list(request):
     interns = InternProfile.objects.all()
@@ -1199,10 +1254,11 @@ from django.shortcuts import render, get_object_or_404
 from django.db.models import Count, Q
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponse
-from .models import Attendance, Batch
-from datetime import datetime,date
+from .models import Attendance, AttendanceMonthlySummary, Batch
+from .attendance import month_bounds, monthly_summary, refresh_monthly_summary
+from .exports import csv_response, xlsx_response, attendance_report_rows
+from datetime import MAXYEAR, MINYEAR, datetime, date
 import calendar
-import openpyxl
 from xhtml2pdf import pisa
 from django.template.loader import get_template
 import os
@@ -1214,6 +1270,7 @@ def attendance_report(request):
     selected_batch_id = request.GET.get('batch')
     date_input = request.GET.get('date')
     month_input = request.GET.get('month')
+    year_input = request.GET.get('year')
     export_type = request.GET.get('export')
 
     attendances = Attendance.objects.none()
@@ -1221,9 +1278,17 @@ def attendance_report(request):
     today = datetime.today().date()
     batch = None
 
+    try:
+        selected_year = int(year_input) if year_input else today.year
+    except ValueError:
+        selected_year = today.year
+    # month_bounds() needs the following January to exist as a date too
+    if not MINYEAR <= selected_year < MAXYEAR:
+        selected_year = today.year
+
     if selected_batch_id:
         batch = get_object_or_404(Batch, pk=selected_batch_id)
-        attendances = Attendance.objects.filter(batch=batch)
+        attendances = Attendance.objects.filter(batch=batch).select_related('intern__user', 'trainer__user')
 
         # Default or specific date
         if date_input:
@@ -1234,93 +1299,61 @@ def attendance_report(request):
         else:
             selected_date = today
 
-        attendances = attendances.filter(date=selected_date)
-
-        # Monthwise report
+        # Monthwise report (served from the monthly rollup)
+        month_number = None
         if month_input and month_input != "None":
             try:
                 month_number = list(calendar.month_name).index(month_input)
-                attendances = Attendance.objects.filter(
-                    batch=batch,
-                    date__month=month_number
-                )
-                selected_date = None
             except ValueError:
-                pass
-
-        # Summary
-        summary = attendances.values(
-            'intern__unique_id',
-            'intern__user__first_name',
-            'intern__user__last_name'
-        ).annotate(
-            present_count=Count('id', filter=Q(status='Present')),
-            absent_count=Count('id', filter=Q(status='Absent'))
-        )
+                month_number = None
+
+        if month_number:
+            start, end = month_bounds(selected_year, month_number)
+            attendances = attendances.filter(date__gte=start, date__lt=end)
+            summary = monthly_summary(batch, selected_year, month_number)
+            selected_date = None
+        else:
+            # Single day: at most one row per intern, so aggregate directly
+            attendances = attendances.filter(date=selected_date)
+            summary = attendances.values(
+                'intern__unique_id',
+                'intern__user__first_name',
+                'intern__user__last_name'
+            ).annotate(
+                present_count=Count('id', filter=Q(status='Present')),
+                absent_count=Count('id', filter=Q(status='Absent'))
+            )
 
-    # ---------- Excel Export ----------
+    # ---------- Excel / CSV Export (streamed) ----------
     if export_type == 'excel' and attendances.exists():
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        return xlsx_response(
+            'attendance_report.xlsx',
+            attendance_report_rows(batch, attendances, summary),
+            title="Attendance Report",
         )
-        response['Content-Disposition'] = 'attachment; filename=attendance_report.xlsx'
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Attendance Report"
-
-        # Header for attendance
-        ws.append(["Attendance Report"])
-        ws.append(["Batch", batch.name if batch else ""])
-        ws.append([])
-        ws.append(['Date', 'Intern Name', 'Unique ID', 'Status', 'Trainer'])
-
-        # Attendance Data
-        for att in attendances:
-            ws.append([
-                att.date.strftime("%Y-%m-%d"),
-                att.intern.user.get_full_name(),
-                att.intern.unique_id,
-                att.status,
-                att.trainer.user.get_full_name()
-            ])
-
-        # Add spacing
-        ws.append([])
-        ws.append([])
-
-        # Summary Section
-        ws.append(["Summary"])
-        ws.append(['Intern Name', 'Unique ID', 'Present Days', 'Absent Days'])
-
-        for s in summary:
-            ws.append([
-                f"{s['intern__user__first_name']} {s['intern__user__last_name']}",
-                s['intern__unique_id'],
-                s['present_count'],
-                s['absent_count']
-            ])
-
-        wb.save(response)
-        return response
+
+    if export_type == 'csv' and attendances.exists():
+        return csv_response('attendance_report.csv', attendance_report_rows(batch, attendances, summary))
 
     # ---------- PDF Export ----------
     if export_type == 'pdf' and attendances.exists():
         template = get_template('attendance/attendance_report_pdf.html')
-        logo_path = os.path.join(settings.BASE_DIR, 'static/images/vinduslogo.jpg')
+        logo_path = branding_image('vinduslogo.jpg')
         today_date = datetime.now().strftime('%d-%m-%Y')
         
         html = template.render({
             'attendances': attendances,
             'summary': summary,
             'batch': batch,
-            'selected_date': (datetime.strptime(date_input, "%Y-%m-%d").strftime('%d-%m-%Y') if date_input else today.strftime('%d-%m-%Y')),
-            'month_input': month_input,
+            'selected_date': selected_date.strftime('%d-%m-%Y') if selected_date else None,
+            'month_input': calendar.month_name[month_number] if month_number else None,
+            'selected_year': selected_year,
             'logo_path': logo_path,
             'today_date': today_date,
         })
         response = HttpResponse(content_type='application/pdf')
         response['Content-Disposition'] = 'attachment; filename="attendance_report.pdf"'
-        pisa_status = pisa.CreatePDF(html, dest=response)
+        pisa_status = pisa.CreatePDF(html, dest=response, link_callback=branding_link_callback)
         if pisa_status.err:
             return HttpResponse("Error generating PDF")
         return response
@@ -1334,6 +1367,11 @@ def attendance_report(request):
         "selected_date": date_input if date_input else today,
         "month_input": month_input,
         "months": list(calendar.month_name)[1:],  # January–December
+        "selected_year": selected_year,
+        "years": sorted(
+            set(AttendanceMonthlySummary.objects.values_list('year', flat=True).distinct()) | {today.year},
+            reverse=True,
+        ),
     })
 
 
@@ -1370,6 +1408,7 @@ def edit_attendance(request, attendance_id):
         if new_status in ["Present", "Absent"]:
             attendance.status = new_status
             attendance.save()
+            refresh_monthly_summary([attendance.intern_id], attendance.date.year, attendance.date.month)
             messages.success(request, "Attendance updated successfully!")
             return redirect('attendance_list')
         else:
@@ -1384,6 +1423,7 @@ from .forms import CurriculumForm
 
 # Create Curriculum
 @login_required
+@hashing_uploads("file")
 def create_curriculum(request):
     if request.method == "POST":
         form = CurriculumForm(request.POST, request.FILES)
@@ -1429,6 +1469,7 @@ def curriculum_list(request):
 
 # Update
 @login_required
+@hashing_uploads("file")
 def update_curriculum(request, pk):
     curriculum = get_object_or_404(Curriculum, pk=pk)
 
@@ -1761,10 +1802,78 @@ def recorded_session_list(request):
 
     return render(request, 'sessions/recorded_session_list.html', {'sessions': sessions})
 
+def can_view_recorded_session(user, session):
+    """Same visibility as recorded_session_list: own sessions, own batch, or everything for admins."""
+    role = getattr(user, 'role', None)
+    if user.is_superuser or role in ["admin", "superuser"]:
+        return True
+    if role == "trainer":
+        return session.trainer_id == user.trainer_profile.id
+    if role == "intern":
+        return session.batch_id == user.intern_profile.batch_id
+    return False
+
+
+@login_required
+def recorded_session_stream(request, pk):
+    """
+    Stream a recording to an authorised viewer with Range support, so the
+    player can start immediately and seek without fetching the whole file.
+    """
+    session = get_object_or_404(RecordedSession, pk=pk)
+    if not can_view_recorded_session(request.user, session):
+        return HttpResponseForbidden("You are not allowed to view this session.")
+    if not session.video or not os.path.exists(session.video.path):
+        raise Http404("Recording not found.")
+
+    content_type = mimetypes.guess_type(session.video.name)[0] or 'video/mp4'
+    return serve_protected_file(
+        request,
+        session.video.path,
+        content_type,
+        cache_control='private, max-age=3600',
+        block_size=settings.VIDEO_STREAM_CHUNK_SIZE,
+        max_range_length=settings.VIDEO_STREAM_MAX_RANGE,
+    )
+
+HLS_CONTENT_TYPES = {
+    '.m3u8': 'application/vnd.apple.mpegurl',
+    '.ts': 'video/mp2t',
+    '.jpg': 'image/jpeg',
+}
+
+
+@login_required
+def recorded_session_hls(request, pk, path):
+    """
+    Serve the HLS playlists, segments and poster produced by
+    `process_recordings`, behind the same permission check as the stream.
+    """
+    session = get_object_or_404(RecordedSession, pk=pk)
+    if not can_view_recorded_session(request.user, session):
+        return HttpResponseForbidden("You are not allowed to view this session.")
+    if not session.is_ready:
+        raise Http404("This recording is still being processed.")
+
+    content_type = HLS_CONTENT_TYPES.get(os.path.splitext(path)[1].lower())
+    if content_type is None:
+        raise Http404("Unknown file type.")
+    try:
+        full_path = safe_join(os.path.join(settings.MEDIA_ROOT, session.hls_dir), path)
+    except SuspiciousFileOperation:
+        raise Http404("File not found.")
+    if not os.path.isfile(full_path):
+        raise Http404("File not found.")
+
+    # Segments never change once written; playlists are revalidated
+    cache_control = 'private, no-cache' if path.endswith('.m3u8') else 'private, max-age=86400'
+    return serve_protected_file(request, full_path, content_type, cache_control=cache_control)
+
 # ----------------------
 # CREATE RECORDED SESSION
 # ----------------------
 @login_required
+@hashing_uploads("video")
 def recorded_session_create(request):
     user = request.user
     role = getattr(user, 'role', None)
@@ -1794,6 +1903,7 @@ def recorded_session_create(request):
 # UPDATE RECORDED SESSION
 # ----------------------
 @login_required
+@hashing_uploads("video")
 def recorded_session_update(request, pk):
     session = get_object_or_404(RecordedSession, pk=pk)
     user = request.user
@@ -1810,7 +1920,10 @@ def recorded_session_update(request, pk):
     if request.method == "POST":
         form = RecordedSessionForm(request.POST, request.FILES, instance=session, user=user)
         if form.is_valid():
-            form.save()
+            session = form.save(commit=False)
+            if 'video' in form.changed_data:
+                reset_processing(session)
+            session.save()
             messages.success(request, "Recorded session updated successfully!")
             return redirect('recorded_session_list')
     else:
@@ -1836,6 +1949,7 @@ def recorded_session_delete(request, pk):
         return redirect('recorded_session_list')
 
     if request.method == "POST":
+        reset_processing(session)  # removes the HLS output
         session.delete()
         messages.success(request, "Recorded session deleted successfully!")
         return redirect('recorded_session_list')
@@ -1992,6 +2106,7 @@ def user_delete(request, pk):
 from django.utils import timezone
 
 @login_required
+@hashing_uploads("file")
 def create_assignment(request):
     if request.user.role != "trainer":
         return redirect('dashboard')
@@ -2039,6 +2154,7 @@ def view_assignments(request):
     return render(request, "assignments/view_assignments.html", {"assignments": assignments})
 
 @login_required
+@hashing_uploads("file")
 def edit_assignment(request, pk):
     if request.user.role != "trainer":
         return redirect("dashboard")
@@ -2169,6 +2285,7 @@ def intern_assignments(request):
 
 
 @login_required
+@hashing_uploads("file")
 def submit_assignment(request, assignment_id):
     if request.user.role != "intern":
         return redirect("dashboard")
@@ -2202,13 +2319,15 @@ from django.db.models import Sum
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from .models import Batch, Assignment, AssignmentSubmission, InternProfile, TrainerProfile
+from django.utils.text import slugify
+from .exports import batch_scores_rows
+from .services import cached_batch_scoreboard
 
 @login_required
 def batch_scores(request):
     user = request.user
     selected_batch = None
     scoreboard = []
-    total_assignments = 0
 
     # Determine available batches based on role
     if user.role == "intern":
@@ -2225,29 +2344,14 @@ def batch_scores(request):
     if batch_id:
         # Ensure the selected batch is in the user's accessible batches
         selected_batch = get_object_or_404(batches, id=batch_id)
-        interns = selected_batch.interns.all()
-        total_assignments = Assignment.objects.filter(batch=selected_batch).count()
+        scoreboard = cached_batch_scoreboard(selected_batch)
 
-        for intern in interns:
-            submissions = AssignmentSubmission.objects.filter(
-                intern=intern, assignment__batch=selected_batch
-            )
-
-            submitted_count = submissions.count()
-            graded_count = submissions.filter(graded=True).count()
-            total_score = submissions.aggregate(Sum("score"))["score__sum"] or 0
-            avg_score = total_score / graded_count if graded_count > 0 else 0
-            completion_rate = (submitted_count / total_assignments) * 100 if total_assignments > 0 else 0
-
-            scoreboard.append({
-                "intern": intern,
-                "total_assignments": total_assignments,
-                "submitted_count": submitted_count,
-                "graded_count": graded_count,
-                "total_score": round(total_score, 2),
-                "average_score": round(avg_score, 2),
-                "completion_rate": round(completion_rate, 2),
-            })
+        export_type = request.GET.get("export")
+        filename = f"assignment_scores_{slugify(selected_batch.name) or selected_batch.id}"
+        if export_type == "excel":
+            return xlsx_response(f"{filename}.xlsx", batch_scores_rows(selected_batch, scoreboard), title="Scores")
+        if export_type == "csv":
+            return csv_response(f"{filename}.csv", batch_scores_rows(selected_batch, scoreboard))
 
     return render(request, "assignments/batch_scores.html", {
         "batches": batches,
@@ -2256,47 +2360,11 @@ def batch_scores(request):
     })
 
 
-import io
-import pdfplumber
-
-def parse_mcq_txt(file):
-    """Parses a TXT file into MCQ dicts"""
-    mcqs = []
-    content = file.read().decode("utf-8")
-    blocks = content.strip().split("\n\n")
-    for block in blocks:
-        lines = block.strip().split("\n")
-        question_text = lines[0]
-        options = lines[1:5]
-        correct_option = int(lines[5].split(":")[1].strip())
-        mcqs.append({
-            "question_text": question_text,
-            "options": options,
-            "correct_option": correct_option
-        })
-    return mcqs
-
-def parse_mcq_pdf(file):
-    """Parses PDF into MCQ dicts using pdfplumber"""
-    mcqs = []
-    with pdfplumber.open(file) as pdf:
-        text = ""
-        for page in pdf.pages:
-            text += page.extract_text() + "\n"
-        blocks = text.strip().split("\n\n")
-        for block in blocks:
-            lines = block.strip().split("\n")
-            if len(lines) < 6:  # skip invalid blocks
-                continue
-            question_text = lines[0]
-            options = lines[1:5]
-            correct_option = int(lines[5].split(":")[1].strip())
-            mcqs.append({
-                "question_text": question_text,
-                "options": options,
-                "correct_option": correct_option
-            })
-    return mcqs
+from .mcq_import import create_assessment_with_mcqs, parse_mcq_pdf, parse_mcq_txt
+from .question_papers import question_paper
+from .scoring import answer_key, answers_from_post, score_answers
+
+MAX_REPORTED_MCQ_ERRORS = 10
 
 @login_required
 def create_assessment(request):
@@ -2315,35 +2383,32 @@ def create_assessment(request):
             messages.error(request, "All fields are required.")
             return redirect("create_assessment")
 
-        # Parse file
+        # Parse and validate the whole file before writing anything
         if file.name.endswith(".txt"):
-            mcqs = parse_mcq_txt(file)
+            mcqs, errors = parse_mcq_txt(file)
         elif file.name.endswith(".pdf"):
-            mcqs = parse_mcq_pdf(file)
+            mcqs, errors = parse_mcq_pdf(file)
         else:
             messages.error(request, "Only TXT or PDF files are supported.")
             return redirect("create_assessment")
 
-        # Create assessment
-        assessment = Assessment.objects.create(
+        if errors:
+            for error in errors[:MAX_REPORTED_MCQ_ERRORS]:
+                messages.error(request, error)
+            if len(errors) > MAX_REPORTED_MCQ_ERRORS:
+                messages.error(request, f"...and {len(errors) - MAX_REPORTED_MCQ_ERRORS} more problems.")
+            return redirect("create_assessment")
+
+        # Create assessment and its MCQs in one transaction
+        assessment = create_assessment_with_mcqs(
             batch_id=batch_id,
             trainer=trainer,
             title=title,
             question_file=file,
-            total_marks=len(mcqs)
+            mcqs=mcqs,
         )
-
-        # Save MCQs
-        for mcq in mcqs:
-            AssessmentMCQ.objects.create(
-                assessment=assessment,
-                question_text=mcq["question_text"],
-                option_1=mcq["options"][0],
-                option_2=mcq["options"][1],
-                option_3=mcq["options"][2] if len(mcq["options"]) > 2 else "",
-                option_4=mcq["options"][3] if len(mcq["options"]) > 3 else "",
-                correct_option=mcq["correct_option"]
-            )
+        # Warm the shared question paper before the batch opens it
+        question_paper(assessment)
 
         messages.success(request, f"Assessment '{title}' created successfully!")
         return redirect("view_assessments")
@@ -2353,31 +2418,27 @@ def create_assessment(request):
 
 @login_required
 def take_assessment(request, assessment_id):
-    assessment = get_object_or_404(Assessment, id=assessment_id)
-
     # Only intern of batch can take
-    if request.user.role != "intern" or request.user.intern_profile.batch != assessment.batch:
+    if request.user.role != "intern":
+        get_object_or_404(Assessment, id=assessment_id)
         return redirect("dashboard")
 
     intern = request.user.intern_profile
+    assessment = assessments_for_intern(intern).filter(id=assessment_id).first()
+    if assessment is None:
+        get_object_or_404(Assessment, id=assessment_id)
+        return redirect("dashboard")
 
     # Check if submission already exists
-    submission = AssessmentSubmission.objects.filter(assessment=assessment, intern=intern).first()
-    if submission:
+    if assessment.submission_id:
         # Redirect to result if already submitted
         messages.info(request, "You have already submitted this assessment.")
-        return redirect("assessment_result", submission.id)
-
-    mcqs = assessment.mcqs.all()
+        return redirect("assessment_result", assessment.submission_id)
 
     if request.method == "POST":
-        answers = {}
-        score = 0
-        for mcq in mcqs:
-            selected_option = int(request.POST.get(f"mcq_{mcq.id}", 0))
-            answers[str(mcq.id)] = selected_option
-            if selected_option == mcq.correct_option:
-                score += 1
+        key = answer_key(assessment)
+        answers = answers_from_post(key, request.POST)
+        score = score_answers(key, answers)
 
         # Create submission (no update)
         submission = AssessmentSubmission.objects.create(
@@ -2390,7 +2451,10 @@ def take_assessment(request, assessment_id):
         messages.success(request, "Assessment submitted successfully!")
         return redirect("assessment_result", submission.id)
 
-    return render(request, "assessments/take_assessment.html", {"assessment": assessment, "mcqs": mcqs})
+    return render(request, "assessments/take_assessment.html", {
+        "assessment": assessment,
+        "paper": question_paper(assessment),
+    })
 
 @login_required
 def assessment_result(request, submission_id):
@@ -2465,66 +2529,63 @@ def intern_assessments(request):
         return redirect("dashboard")
 
     intern = request.user.intern_profile
-    batch = intern.batch
 
-    # All assessments for the intern's batch
-    assessments = Assessment.objects.filter(batch=batch).order_by("-created_at")
-
-    # Collect submission info
-    assessment_data = []
-    for a in assessments:
-        submission = AssessmentSubmission.objects.filter(assessment=a, intern=intern).first()
-        assessment_data.append({
+    # All assessments for the intern's batch, with the intern's submission
+    assessment_data = [
+        {
             "assessment": a,
-            "is_submitted": bool(submission),
-            "submission": submission,
-            "score": submission.score if submission else None
-        })
+            "is_submitted": a.submission_id is not None,
+            "submission_id": a.submission_id,
+            "score": a.submission_score,
+        }
+        for a in assessments_for_intern(intern)
+    ]
 
     return render(request, "assessments/intern_assessments.html", {"assignment_data": assessment_data})
 
 
+from .leaderboard import batch_assessment_totals, batch_leaderboard
+
+LEADERBOARD_PAGE_SIZE = 50
+LEADERBOARD_MAX_PAGE_SIZE = 500
+
+
+def _assessment_score_batches(user):
+    """Batches whose assessment scores `user` may see, or None if none at all."""
+    if user.role == "intern":
+        intern_profile = getattr(user, "intern_profile", None)
+        return Batch.objects.filter(id=intern_profile.batch_id) if intern_profile else None
+    if user.role == "trainer":
+        trainer_profile = getattr(user, "trainer_profile", None)
+        return trainer_profile.assigned_batches.all() if trainer_profile else None
+    if user.role in ["admin", "superuser"]:
+        return Batch.objects.all()
+    return None
+
+
 @login_required
 def batch_assessment_scores(request):
-    user = request.user
     selected_batch = None
     scoreboard = []
-    total_assessments = 0
-    total_possible_score = 0
 
     # Determine accessible batches
-    if user.role == "intern":
-        batches = Batch.objects.filter(id=user.intern_profile.batch.id)
-    elif user.role == "trainer":
-        batches = user.trainer_profile.assigned_batches.all()
-    elif user.role in ["admin", "superuser"]:
-        batches = Batch.objects.all()
-    else:
+    batches = _assessment_score_batches(request.user)
+    if batches is None:
         return redirect("dashboard")
 
     # If batch selected via GET
     batch_id = request.GET.get("batch_id")
     if batch_id:
         selected_batch = get_object_or_404(batches, id=batch_id)
-        interns = selected_batch.interns.all()
-        assessments = Assessment.objects.filter(batch=selected_batch)
-        total_assessments = assessments.count()
-        total_possible_score = assessments.aggregate(Sum("total_marks"))["total_marks__sum"] or 0
-
-        for intern in interns:
-            submissions = AssessmentSubmission.objects.filter(
-                intern=intern, assessment__batch=selected_batch
-            )
-            submitted_count = submissions.count()
-            total_score = submissions.aggregate(Sum("score"))["score__sum"] or 0
+        total_assessments, total_possible_score = batch_assessment_totals(selected_batch)
 
-            scoreboard.append({
-                "intern": intern,
+        for row in batch_leaderboard(selected_batch):
+            row.update({
                 "total_assessments": total_assessments,
-                "submitted_count": submitted_count,
                 "total_possible_score": total_possible_score,
-                "score_secured": round(total_score, 2),
+                "score_secured": row["total_score"],
             })
+            scoreboard.append(row)
 
     return render(request, "assessments/batch_assessment_scores.html", {
         "batches": batches,
@@ -2533,6 +2594,50 @@ def batch_assessment_scores(request):
     })
 
 
+@login_required
+def batch_leaderboard_api(request, batch_id):
+    """
+    Paged leaderboard for one batch as JSON: ?limit= (default 50, max 500),
+    ?offset=, and ?matrix=1 to include each intern's per-assessment scores
+    (an intern only gets their own).
+    """
+    batches = _assessment_score_batches(request.user)
+    if batches is None:
+        return JsonResponse({"status": "error", "message": "Not allowed."}, status=403)
+    batch = batches.filter(id=batch_id).first()
+    if batch is None:
+        return JsonResponse({"status": "error", "message": "Batch not found."}, status=404)
+
+    try:
+        limit = min(int(request.GET.get("limit", LEADERBOARD_PAGE_SIZE)), LEADERBOARD_MAX_PAGE_SIZE)
+        offset = int(request.GET.get("offset", 0))
+    except ValueError:
+        return JsonResponse({"status": "error", "message": "limit and offset must be integers."}, status=400)
+    if limit < 1 or offset < 0:
+        return JsonResponse({"status": "error", "message": "limit and offset out of range."}, status=400)
+    with_matrix = request.GET.get("matrix") == "1"
+    # Batchmates' per-assessment scores are for trainers and admins
+    matrix_for = request.user.intern_profile.id if request.user.role == "intern" else None
+
+    total_assessments, total_possible_score = batch_assessment_totals(batch)
+    rows = batch_leaderboard(batch, offset=offset, limit=limit, with_matrix=with_matrix, matrix_for=matrix_for)
+    payload = {
+        "status": "success",
+        "batch": {"id": batch.id, "name": batch.name},
+        "total_interns": batch.interns.count(),
+        "total_assessments": total_assessments,
+        "total_possible_score": total_possible_score,
+        "offset": offset,
+        "limit": limit,
+        "results": rows,
+    }
+    if with_matrix:
+        payload["assessments"] = list(
+            Assessment.objects.filter(batch=batch).order_by("created_at").values("id", "title", "total_marks")
+        )
+    return JsonResponse(payload)
+
+
 from django.db.models import Avg
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
@@ -2586,29 +2691,32 @@ def intern_overview(request):
         "percentage": round(percentage, 2)
     }
 
+    # --- Pending work (batch-scoped, one query) ---
+    work = pending_work_for_intern(intern_profile)
+
     # --- Assignments ---
-    total_assignments = Assignment.objects.count()
-    submitted_assignments_qs = AssignmentSubmission.objects.filter(intern=intern_profile)
-    submitted_assignments = submitted_assignments_qs.count()
+    submitted_assignments_qs = AssignmentSubmission.objects.filter(
+        intern=intern_profile, assignment__batch_id=intern_profile.batch_id
+    )
     # Average assignment score
     avg_assignment_score = submitted_assignments_qs.aggregate(avg_score=Avg('score'))['avg_score'] or 0
     assignment_summary = {
-        "total": total_assignments,
-        "submitted": submitted_assignments,
-        "pending": total_assignments - submitted_assignments,
+        "total": work['total_assignments'],
+        "submitted": work['total_assignments'] - work['pending_assignments'],
+        "pending": work['pending_assignments'],
         "avg_score": round(avg_assignment_score, 2)
     }
 
     # --- Assessments ---
-    total_assessments = Assessment.objects.count()
-    completed_assessments_qs = AssessmentSubmission.objects.filter(intern=intern_profile)
-    completed_assessments = completed_assessments_qs.count()
+    completed_assessments_qs = AssessmentSubmission.objects.filter(
+        intern=intern_profile, assessment__batch_id=intern_profile.batch_id
+    )
     # Average assessment score
     avg_assessment_score = completed_assessments_qs.aggregate(avg_score=Avg('score'))['avg_score'] or 0
     assessment_summary = {
-        "total": total_assessments,
-        "completed": completed_assessments,
-        "pending": total_assessments - completed_assessments,
+        "total": work['total_assessments'],
+        "completed": work['total_assessments'] - work['pending_assessments'],
+        "pending": work['pending_assessments'],
         "avg_score": round(avg_assessment_score, 2)
     }
 
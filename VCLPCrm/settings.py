@@ -42,6 +42,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'CRM.middleware.RequestMetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -55,9 +56,12 @@ ROOT_URLCONF = 'VCLPCrm.urls'
 
 import os
 
+# Templates are the stock Django engine; CRM.template_backends only adds the
+# render timing reported by the request metrics (CRM/middleware.py).
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'CRM.template_backends.TimedDjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],  # Add this line
         'APP_DIRS': True,
         'OPTIONS': {
@@ -87,6 +91,17 @@ DATABASES = {
     }
 }
 
+# Cache
+# Shared between worker processes so signal-driven invalidation (CRM/signals.py)
+# is seen by every worker, not just the one that handled the write.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -118,6 +133,96 @@ USE_I18N = True
 
 USE_TZ = True
 
+# PDF documents (CRM/documents.py)
+# Processes run_document_worker uses to render undertaking/certificate/LOR PDFs;
+# None means one per CPU core. Downloads streamed from a request always render
+# serially in the web worker.
+
+PDF_RENDER_WORKERS = None
+
+# A document job still "running" this long after it started is assumed to have
+# lost its worker and is queued again when run_document_worker starts.
+
+DOCUMENT_JOB_STALE_AFTER = 2 * 60 * 60
+
+# Rendered PDFs are cached under PDF_CACHE_DIR (CRM/pdf_cache.py), outside
+# MEDIA_ROOT because certificates and LORs hold personal data; least recently
+# used files are removed beyond PDF_CACHE_MAX_BYTES.
+
+PDF_CACHE_DIR = BASE_DIR / 'cache' / 'pdf'
+PDF_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Finished document job ZIPs (CRM/jobs.py) hold the same personal data, so they
+# are kept outside MEDIA_ROOT too and only served by document_job_download.
+
+DOCUMENT_JOB_DIR = BASE_DIR / 'private' / 'document_jobs'
+
+# The lesson viewer shows PDF pages as WebP images rendered on demand and cached
+# under MEDIA_ROOT/pdf_pages/ (CRM/pdfpages.py), pruned beyond this size.
+
+PDF_PAGE_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+
+# Protected media (CRM/fileserving.py)
+# Set to "nginx" (X-Accel-Redirect) or "apache" (X-Sendfile) to let the reverse
+# proxy send files after the view's permission checks; None streams from Django.
+# For nginx, PROTECTED_FILES_NGINX_PREFIX must be an `internal` location aliased
+# to MEDIA_ROOT.
+
+PROTECTED_FILES_BACKEND = None
+PROTECTED_FILES_NGINX_PREFIX = '/protected/'
+
+# Recorded sessions are streamed in fixed-size blocks; open-ended Range requests
+# ("bytes=N-") are answered with at most VIDEO_STREAM_MAX_RANGE bytes so a seek
+# or a closed tab does not pull the rest of the recording.
+
+VIDEO_STREAM_CHUNK_SIZE = 256 * 1024
+VIDEO_STREAM_MAX_RANGE = 4 * 1024 * 1024
+
+# Recorded session transcoding (`python manage.py process_recordings`)
+
+FFMPEG_BINARY = 'ffmpeg'
+FFPROBE_BINARY = 'ffprobe'
+
+# Sessions still "processing" this long after being claimed lost their worker
+# and are queued again when process_recordings starts.
+
+RECORDING_PROCESSING_STALE_AFTER = 6 * 60 * 60
+
+# Assignment scoreboard (CRM/services.py) is cached per batch and dropped by
+# signals when a submission, grade or roster changes; 0 disables the cache.
+
+BATCH_SCORES_CACHE_TIMEOUT = 60 * 60
+
+# Rendered MCQ list of each assessment (CRM/question_papers.py), shared by all
+# interns taking it and dropped when one of its MCQs changes; 0 disables it.
+
+ASSESSMENT_PAPER_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Request metrics (CRM/middleware.py, dashboard at /metrics/requests/)
+# Query count, SQL time, repeated queries, template time and response size per
+# request, kept as daily JSONL files for REQUEST_METRICS_RETENTION_DAYS.
+# Views over their query budget are flagged; REQUEST_QUERY_BUDGETS is keyed by
+# URL name.
+
+REQUEST_METRICS_ENABLED = True
+REQUEST_METRICS_SAMPLE_RATE = 1.0
+REQUEST_METRICS_DIR = BASE_DIR / 'request_metrics'
+REQUEST_METRICS_RETENTION_DAYS = 7
+REQUEST_QUERY_BUDGET_DEFAULT = 50
+REQUEST_QUERY_BUDGETS = {}
+
+# Uploads (CRM/storage.py)
+# Views decorated with @hashing_uploads stream uploads to a temp file and hash
+# them on the way in; lesson, curriculum and assignment files are then stored
+# once per distinct content under MEDIA_ROOT/blobs/. Files over the limit for
+# their form field are rejected, from the Content-Length when it is already
+# too large.
+
+UPLOAD_MAX_BYTES = 100 * 1024 * 1024
+UPLOAD_MAX_BYTES_BY_FIELD = {
+    'video': 4 * 1024 * 1024 * 1024,
+}
+
 MEDIA_URL = '/media/'                     # URL to access uploaded files
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')  # Folder to store uploaded files
 
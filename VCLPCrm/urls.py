@@ -12,10 +12,12 @@ urlpatterns = [
     path('logout/', views.logout_view, name='logout'),
     path('dashboard/', views.dashboard_view, name='dashboard'),
     path('attendance/', views.mark_attendance, name='mark_attendance'),
+    path('attendance/bulk/', views.bulk_attendance_api, name='bulk_attendance_api'),
     path('lessons/upload/', views.upload_lesson, name='upload_lesson'),
     path('lessons/view/', views.view_lessons, name='view_lessons'),
     path('lessons/<int:lesson_id>/secure-view/', views.secure_pdf_view, name='secure_pdf_view'),
     path('lessons/<int:lesson_id>/viewer/', views.pdf_viewer_page, name='pdf_viewer_page'),
+    path('lessons/<int:lesson_id>/pages/<int:page>/<int:width>.webp', views.lesson_page_image, name='lesson_page_image'),
     path("lessons/edit/<int:pk>/", views.edit_lesson, name="edit_lesson"),
     path("lessons/delete/<int:pk>/", views.delete_lesson, name="delete_lesson"),
     path("undertaking/", views.undertaking_certificates_home, name="undertaking_home"),
@@ -27,6 +29,11 @@ urlpatterns = [
     path('certificate/download/<int:intern_id>/', views.download_certificate_view, name='download_certificate'),
     path('lors/', views.manage_lor_view, name='manage_lor'),
     path('lor/download/<int:intern_id>/', views.download_lor_view, name='download_lor'),
+    path('documents/jobs/', views.document_job_list, name='document_job_list'),
+    path('documents/jobs/create/', views.document_job_create, name='document_job_create'),
+    path('documents/jobs/<int:pk>/status/', views.document_job_status, name='document_job_status'),
+    path('documents/jobs/<int:pk>/download/', views.document_job_download, name='document_job_download'),
+    path('metrics/requests/', views.request_metrics_dashboard, name='request_metrics_dashboard'),
       
     path("courses/", views.course_list, name="course_list"),
     path("courses/add/", views.course_create, name="course_create"),
@@ -71,6 +78,8 @@ urlpatterns = [
     path('sessions/create/', views.recorded_session_create, name='recorded_session_create'),
     path('sessions/<int:pk>/edit/', views.recorded_session_update, name='recorded_session_update'),
     path('sessions/<int:pk>/delete/', views.recorded_session_delete, name='recorded_session_delete'),
+    path('sessions/<int:pk>/stream/', views.recorded_session_stream, name='recorded_session_stream'),
+    path('sessions/<int:pk>/hls/<path:path>', views.recorded_session_hls, name='recorded_session_hls'),
 
     path('trainers/', views.trainer_list, name='trainer_list'),
     path('trainers/create/', views.trainer_create, name='trainer_create'),
@@ -103,6 +112,7 @@ urlpatterns = [
     path("assessments/take/<int:assessment_id>/", views.take_assessment, name="take_assessment"),
     path("assessments/result/<int:submission_id>/", views.assessment_result, name="assessment_result"),
     path("assessments/scores/", views.batch_assessment_scores, name="batch_assessment_scores"),
+    path("assessments/scores/<int:batch_id>/leaderboard/", views.batch_leaderboard_api, name="batch_leaderboard_api"),
     path('intern-overview/', views.intern_overview, name='intern_overview'),
 
 